@@ -0,0 +1,120 @@
+import uuid
+
+import numpy as np
+
+RISK_LEVELS = ('Low', 'Moderate', 'High')
+
+
+def lttb(x, y, threshold):
+    """Downsample a series to threshold points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each of the buckets between,
+    the point forming the largest triangle with the point kept before it and
+    the mean of the next bucket, so peaks and dips survive. Returns the
+    indices of the kept points; short series come back whole.
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries over the points between the first and last
+    edges = (np.arange(threshold - 1) * ((size - 2) / (threshold - 2))).astype(int) + 1
+    kept = np.empty(threshold, dtype=int)
+    kept[0], kept[-1] = 0, size - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the triangle areas; only the largest matters
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(areas.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+class AnalysisHistory:
+    """Fixed-capacity ring buffer of a session's analyses.
+
+    Timestamps, sentiment scores and risk levels live in NumPy arrays;
+    once full, each new analysis overwrites the oldest. Risk counts and the
+    sentiment sum are updated as entries come and go, so the summary
+    never rescans the buffer. ``version`` changes whenever the contents do,
+    for caching anything derived from them.
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.uid = uuid.uuid4().hex
+        self.timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        self.sentiments = np.zeros(capacity)
+        self.risks = np.zeros(capacity, dtype=np.int8)
+        self.version = 0
+        self.clear()
+
+    def clear(self):
+        """Drop every analysis."""
+        self.start = 0
+        self.size = 0
+        self.total = 0
+        self.risk_counts = dict.fromkeys(RISK_LEVELS, 0)
+        self.sentiment_sum = 0.0
+        self.entries = [None] * self.capacity
+        self.version += 1
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, text, result):
+        """Record one analysis, evicting the oldest when full."""
+        if self.size == self.capacity:
+            self._evict()
+        slot = (self.start + self.size) % self.capacity
+        self.timestamps[slot] = np.datetime64(timestamp, 'us')
+        self.sentiments[slot] = result['overall_sentiment']
+        self.risks[slot] = RISK_LEVELS.index(result['risk_level'])
+        self.entries[slot] = {'timestamp': timestamp, 'text': text, 'result': result}
+
+        self.size += 1
+        self.total += 1
+        self.risk_counts[result['risk_level']] += 1
+        self.sentiment_sum += result['overall_sentiment']
+        self.version += 1
+
+    def _evict(self):
+        """Remove the oldest analysis from the buffer and the aggregates."""
+        self.risk_counts[RISK_LEVELS[self.risks[self.start]]] -= 1
+        self.sentiment_sum -= self.sentiments[self.start]
+        self.entries[self.start] = None
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+
+    def mean_sentiment(self):
+        """Mean sentiment of the analyses held, 0 when empty."""
+        return self.sentiment_sum / self.size if self.size else 0.0
+
+    def recent(self, count):
+        """Up to count newest analyses, newest first, as (number, entry) pairs."""
+        return [(self.total - offset, self.entries[(self.start + self.size - 1 - offset) % self.capacity])
+                for offset in range(min(count, self.size))]
+
+    def _ordered(self, column):
+        """Column values held, oldest first."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return column[self.start:end]
+        return np.concatenate((column[self.start:], column[:end - self.capacity]))
+
+    def series(self, max_points=None):
+        """(timestamps, sentiments) oldest first, LTTB-downsampled to max_points if longer."""
+        timestamps = self._ordered(self.timestamps)
+        sentiments = self._ordered(self.sentiments)
+        if max_points is not None and self.size > max_points:
+            kept = lttb(timestamps.astype(np.int64), sentiments, max_points)
+            timestamps, sentiments = timestamps[kept], sentiments[kept]
+        return timestamps, sentiments
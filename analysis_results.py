@@ -0,0 +1,200 @@
+import numpy as np
+
+TEXTBLOB_FIELDS = ('polarity', 'subjectivity')
+VADER_FIELDS = ('compound', 'positive', 'negative', 'neutral')
+
+
+class AnalysisResult:
+    """Compact, typed form of one ``analyze_text`` result.
+
+    Scores are plain attributes, emotions a tuple in ``emotion_names``
+    order and the detailed scores tuples (or None when the mode skipped that
+    model); the strings are shared with the analyzer's tables. ``to_dict``
+    gives back exactly the dict ``analyze_text`` returns.
+    """
+
+    __slots__ = ('mode', 'overall_sentiment', 'emotion_intensity', 'confidence', 'risk_level',
+                 'risk_description', 'mental_health_keywords', 'positive_keywords', 'emotion_names',
+                 'emotions', 'textblob', 'vader')
+
+    def __init__(self, mode, overall_sentiment, emotion_intensity, confidence, risk_level, risk_description,
+                 mental_health_keywords, positive_keywords, emotion_names, emotions, textblob=None, vader=None):
+        self.mode = mode
+        self.overall_sentiment = overall_sentiment
+        self.emotion_intensity = emotion_intensity
+        self.confidence = confidence
+        self.risk_level = risk_level
+        self.risk_description = risk_description
+        self.mental_health_keywords = mental_health_keywords
+        self.positive_keywords = positive_keywords
+        self.emotion_names = emotion_names
+        self.emotions = emotions
+        self.textblob = textblob
+        self.vader = vader
+
+    @classmethod
+    def from_dict(cls, result):
+        """Build a compact result from an ``analyze_text`` dict."""
+        scores = result['detailed_scores']
+        return cls(
+            result['mode'], result['overall_sentiment'], result['emotion_intensity'], result['confidence'],
+            result['risk_level'], result['risk_description'],
+            tuple(result['mental_health_keywords']), tuple(result['positive_keywords']),
+            tuple(result['emotions']), tuple(result['emotions'].values()),
+            tuple(scores['textblob'][field] for field in TEXTBLOB_FIELDS) if scores['textblob'] else None,
+            tuple(scores['vader'][field] for field in VADER_FIELDS) if scores['vader'] else None
+        )
+
+    def to_dict(self):
+        """Return the result in ``analyze_text``'s dict form."""
+        return {
+            'mode': self.mode,
+            'overall_sentiment': self.overall_sentiment,
+            'emotion_intensity': self.emotion_intensity,
+            'confidence': self.confidence,
+            'risk_level': self.risk_level,
+            'risk_description': self.risk_description,
+            'mental_health_keywords': list(self.mental_health_keywords),
+            'positive_keywords': list(self.positive_keywords),
+            'emotions': dict(zip(self.emotion_names, self.emotions)),
+            'detailed_scores': {
+                'textblob': dict(zip(TEXTBLOB_FIELDS, self.textblob)) if self.textblob is not None else None,
+                'vader': dict(zip(VADER_FIELDS, self.vader)) if self.vader is not None else None
+            }
+        }
+
+
+class ResultBatch:
+    """Struct-of-arrays container for many analysis results.
+
+    Scores live in NumPy float64 columns (NaN where a mode skipped a model),
+    risk levels and modes in int8 columns of codes into ``risk_levels`` and
+    ``modes``, and keyword lists as tuples. Rows without a result, for
+    empty texts, have risk code -1; rows that failed also have an entry in
+    ``errors``. ``batch[i]`` is an ``AnalysisResult`` (or None) and
+    ``to_dicts`` gives back the dicts ``analyze_batch`` returned.
+    """
+
+    def __init__(self, size, emotion_names, risk_levels, modes):
+        """Allocate columns for size rows, all initially without a result.
+
+        ``risk_levels`` is the analyzer's list of (level, description).
+        """
+        self.emotion_names = tuple(emotion_names)
+        self.risk_levels = list(risk_levels)
+        self.modes = tuple(modes)
+        self._risk_codes = {level: code for code, (level, _) in enumerate(self.risk_levels)}
+        self._mode_codes = {mode: code for code, mode in enumerate(self.modes)}
+
+        self.overall_sentiment = np.full(size, np.nan)
+        self.emotion_intensity = np.full(size, np.nan)
+        self.confidence = np.full(size, np.nan)
+        self.emotions = np.full((size, len(self.emotion_names)), np.nan)
+        self.textblob = np.full((size, len(TEXTBLOB_FIELDS)), np.nan)
+        self.vader = np.full((size, len(VADER_FIELDS)), np.nan)
+        self.risk = np.full(size, -1, dtype=np.int8)
+        self.mode = np.full(size, -1, dtype=np.int8)
+        self.mental_health_keywords = [()] * size
+        self.positive_keywords = [()] * size
+        self.errors = {}
+
+    @classmethod
+    def from_results(cls, results, emotion_names, risk_levels, modes):
+        """Pack a list of result dicts, Nones and exceptions."""
+        batch = cls(len(results), emotion_names, risk_levels, modes)
+        for index, result in enumerate(results):
+            batch.set(index, result)
+        return batch
+
+    def __len__(self):
+        return len(self.risk)
+
+    def set(self, index, result):
+        """Store a result dict, None or exception at row index."""
+        if result is None:
+            return
+        if isinstance(result, Exception):
+            self.errors[index] = str(result)
+            return
+
+        self.overall_sentiment[index] = result['overall_sentiment']
+        self.emotion_intensity[index] = result['emotion_intensity']
+        self.confidence[index] = result['confidence']
+        self.emotions[index] = [result['emotions'][name] for name in self.emotion_names]
+        scores = result['detailed_scores']
+        if scores['textblob'] is not None:
+            self.textblob[index] = [scores['textblob'][field] for field in TEXTBLOB_FIELDS]
+        if scores['vader'] is not None:
+            self.vader[index] = [scores['vader'][field] for field in VADER_FIELDS]
+        self.risk[index] = self._risk_codes[result['risk_level']]
+        self.mode[index] = self._mode_codes[result['mode']]
+        self.mental_health_keywords[index] = tuple(result['mental_health_keywords'])
+        self.positive_keywords[index] = tuple(result['positive_keywords'])
+
+    def __getitem__(self, index):
+        """Row index as an AnalysisResult, or None if it has no result."""
+        if self.risk[index] < 0:
+            return None
+        risk_level, risk_description = self.risk_levels[self.risk[index]]
+        textblob = None if np.isnan(self.textblob[index, 0]) else tuple(self.textblob[index].tolist())
+        vader = None if np.isnan(self.vader[index, 0]) else tuple(self.vader[index].tolist())
+        return AnalysisResult(
+            self.modes[self.mode[index]], float(self.overall_sentiment[index]),
+            float(self.emotion_intensity[index]), float(self.confidence[index]), risk_level, risk_description,
+            self.mental_health_keywords[index], self.positive_keywords[index],
+            self.emotion_names, tuple(self.emotions[index].tolist()), textblob, vader
+        )
+
+    def to_dicts(self):
+        """Every row as an ``analyze_text`` dict, None, or the error message of a failed row."""
+        rows = []
+        for index in range(len(self)):
+            result = self[index]
+            rows.append(result.to_dict() if result is not None else self.errors.get(index))
+        return rows
+
+    def succeeded(self):
+        """Indices of rows with a result."""
+        return np.flatnonzero(self.risk >= 0)
+
+    def risk_distribution(self):
+        """Count of results per risk level."""
+        counts = np.bincount(self.risk[self.risk >= 0], minlength=len(self.risk_levels))
+        return {level: int(count) for (level, _), count in zip(self.risk_levels, counts)}
+
+    def average_sentiment(self):
+        """Mean overall sentiment of the rows with a result, 0 if there are none."""
+        rows = self.succeeded()
+        # Summed in row order, so the mean matches the row-format summary exactly
+        return sum(self.overall_sentiment[rows].tolist()) / len(rows) if len(rows) else 0
+
+    def columns(self, rows=None):
+        """Columns for the given rows (default: every row with a result).
+
+        Numeric columns are NumPy arrays, handed to the serializer as they
+        are (see ``serializers``), with NaN for missing scores. Risk levels
+        and modes are codes into the ``risk_levels`` and ``modes`` legends
+        returned alongside.
+        """
+        rows = self.succeeded() if rows is None else np.asarray(rows, dtype=int)
+        columns = {
+            'index': rows,
+            'mode': self.mode[rows],
+            'risk_level': self.risk[rows],
+            'overall_sentiment': self.overall_sentiment[rows],
+            'emotion_intensity': self.emotion_intensity[rows],
+            'confidence': self.confidence[rows],
+            'mental_health_keywords': [self.mental_health_keywords[row] for row in rows],
+            'positive_keywords': [self.positive_keywords[row] for row in rows],
+            'emotions': {name: self.emotions[rows, column]
+                         for column, name in enumerate(self.emotion_names)}
+        }
+        for column, field in enumerate(TEXTBLOB_FIELDS):
+            columns[f'textblob_{field}'] = self.textblob[rows, column]
+        for column, field in enumerate(VADER_FIELDS):
+            columns[f'vader_{field}'] = self.vader[rows, column]
+        return {
+            'risk_levels': [level for level, _ in self.risk_levels],
+            'modes': list(self.modes),
+            'columns': columns
+        }
@@ -1,12 +1,24 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, stream_with_context
 from flask_cors import CORS
-import json
-from datetime import datetime
+import os
+import threading
+import time
+from datetime import datetime, timezone
 import logging
 
 from sentiment_analyzer import SentimentAnalyzer
+from batch_engine import ParallelBatchEngine
+from metrics import MetricsRegistry, PROMETHEUS_CONTENT_TYPE, SIZE_BUCKETS
+from static_payload import StaticPayload
+from resource_index import ResourceIndex
+from geo_index import FacilityLocator
+from analysis_results import ResultBatch
+from single_flight import SingleFlight
+from rate_limiter import MemoryBackend, RateLimiter, RedisBackend
+from serializers import JSONSerializer, for_content_type, negotiate
 from mental_health_resources import get_mental_health_resources
 from crisis_resources import get_crisis_resources, get_safety_planning_resources
+import kenya_mental_health_resources
 from kenya_mental_health_resources import (
     get_kenya_mental_health_resources,
     get_kenya_crisis_resources,
@@ -15,55 +27,362 @@ from kenya_mental_health_resources import (
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Enable CORS for all routes, letting browsers read the rate limit headers
+CORS(app, expose_headers=['RateLimit-Policy', 'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset',
+                          'Retry-After'])
+
+# Initialize sentiment analyzer with an in-memory result cache for repeated texts
+analyzer_options = {
+    'cache_size': int(os.environ.get('WELLNET_CACHE_SIZE', '1024')),
+    'cache_max_bytes': int(os.environ['WELLNET_CACHE_MAX_BYTES']) if os.environ.get('WELLNET_CACHE_MAX_BYTES') else None,
+    'cache_ttl': float(os.environ['WELLNET_CACHE_TTL']) if os.environ.get('WELLNET_CACHE_TTL') else None,
+    'enable_spacy': os.environ.get('WELLNET_ENABLE_SPACY', '1') != '0',
+    'lexicon_store': os.environ.get('WELLNET_LEXICON_STORE') or None
+}
+analyzer = SentimentAnalyzer(**analyzer_options)
+
+# Batch analysis runs on a pool of worker processes, each with its own analyzer
+batch_engine = ParallelBatchEngine(
+    analyzer,
+    workers=int(os.environ['WELLNET_BATCH_WORKERS']) if os.environ.get('WELLNET_BATCH_WORKERS') else None,
+    chunk_size=int(os.environ.get('WELLNET_BATCH_CHUNK_SIZE', '8')),
+    serial_threshold=int(os.environ.get('WELLNET_BATCH_SERIAL_THRESHOLD', '16')),
+    analyzer_options=analyzer_options
+)
+
+# When true, /api/analyze runs each text on the batch engine's worker processes
+# instead of in the request thread; the async server turns this on so analyses
+# never compete with its event loop and cheap routes for the GIL. Only then is a
+# single text scheduled ahead of batch chunks: otherwise it runs in its request
+# thread alongside whatever batches are in progress
+offload_single_analysis = False
+
+# Identical /api/analyze requests that arrive while one is still being analyzed
+# wait for it and share its result instead of each running their own
+coalescer = SingleFlight() if os.environ.get('WELLNET_COALESCE', '1') != '0' else None
+
+# Per-client token buckets for the analysis endpoints, charged one token per
+# text. Off unless WELLNET_RATE_LIMIT is set; with several worker processes,
+# WELLNET_RATE_LIMIT_REDIS_URL makes them share one set of buckets
+if os.environ.get('WELLNET_RATE_LIMIT', '0') != '0':
+    rate_limiter = RateLimiter(
+        int(os.environ['WELLNET_RATE_LIMIT']),
+        window=float(os.environ.get('WELLNET_RATE_LIMIT_WINDOW', '60')),
+        backend=(RedisBackend(url=os.environ['WELLNET_RATE_LIMIT_REDIS_URL'])
+                 if os.environ.get('WELLNET_RATE_LIMIT_REDIS_URL') else MemoryBackend())
+    )
+else:
+    rate_limiter = None
+
+# Metrics for /api/metrics; with WELLNET_METRICS=0 no hooks are installed at all
+if os.environ.get('WELLNET_METRICS', '1') != '0':
+    metrics = MetricsRegistry()
+    stage_duration = metrics.histogram(
+        'wellnet_analysis_stage_duration_seconds', 'Time spent in each analysis stage.', ['stage'])
+    request_duration = metrics.histogram(
+        'wellnet_http_request_duration_seconds', 'Request latency by endpoint.', ['method', 'endpoint', 'status'])
+    request_size = metrics.histogram(
+        'wellnet_http_request_size_bytes', 'Request body size by endpoint.', ['method', 'endpoint'], SIZE_BUCKETS)
+    response_size = metrics.histogram(
+        'wellnet_http_response_size_bytes', 'Response body size by endpoint.', ['method', 'endpoint'], SIZE_BUCKETS)
+    risk_level_counter = metrics.counter(
+        'wellnet_risk_level_total', 'Analysis results by risk level.', ['level'])
+    coalesced_counter = metrics.counter(
+        'wellnet_coalesced_requests_total', 'Analysis requests that shared an identical in-flight analysis.')
+    rate_limited_counter = metrics.counter(
+        'wellnet_rate_limited_requests_total', 'Requests refused by the per-client rate limit.', ['endpoint'])
+
+    def observe_stage(stage, seconds):
+        # Warm-up analyses are not real traffic; requests served meanwhile still count
+        if not getattr(warming_up, 'active', False):
+            stage_duration.observe(seconds, stage)
+
+    analyzer.enable_stage_timing(observe_stage)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_duration.observe(time.perf_counter() - g.request_start,
+                                 request.method, endpoint, str(response.status_code))
+        if request.content_length is not None:
+            request_size.observe(request.content_length, request.method, endpoint)
+        # Streamed responses have no length up front
+        if response.content_length is not None:
+            response_size.observe(response.content_length, request.method, endpoint)
+        return response
+else:
+    metrics = None
+    observe_stage = None
+
+
+def record_risk_level(risk_level, count=1):
+    """Count analysis results by risk level for /api/metrics."""
+    if metrics is not None and count:
+        risk_level_counter.inc(risk_level, amount=count)
 
-# Initialize sentiment analyzer
-analyzer = SentimentAnalyzer()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def respond(document):
+    """Encode document in the format the Accept header prefers: JSON by default, MessagePack on request."""
+    mimetype, serializer = negotiate(request.accept_mimetypes)
+    response = Response(serializer.dumps(document), content_type=mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def request_data():
+    """The decoded request body, JSON or any other format a serializer is registered for."""
+    serializer = for_content_type(request.mimetype)
+    if serializer is None:
+        return request.get_json()
+    return serializer.loads(request.get_data())
+
+
+def client_identity():
+    """Who a request is charged to: its X-API-Key, or else its address."""
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        return f'key:{api_key}'
+    return f'ip:{request.remote_addr}'
+
+
+def rate_limit(cost=1):
+    """Charge the client cost texts; return a 429 response if its bucket is short, else None.
+
+    A request costing more than the whole limit could never be allowed, so
+    it is refused with 413 and nothing is charged. The decision is kept for
+    ``add_rate_limit_headers``, so every answer to a charged request carries
+    the client's RateLimit headers.
+    """
+    if rate_limiter is None:
+        return None
+    if cost > rate_limiter.limit:
+        return respond({
+            'error': f'This request analyzes {cost} texts, more than the rate limit of {rate_limiter.limit} '
+                     f'per {rate_limiter.window:g} seconds; split it into smaller batches',
+            'status': 'error'
+        }), 413
+    decision = g.rate_limit = rate_limiter.take(client_identity(), cost)
+    if decision.allowed:
+        return None
+
+    if metrics is not None:
+        rate_limited_counter.inc(request.url_rule.rule)
+    return respond({
+        'error': 'Rate limit exceeded, please retry later',
+        'status': 'error',
+        'retry_after_seconds': decision.retry_after
+    }), 429
+
+
+@app.after_request
+def add_rate_limit_headers(response):
+    """Add RateLimit headers, and Retry-After when refused, to responses of charged requests."""
+    decision = g.get('rate_limit')
+    if decision is not None:
+        response.headers.update(rate_limiter.headers(decision))
+    return response
+
+
+# Warm-up state reported by /api/health/ready; warm_up() fills it in, and a
+# preforking launcher adds how long each worker took from fork to ready
+readiness = {'warmed_up': False, 'warm_up_ms': None, 'fork_to_ready_ms': None}
+
+# Set on the thread running warm_up, so its stage timings are not recorded
+warming_up = threading.local()
+
+WARM_UP_TEXT = "Kuna stress sana with this economy. I don't know how to cope anymore. Nimechoka, but my friends help."
+
+
+def warm_up(load_spacy=False):
+    """Run every analysis path once, so no real request pays for first use.
+
+    Safe to run while requests are being served: the shared analyzer is
+    not changed, warm-up analyses bypass the result cache, and only this
+    thread's stage timings are left out of the metrics. With ``load_spacy``
+    the spaCy model is loaded as well, when enabled. When /api/analyze is
+    offloaded, the batch engine's worker processes are started and warmed
+    too.
+    """
+    start = time.perf_counter()
+    warming_up.active = True
+    try:
+        if load_spacy:
+            analyzer.nlp
+        for mode in analyzer.analysis_modes:
+            analyzer.analyze_text(WARM_UP_TEXT, mode=mode, use_cache=False)
+        analyzer.analyze_long_text(WARM_UP_TEXT, use_cache=False)
+        analyzer.analyze_batch([WARM_UP_TEXT], use_cache=False)
+        analyzer.triage(WARM_UP_TEXT)
+        if offload_single_analysis:
+            batch_engine.analyze_text(WARM_UP_TEXT)
+    finally:
+        warming_up.active = False
+
+    readiness['warm_up_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    readiness['warmed_up'] = True
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
+    return respond({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'service': 'WellNet Mental Health API'
     })
 
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and answering requests."""
+    return respond({
+        'status': 'alive',
+        'timestamp': datetime.now().isoformat(),
+        'pid': os.getpid()
+    })
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once warm-up has finished, 503 until then."""
+    if not readiness['warmed_up']:
+        return respond({
+            'error': 'Warm-up has not finished',
+            'status': 'error',
+            'pid': os.getpid()
+        }), 503
+
+    return respond({
+        'status': 'ready',
+        'timestamp': datetime.now().isoformat(),
+        'pid': os.getpid(),
+        'warm_up_ms': readiness['warm_up_ms'],
+        'fork_to_ready_ms': readiness['fork_to_ready_ms']
+    })
+
+
+@app.route('/api/stats', methods=['GET'])
+def service_stats():
+    """Runtime statistics: analysis cache, request coalescing, rate limiting and worker scheduling counters."""
+    return respond({
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'cache': analyzer.cache.stats() if analyzer.cache else {'enabled': False},
+        'coalescing': coalescer.stats() if coalescer else {'enabled': False},
+        'rate_limiting': rate_limiter.stats() if rate_limiter else {'enabled': False},
+        'scheduling': batch_engine.scheduler.stats()
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings, request latency and sizes, and risk levels in Prometheus text format."""
+    if metrics is None:
+        return respond({
+            'error': 'Metrics are disabled',
+            'status': 'error'
+        }), 404
+
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def run_analysis(text, mode, long_text):
+    """Analyze one text the way /api/analyze is configured to."""
+    if offload_single_analysis:
+        return batch_engine.analyze_text(text, mode=mode, observer=observe_stage, long_text=long_text)
+    if long_text:
+        return analyzer.analyze_long_text(text, mode=mode)
+    return analyzer.analyze_text(text, mode=mode)
+
+
+def coalescing_key(text, mode, long_text):
+    """Key under which identical concurrent /api/analyze requests share one analysis.
+
+    Short texts are analyzed after normalization, so texts that normalize the
+    same share a key; long texts are split on the raw line breaks, so they
+    only share with exactly the same text.
+    """
+    if long_text:
+        return coalescer.key(text, f'long:{mode}')
+    # The class's own method: the instance's may be wrapped for stage timing,
+    # and building a key is not a preprocess stage of any analysis
+    return coalescer.key(SentimentAnalyzer.preprocess_text(analyzer, text), mode)
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
     """Analyze text for mental health sentiment."""
     try:
-        data = request.get_json()
+        data = request_data()
 
         if not data or 'text' not in data:
-            return jsonify({
+            return respond({
                 'error': 'Text field is required',
                 'status': 'error'
             }), 400
 
         text = data['text']
+        mode = data.get('mode', 'full')
+        long_text = data.get('long_text', False)
 
         if not text or not text.strip():
-            return jsonify({
+            return respond({
                 'error': 'Text cannot be empty',
                 'status': 'error'
             }), 400
 
+        if mode not in analyzer.analysis_modes:
+            return respond({
+                'error': f"mode must be one of: {', '.join(analyzer.analysis_modes)}",
+                'status': 'error'
+            }), 400
+
+        if not isinstance(long_text, bool):
+            return respond({
+                'error': 'long_text must be true or false',
+                'status': 'error'
+            }), 400
+
+        # An optional location is only used to point high-risk users to nearby help
+        location = None
+        if data.get('lat') is not None or data.get('lon') is not None:
+            location = parse_location(data.get('lat'), data.get('lon'))
+            if location is None:
+                return respond({
+                    'error': 'lat and lon must both be given: lat between -90 and 90, lon between -180 and 180',
+                    'status': 'error'
+                }), 400
+
+        limited = rate_limit()
+        if limited:
+            return limited
+
         # Perform sentiment analysis
-        analysis_result = analyzer.analyze_text(text)
+        if coalescer is None:
+            analysis_result = run_analysis(text, mode, long_text)
+        else:
+            analysis_result, shared = coalescer.do(
+                coalescing_key(text, mode, long_text), lambda: run_analysis(text, mode, long_text))
+            if shared and metrics is not None:
+                coalesced_counter.inc()
 
         if not analysis_result:
-            return jsonify({
+            return respond({
                 'error': 'Analysis failed',
                 'status': 'error'
             }), 500
 
+        record_risk_level(analysis_result['risk_level'])
+
         # Add metadata
         response_data = {
             'status': 'success',
@@ -72,91 +391,263 @@ def analyze_text():
             'input_length': len(text),
             'recommendations': generate_recommendations(analysis_result['risk_level'])
         }
+        if location is not None and analysis_result['risk_level'] == 'High':
+            response_data['nearest_help'] = facility_locator.nearest(*location, k=NEAREST_DEFAULT_K)
 
         logger.info(
             f"Analysis completed for text length: {len(text)}, Risk: {analysis_result['risk_level']}")
 
-        return jsonify(response_data)
+        return respond(response_data)
 
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
-        return jsonify({
+        return respond({
             'error': 'Internal server error',
             'status': 'error'
         }), 500
 
 
-@app.route('/api/resources/crisis', methods=['GET'])
-def get_crisis_help():
-    """Get crisis intervention resources - Kenya focused."""
+@app.route('/api/triage', methods=['POST'])
+def triage_text():
+    """Risk level only, for ordering a queue of posts; never lower than /api/analyze gives."""
     try:
-        crisis_resources = get_kenya_crisis_resources()
+        data = request_data()
 
-        return jsonify({
+        if not data or 'text' not in data:
+            return respond({
+                'error': 'Text field is required',
+                'status': 'error'
+            }), 400
+
+        text = data['text']
+
+        if not text or not text.strip():
+            return respond({
+                'error': 'Text cannot be empty',
+                'status': 'error'
+            }), 400
+
+        limited = rate_limit()
+        if limited:
+            return limited
+
+        return respond({
             'status': 'success',
-            'timestamp': datetime.now().isoformat(),
-            'country': 'Kenya',
-            'resources': crisis_resources
+            'risk_level': analyzer.triage(text)
         })
 
     except Exception as e:
-        logger.error(f"Crisis resources error: {str(e)}")
-        return jsonify({
-            'error': 'Failed to retrieve crisis resources',
+        logger.error(f"Triage error: {str(e)}")
+        return respond({
+            'error': 'Internal server error',
             'status': 'error'
         }), 500
 
 
-@app.route('/api/resources/mental-health', methods=['GET'])
-def get_mental_health_help():
-    """Get mental health resources - Kenya focused."""
-    try:
-        resources = get_kenya_mental_health_resources()
+# How long clients may reuse a resource response before revalidating it
+RESOURCE_MAX_AGE = int(os.environ.get('WELLNET_RESOURCE_MAX_AGE', '3600'))
+
 
-        return jsonify({
+def build_resource_payloads():
+    """Encode every resource endpoint's response once.
+
+    The timestamp is when the resource data last changed, so responses, and
+    their ETags, stay the same from request to request and across processes.
+    """
+    updated = int(os.path.getmtime(kenya_mental_health_resources.__file__))
+
+    def payload(resources):
+        return StaticPayload({
             'status': 'success',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.fromtimestamp(updated).isoformat(),
             'country': 'Kenya',
             'resources': resources
-        })
+        }, last_modified=datetime.fromtimestamp(updated, timezone.utc))
 
-    except Exception as e:
-        logger.error(f"Mental health resources error: {str(e)}")
-        return jsonify({
-            'error': 'Failed to retrieve mental health resources',
-            'status': 'error'
-        }), 500
+    return {
+        'crisis': payload(get_kenya_crisis_resources()),
+        'mental-health': payload(get_kenya_mental_health_resources()),
+        'safety-planning': payload(get_kenya_safety_planning_resources())
+    }
+
+
+resource_payloads = build_resource_payloads()
+resource_index = ResourceIndex()
+facility_locator = FacilityLocator(resource_index.records)
+
+# Page size limits for /api/resources/search
+SEARCH_DEFAULT_PER_PAGE = 10
+SEARCH_MAX_PER_PAGE = 50
+
+# Facilities returned by /api/resources/nearest, and inline for high-risk analyses
+NEAREST_DEFAULT_K = 3
+NEAREST_MAX_K = 20
+
+
+def parse_location(lat, lon):
+    """Return (lat, lon) as floats, or None unless both are valid coordinates."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def static_payload_response(payload):
+    """Serve a precomputed payload, gzipped when accepted, or 304 if the client has it."""
+    body, etag = payload.variant(request.accept_encodings['gzip'] > 0)
+
+    if payload.matches(request.if_none_match):
+        response = Response(status=304)
+    else:
+        response = Response(body, content_type='application/json')
+        if etag == payload.gzip_etag:
+            response.headers['Content-Encoding'] = 'gzip'
+
+    response.set_etag(etag)
+    response.last_modified = payload.last_modified
+    response.headers['Cache-Control'] = f'public, max-age={RESOURCE_MAX_AGE}'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/api/resources/crisis', methods=['GET'])
+def get_crisis_help():
+    """Get crisis intervention resources - Kenya focused."""
+    return static_payload_response(resource_payloads['crisis'])
+
+
+@app.route('/api/resources/mental-health', methods=['GET'])
+def get_mental_health_help():
+    """Get mental health resources - Kenya focused."""
+    return static_payload_response(resource_payloads['mental-health'])
 
 
 @app.route('/api/resources/safety-planning', methods=['GET'])
 def get_safety_help():
     """Get safety planning resources - Kenya focused."""
+    return static_payload_response(resource_payloads['safety-planning'])
+
+
+@app.route('/api/resources/search', methods=['GET'])
+def search_resources():
+    """Search Kenya resources by location, type, category, language and keywords."""
+    args = request.args
+
+    county = region = None
+    if args.get('county'):
+        county = resource_index.resolve_county(args['county'])
+        if county is None:
+            return respond({
+                'error': f"Unknown county: {args['county']}",
+                'status': 'error'
+            }), 400
+    if args.get('region'):
+        region = resource_index.resolve_region(args['region'])
+        if region is None:
+            return respond({
+                'error': f"Unknown region: {args['region']}",
+                'status': 'error'
+            }), 400
+
+    resource_type = args.get('type') or None
+    if resource_type is not None and resource_type not in resource_index.by_type:
+        return respond({
+            'error': f"type must be one of: {', '.join(resource_index.by_type)}",
+            'status': 'error'
+        }), 400
+
+    toll_free = args.get('toll_free')
+    if toll_free is not None:
+        if toll_free.lower() not in ('true', 'false', '1', '0'):
+            return respond({
+                'error': 'toll_free must be true or false',
+                'status': 'error'
+            }), 400
+        toll_free = toll_free.lower() in ('true', '1')
+
     try:
-        safety_resources = get_kenya_safety_planning_resources()
+        page = int(args.get('page', 1))
+        per_page = int(args.get('per_page', SEARCH_DEFAULT_PER_PAGE))
+    except ValueError:
+        page = per_page = 0
+    if page < 1 or not 1 <= per_page <= SEARCH_MAX_PER_PAGE:
+        return respond({
+            'error': f'page must be at least 1 and per_page between 1 and {SEARCH_MAX_PER_PAGE}',
+            'status': 'error'
+        }), 400
 
-        return jsonify({
-            'status': 'success',
-            'timestamp': datetime.now().isoformat(),
-            'country': 'Kenya',
-            'resources': safety_resources
-        })
+    matches = resource_index.search(
+        county=county,
+        region=region,
+        resource_type=resource_type,
+        category=args.get('category') or None,
+        language=args.get('language') or None,
+        toll_free=toll_free,
+        q=args.get('q')
+    )
+    start = (page - 1) * per_page
 
-    except Exception as e:
-        logger.error(f"Safety planning resources error: {str(e)}")
-        return jsonify({
-            'error': 'Failed to retrieve safety planning resources',
+    return respond({
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'country': 'Kenya',
+        'query': {
+            'county': county,
+            'region': region or (resource_index.county_region[county] if county else None),
+            'type': resource_type,
+            'category': args.get('category') or None,
+            'language': args.get('language') or None,
+            'toll_free': toll_free,
+            'q': args.get('q') or None
+        },
+        'total': len(matches),
+        'page': page,
+        'per_page': per_page,
+        'pages': (len(matches) + per_page - 1) // per_page,
+        'results': matches[start:start + per_page]
+    })
+
+
+@app.route('/api/resources/nearest', methods=['GET'])
+def nearest_resources():
+    """Nearest mental health facilities to a location, by great-circle distance."""
+    location = parse_location(request.args.get('lat'), request.args.get('lon'))
+    if location is None:
+        return respond({
+            'error': 'lat and lon are required: lat between -90 and 90, lon between -180 and 180',
             'status': 'error'
-        }), 500
+        }), 400
+
+    try:
+        k = int(request.args.get('k', NEAREST_DEFAULT_K))
+    except ValueError:
+        k = 0
+    if not 1 <= k <= NEAREST_MAX_K:
+        return respond({
+            'error': f'k must be between 1 and {NEAREST_MAX_K}',
+            'status': 'error'
+        }), 400
+
+    return respond({
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'country': 'Kenya',
+        'location': {'lat': location[0], 'lon': location[1]},
+        'results': facility_locator.nearest(*location, k=k)
+    })
 
 
 @app.route('/api/batch-analyze', methods=['POST'])
 def batch_analyze():
     """Analyze multiple texts in batch for research purposes."""
     try:
-        data = request.get_json()
+        data = request_data()
 
         if not data or 'texts' not in data:
-            return jsonify({
+            return respond({
                 'error': 'texts field is required',
                 'status': 'error'
             }), 400
@@ -164,68 +655,266 @@ def batch_analyze():
         texts = data['texts']
 
         if not isinstance(texts, list) or len(texts) > 50:  # Limit batch size
-            return jsonify({
+            return respond({
                 'error': 'texts must be a list with maximum 50 items',
                 'status': 'error'
             }), 400
 
-        results = []
-
-        for i, text in enumerate(texts):
-            if text and text.strip():
-                try:
-                    analysis_result = analyzer.analyze_text(text)
-                    if analysis_result:
-                        results.append({
-                            'index': i,
-                            'text_preview': text[:100] + "..." if len(text) > 100 else text,
-                            'analysis': analysis_result
-                        })
-                    else:
-                        results.append({
-                            'index': i,
-                            'text_preview': text[:100] + "..." if len(text) > 100 else text,
-                            'error': 'Analysis failed for this text'
-                        })
-                except Exception as e:
-                    results.append({
-                        'index': i,
-                        'text_preview': text[:100] + "..." if len(text) > 100 else text,
-                        'error': f'Analysis error: {str(e)}'
-                    })
-
-        # Generate summary statistics
-        successful_analyses = [r for r in results if 'analysis' in r]
-        risk_levels = [r['analysis']['risk_level']
-                       for r in successful_analyses]
-
-        summary = {
-            'total_texts': len(texts),
-            'successful_analyses': len(successful_analyses),
-            'failed_analyses': len(results) - len(successful_analyses),
-            'risk_distribution': {
-                'low': risk_levels.count('Low'),
-                'moderate': risk_levels.count('Moderate'),
-                'high': risk_levels.count('High')
-            },
-            'average_sentiment': sum(r['analysis']['overall_sentiment'] for r in successful_analyses) / len(successful_analyses) if successful_analyses else 0
-        }
+        response_format = request.args.get('format') or data.get('format', 'rows')
+        if response_format not in ('rows', 'columnar'):
+            return respond({
+                'error': "format must be 'rows' or 'columnar'",
+                'status': 'error'
+            }), 400
 
-        return jsonify({
-            'status': 'success',
-            'timestamp': datetime.now().isoformat(),
-            'results': results,
-            'summary': summary
-        })
+        # A batch costs as much as analyzing each of its texts on its own
+        limited = rate_limit(len(texts))
+        if limited:
+            return limited
+
+        analyses = batch_engine.analyze(texts)
+        if response_format == 'columnar':
+            return respond(columnar_batch_response(texts, analyses))
+
+        return respond(rows_batch_response(texts, analyses))
 
     except Exception as e:
         logger.error(f"Batch analysis error: {str(e)}")
-        return jsonify({
+        return respond({
             'error': 'Internal server error',
             'status': 'error'
         }), 500
 
 
+def rows_batch_response(texts, analyses):
+    """Build a row-oriented /api/batch-analyze body: one object per non-empty text."""
+    results = []
+
+    for i, (text, analysis_result) in enumerate(zip(texts, analyses)):
+        if text and text.strip():
+            if isinstance(analysis_result, Exception):
+                results.append({
+                    'index': i,
+                    'text_preview': text[:100] + "..." if len(text) > 100 else text,
+                    'error': f'Analysis error: {str(analysis_result)}'
+                })
+            elif analysis_result:
+                record_risk_level(analysis_result['risk_level'])
+                results.append({
+                    'index': i,
+                    'text_preview': text[:100] + "..." if len(text) > 100 else text,
+                    'analysis': analysis_result
+                })
+            else:
+                results.append({
+                    'index': i,
+                    'text_preview': text[:100] + "..." if len(text) > 100 else text,
+                    'error': 'Analysis failed for this text'
+                })
+
+    # Generate summary statistics
+    successful_analyses = [r for r in results if 'analysis' in r]
+    risk_levels = [r['analysis']['risk_level']
+                   for r in successful_analyses]
+
+    summary = {
+        'total_texts': len(texts),
+        'successful_analyses': len(successful_analyses),
+        'failed_analyses': len(results) - len(successful_analyses),
+        'risk_distribution': {
+            'low': risk_levels.count('Low'),
+            'moderate': risk_levels.count('Moderate'),
+            'high': risk_levels.count('High')
+        },
+        'average_sentiment': sum(r['analysis']['overall_sentiment'] for r in successful_analyses) / len(successful_analyses) if successful_analyses else 0
+    }
+
+    return {
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'results': results,
+        'summary': summary
+    }
+
+
+def columnar_batch_response(texts, analyses):
+    """Build a column-oriented /api/batch-analyze body: one list per field, not one object per text."""
+    batch = ResultBatch.from_results(analyses, analyzer.emotion_keywords, analyzer.risk_levels, analyzer.analysis_modes)
+    body = batch.columns()
+    body['columns']['text_preview'] = [
+        texts[i][:100] + "..." if len(texts[i]) > 100 else texts[i] for i in body['columns']['index']
+    ]
+
+    errors = []
+    for i, text in enumerate(texts):
+        if text and text.strip() and batch.risk[i] < 0:
+            errors.append({
+                'index': i,
+                'text_preview': text[:100] + "..." if len(text) > 100 else text,
+                'error': f'Analysis error: {batch.errors[i]}' if i in batch.errors else 'Analysis failed for this text'
+            })
+
+    risk_distribution = batch.risk_distribution()
+    for risk_level, count in risk_distribution.items():
+        record_risk_level(risk_level, count)
+
+    return dict(body, **{
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'format': 'columnar',
+        'errors': errors,
+        'summary': {
+            'total_texts': len(texts),
+            'successful_analyses': len(body['columns']['index']),
+            'failed_analyses': len(errors),
+            'risk_distribution': {level.lower(): count for level, count in risk_distribution.items()},
+            'average_sentiment': batch.average_sentiment()
+        }
+    })
+
+
+# Longest single record accepted by the streaming batch endpoint
+STREAM_MAX_LINE_BYTES = int(os.environ.get('WELLNET_STREAM_MAX_LINE_BYTES', str(1024 * 1024)))
+
+# Encodes and decodes the streaming endpoint's NDJSON lines
+json_lines = JSONSerializer()
+
+
+def iter_stream_records(stream, ndjson):
+    """Yield (index, text, error) for each line of a request body, reading incrementally.
+
+    Lines longer than STREAM_MAX_LINE_BYTES are skipped with an error rather
+    than buffered, so memory stays bounded by the line limit.
+    """
+    index = 0
+    while True:
+        line = stream.readline(STREAM_MAX_LINE_BYTES + 1)
+        if not line:
+            return
+
+        if len(line) > STREAM_MAX_LINE_BYTES and not line.endswith(b'\n'):
+            # Discard the rest of the oversized line
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(STREAM_MAX_LINE_BYTES)
+            yield index, None, f'Line exceeds {STREAM_MAX_LINE_BYTES} bytes'
+            index += 1
+            continue
+
+        text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+        if ndjson and text.strip():
+            try:
+                record = json_lines.loads(text)
+                text = record.get('text') if isinstance(record, dict) else record
+                if not isinstance(text, str):
+                    raise ValueError('record must be a string or an object with a text field')
+            except ValueError as e:
+                yield index, None, f'Invalid record: {str(e)}'
+                index += 1
+                continue
+
+        yield index, text, None
+        index += 1
+
+
+@app.route('/api/batch-analyze/stream', methods=['POST'])
+def batch_analyze_stream():
+    """Analyze a newline-delimited corpus, streaming one NDJSON result per line."""
+    ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json')
+    group_size = batch_engine.chunk_size * batch_engine.workers
+
+    # The corpus size is unknown up front: refuse a client with no tokens
+    # left now, then charge each group of records as it is read, in groups
+    # no larger than the limit so every charge can succeed
+    limited = rate_limit(0)
+    if limited:
+        return limited
+    client = client_identity()
+    if rate_limiter is not None:
+        group_size = max(1, min(group_size, rate_limiter.limit))
+
+    def analyze_group(group):
+        """Analyze buffered records and return their NDJSON result lines."""
+        texts = [text for _, text, error in group if error is None]
+        analyses = iter(batch_engine.analyze(texts))
+        for index, text, error in group:
+            if error is None:
+                analysis_result = next(analyses)
+                if not text.strip():
+                    continue
+                record = {
+                    'index': index,
+                    'text_preview': text[:100] + "..." if len(text) > 100 else text
+                }
+                if isinstance(analysis_result, Exception):
+                    record['error'] = f'Analysis error: {str(analysis_result)}'
+                elif analysis_result:
+                    record_risk_level(analysis_result['risk_level'])
+                    record['analysis'] = analysis_result
+                else:
+                    record['error'] = 'Analysis failed for this text'
+            else:
+                record = {'index': index, 'error': error}
+            yield record
+
+    def generate():
+        """Read, analyze and emit records group by group, keeping only running totals."""
+        total = successful = failed = 0
+        sentiment_sum = 0.0
+        risk_distribution = {'low': 0, 'moderate': 0, 'high': 0}
+
+        try:
+            records = iter_stream_records(request.stream, ndjson)
+            while True:
+                group = []
+                for record in records:
+                    group.append(record)
+                    if len(group) >= group_size:
+                        break
+                if not group:
+                    break
+
+                if rate_limiter is not None:
+                    decision = rate_limiter.take(client, sum(1 for _, _, error in group if error is None))
+                    if not decision.allowed:
+                        if metrics is not None:
+                            rate_limited_counter.inc(request.url_rule.rule)
+                        yield json_lines.dumps({
+                            'status': 'error',
+                            'error': f'Rate limit exceeded after {total} records, please retry later',
+                            'retry_after_seconds': decision.retry_after
+                        })
+                        return
+
+                total += len(group)
+                for result in analyze_group(group):
+                    if 'analysis' in result:
+                        successful += 1
+                        sentiment_sum += result['analysis']['overall_sentiment']
+                        risk_distribution[result['analysis']['risk_level'].lower()] += 1
+                    else:
+                        failed += 1
+                    yield json_lines.dumps(result)
+
+        except Exception as e:
+            logger.error(f"Streaming batch analysis error: {str(e)}")
+            yield json_lines.dumps({'status': 'error', 'error': 'Internal server error'})
+            return
+
+        yield json_lines.dumps({
+            'status': 'success',
+            'timestamp': datetime.now().isoformat(),
+            'summary': {
+                'total_texts': total,
+                'successful_analyses': successful,
+                'failed_analyses': failed,
+                'risk_distribution': risk_distribution,
+                'average_sentiment': sentiment_sum / successful if successful else 0
+            }
+        })
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 def generate_recommendations(risk_level):
     """Generate appropriate recommendations based on risk level."""
     recommendations = {
@@ -291,21 +980,60 @@ def api_documentation():
                 'description': 'Health check endpoint',
                 'response': 'JSON with service status'
             },
+            '/api/health/live': {
+                'method': 'GET',
+                'description': 'Liveness probe: the process is up',
+                'response': 'JSON with status and process id'
+            },
+            '/api/health/ready': {
+                'method': 'GET',
+                'description': 'Readiness probe: 503 until warm-up has finished',
+                'response': 'JSON with warm-up time and, under the preforking launcher, time from fork to ready'
+            },
+            '/api/stats': {
+                'method': 'GET',
+                'description': 'Service statistics (analysis cache hits, misses and evictions; coalesced requests; rate limit decisions; worker slots by priority)',
+                'response': 'JSON with runtime counters'
+            },
+            '/api/metrics': {
+                'method': 'GET',
+                'description': 'Per-stage analysis timings, request latency and sizes, and risk level counts',
+                'response': 'Prometheus text exposition format'
+            },
             '/api/analyze': {
                 'method': 'POST',
                 'description': 'Analyze text for mental health sentiment',
                 'body': {
-                    'text': 'string (required) - Text to analyze'
+                    'text': 'string (required) - Text to analyze',
+                    'mode': "string (optional) - 'full' (default), 'fast' (skips TextBlob) or 'keywords-only'",
+                    'long_text': 'boolean (optional) - score the text in sentence windows and report the highest-risk one; stops at the first high-risk window',
+                    'lat': 'number (optional) - latitude, used only to list nearby help for high-risk results',
+                    'lon': 'number (optional) - longitude, given together with lat'
                 },
-                'response': 'JSON with sentiment analysis results'
+                'response': 'JSON with sentiment analysis results, including the mode used (per-window scores and max_risk_window with long_text), and nearest_help for high-risk results when a location is given'
+            },
+            '/api/triage': {
+                'method': 'POST',
+                'description': 'Risk level only, for ordering posts under load; High exactly when /api/analyze gives High, and never a lower level than it gives',
+                'body': {
+                    'text': 'string (required) - Text to triage'
+                },
+                'response': 'JSON with risk_level'
             },
             '/api/batch-analyze': {
                 'method': 'POST',
                 'description': 'Analyze multiple texts in batch (max 50)',
                 'body': {
-                    'texts': 'array of strings (required) - Texts to analyze'
+                    'texts': 'array of strings (required) - Texts to analyze',
+                    'format': "string (optional, also accepted as ?format=) - 'rows' (default) or 'columnar'"
                 },
-                'response': 'JSON with batch analysis results and summary'
+                'response': 'JSON with batch analysis results and summary; columnar responses hold one array per field, with risk_level and mode as codes into the risk_levels and modes lists'
+            },
+            '/api/batch-analyze/stream': {
+                'method': 'POST',
+                'description': 'Analyze a corpus of any size, one record per line (no item limit)',
+                'body': 'application/x-ndjson (a JSON string or {"text": ...} per line) or text/plain (one text per line)',
+                'response': 'NDJSON stream: one result per line, then a summary line'
             },
             '/api/resources/crisis': {
                 'method': 'GET',
@@ -321,32 +1049,72 @@ def api_documentation():
                 'method': 'GET',
                 'description': 'Get safety planning resources',
                 'response': 'JSON with safety planning tools and coping strategies'
+            },
+            '/api/resources/search': {
+                'method': 'GET',
+                'description': 'Search resources; county and region filters include nationwide resources, local ones first',
+                'query': {
+                    'county': 'string (optional) - one of the 47 counties, e.g. Kisumu',
+                    'region': 'string (optional) - e.g. Coast Region, Western Kenya',
+                    'type': "string (optional) - 'crisis', 'mental-health' or 'safety-planning'",
+                    'category': 'string (optional) - e.g. immediate, regional, support_groups',
+                    'language': 'string (optional) - english, swahili or sheng',
+                    'toll_free': 'boolean (optional) - only (or no) toll-free lines',
+                    'q': 'string (optional) - words matched against titles and descriptions',
+                    'page': 'integer (optional, default 1)',
+                    'per_page': f'integer (optional, default {SEARCH_DEFAULT_PER_PAGE}, max {SEARCH_MAX_PER_PAGE})'
+                },
+                'response': 'JSON with matching resources, tagged with type and category, and paging totals'
+            },
+            '/api/resources/nearest': {
+                'method': 'GET',
+                'description': 'Nearest mental health facilities to a location',
+                'query': {
+                    'lat': 'number (required) - latitude in degrees',
+                    'lon': 'number (required) - longitude in degrees',
+                    'k': f'integer (optional, default {NEAREST_DEFAULT_K}, max {NEAREST_MAX_K}) - facilities to return'
+                },
+                'response': 'JSON with the nearest facilities and their great-circle distance_km'
             }
         },
         'usage_notes': [
-            'All endpoints return JSON responses',
+            'All endpoints return JSON responses (NDJSON for the streaming batch endpoint)',
+            'Send Accept: application/msgpack for MessagePack responses and Content-Type: application/msgpack to post MessagePack bodies, when the server has msgpack installed; resource endpoints always return JSON',
             'Error responses include error message and status',
-            'Batch analysis limited to 50 texts per request',
+            'Batch analysis limited to 50 texts per request; use /api/batch-analyze/stream for larger corpora',
             'No data is stored persistently - privacy focused',
-            'Rate limiting may apply in production'
+            'Recent results are cached in memory under a salted hash of the text; the text itself is never kept',
+            'Resource endpoints send ETag and Cache-Control headers; send If-None-Match to get 304 Not Modified, and Accept-Encoding: gzip for a compressed body',
+            'When the server sets a rate limit, analysis endpoints are limited per X-API-Key header, or per address without one: a batch costs one unit per text. Responses carry RateLimit-Policy, RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset headers; over the limit they answer 429 with Retry-After, and a stream stops with an error line; a batch larger than the whole limit answers 413',
+            'Crisis resources are never rate limited',
+            'Only when served by the async server (asgi_server.py) do /api/analyze and /api/triage run ahead of batch work under load',
+            'Under load, analysis endpoints may answer 503 with a Retry-After header; retry after that many seconds'
         ]
     }
 
-    return jsonify(docs)
+    return respond(docs)
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
+    return respond({
         'error': 'Endpoint not found',
         'status': 'error',
         'available_endpoints': [
             '/api/health',
+            '/api/health/live',
+            '/api/health/ready',
+            '/api/stats',
+            '/api/metrics',
             '/api/analyze',
+            '/api/triage',
             '/api/batch-analyze',
+            '/api/batch-analyze/stream',
             '/api/resources/crisis',
             '/api/resources/mental-health',
             '/api/resources/safety-planning',
+            '/api/resources/search',
+            '/api/resources/nearest',
             '/api/documentation'
         ]
     }), 404
@@ -354,7 +1122,7 @@ def not_found(error):
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
+    return respond({
         'error': 'Internal server error',
         'status': 'error'
     }), 500
@@ -365,4 +1133,5 @@ if __name__ == '__main__':
     print("📋 API Documentation: http://localhost:3000/api/documentation")
     print("🚀 Server running on http://localhost:3000")
     print("🏥 Serving Kenya's 47 counties with mental health support")
+    warm_up()
     app.run(host='0.0.0.0', port=3000, debug=True)
@@ -2,14 +2,13 @@ import os
 os.environ["STREAMLIT_WATCHER_TYPE"] = "none"  # Disables file watcher to prevent reload issues
 
 import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 
 from sentiment_analyzer import SentimentAnalyzer
+from analysis_history import AnalysisHistory, RISK_LEVELS
 from mental_health_resources import get_mental_health_resources
 from crisis_resources import get_crisis_resources
 from kenya_mental_health_resources import (
@@ -27,16 +26,100 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Set WELLNET_RERUN_TIMING=1 to show how long each full or partial rerun takes
+RERUN_TIMING = os.environ.get('WELLNET_RERUN_TIMING') == '1'
+script_start = time.perf_counter()
+
 # Initialize sentiment analyzer
 @st.cache_resource
 def load_analyzer():
-    return SentimentAnalyzer()
+    return SentimentAnalyzer(enable_spacy=os.environ.get('WELLNET_ENABLE_SPACY', '1') != '0')
 
 analyzer = load_analyzer()
 
+# Analyses kept per session; older ones drop off the history and its charts
+HISTORY_CAPACITY = int(os.environ.get('WELLNET_HISTORY_CAPACITY', '500'))
+
+# Longer sentiment trends are downsampled to this many points
+TREND_MAX_POINTS = 200
+
+RISK_COLORS = {
+    'Low': '#4CAF50',
+    'Moderate': '#FF9800',
+    'High': '#F44336'
+}
+
 # Initialize session state
 if 'analysis_history' not in st.session_state:
-    st.session_state.analysis_history = []
+    st.session_state.analysis_history = AnalysisHistory(HISTORY_CAPACITY)
+
+
+# History charts are cached per (history, version): reruns that did not add
+# an analysis reuse the figures instead of rebuilding them
+@st.cache_resource(max_entries=64)
+def sentiment_trend_figure(history_uid, version, _history):
+    timestamps, sentiments = _history.series(TREND_MAX_POINTS)
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Scatter(
+        x=timestamps,
+        y=sentiments,
+        mode='lines+markers',
+        name='Sentiment Score',
+        line=dict(color='#2E86AB', width=2)
+    ))
+    
+    fig_trend.update_layout(
+        title="Sentiment Over Time",
+        xaxis_title="Time",
+        yaxis_title="Sentiment Score",
+        yaxis=dict(range=[-1, 1]),
+        height=300
+    )
+    return fig_trend
+
+
+@st.cache_resource(max_entries=64)
+def risk_distribution_figure(history_uid, version, _history):
+    levels = [level for level in RISK_LEVELS if _history.risk_counts[level]]
+    fig_risk = go.Figure(go.Pie(
+        labels=levels,
+        values=[_history.risk_counts[level] for level in levels],
+        marker=dict(colors=[RISK_COLORS[level] for level in levels])
+    ))
+    fig_risk.update_layout(title="Risk Level Distribution", height=300)
+    return fig_risk
+
+
+# Resource content never changes while the app runs: load it and build the
+# sidebar markdown once per process instead of on every rerun
+@st.cache_data
+def load_kenya_resources():
+    return get_kenya_mental_health_resources()
+
+
+@st.cache_data
+def crisis_sidebar_markdown():
+    crisis_resources = get_kenya_crisis_resources()
+    blocks = ["### Immediate Help (Msaada wa Haraka)"]
+    for resource in crisis_resources['immediate']:
+        blocks.append(f"**{resource['name']}**")
+        blocks.append(f"📞 {resource['phone']}")
+        if resource.get('text'):
+            blocks.append(f"📱 {resource['text']}")
+        blocks.append(f"🌐 [{resource['website']}]({resource['website']})")
+        blocks.append(f"*{resource['description']}*")
+        blocks.append("---")
+    
+    blocks.append("### Regional Centers")
+    for resource in crisis_resources['regional']:
+        blocks.append(f"**{resource['name']}** ({resource['region']})")
+        blocks.append(f"📞 {resource['phone']}")
+        if resource.get('address'):
+            blocks.append(f"📍 {resource['address']}")
+        blocks.append("---")
+    # One element instead of dozens; blank lines keep each block its own paragraph
+    return "\n\n".join(blocks)
+
 
 # Render header components
 render_header()
@@ -68,241 +151,201 @@ with st.expander("⚠️ Important Disclaimers and Privacy Information", expande
 # Sidebar for crisis resources
 with st.sidebar:
     st.header("🆘 Crisis Support - Kenya")
-    crisis_resources = get_kenya_crisis_resources()
-    
-    st.markdown("### Immediate Help (Msaada wa Haraka)")
-    for resource in crisis_resources['immediate']:
-        st.markdown(f"**{resource['name']}**")
-        st.markdown(f"📞 {resource['phone']}")
-        if resource.get('text'):
-            st.markdown(f"📱 {resource['text']}")
-        st.markdown(f"🌐 [{resource['website']}]({resource['website']})")
-        st.markdown(f"*{resource['description']}*")
-        st.markdown("---")
-    
-    st.markdown("### Regional Centers")
-    for resource in crisis_resources['regional']:
-        st.markdown(f"**{resource['name']}** ({resource['region']})")
-        st.markdown(f"📞 {resource['phone']}")
-        if resource.get('address'):
-            st.markdown(f"📍 {resource['address']}")
-        st.markdown("---")
-
-# Main content area
-col1, col2 = st.columns([2, 1])
+    st.markdown(crisis_sidebar_markdown())
 
-with col1:
-    st.header("📝 Text Analysis")
-    
-    # Input method selection
-    input_method = st.radio(
-        "Choose input method:",
-        ["Manual Text Input", "Sample Social Media Posts"],
-        horizontal=True
-    )
+# Main content area: a fragment, so analyzing text or clearing the history
+# reruns only these two columns and not the static sections around them
+@st.fragment
+def analysis_section():
+    fragment_start = time.perf_counter()
     
-    if input_method == "Manual Text Input":
-        text_input = st.text_area(
-            "Enter text to analyze:",
-            height=150,
-            placeholder="Share your thoughts, feelings, or any text you'd like to analyze for emotional indicators..."
-        )
-    else:
-        # Sample posts for demonstration - Kenya context
-        sample_posts = [
-            "I've been feeling really overwhelmed with life in Nairobi. Everything seems too expensive and stressful.",
-            "Had a wonderful day at Uhuru Park with my family! Feeling blessed and grateful.",
-            "Can't sleep again thinking about my job situation. I feel so alone in this big city.",
-            "Just got a new job opportunity! Hard work and prayer really pay off.",
-            "I don't see the point in anything anymore. Life feels hopeless since I moved to town.",
-            "Attending prayers at church really helped me today. Feeling more at peace.",
-            "Kuna stress sana with this economy. I don't know how to cope anymore.",
-            "Family time in shags always makes me feel better. Rural life has its peace."
-        ]
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.header("📝 Text Analysis")
         
-        selected_sample = st.selectbox(
-            "Select a sample post to analyze:",
-            [""] + sample_posts
+        # Input method selection
+        input_method = st.radio(
+            "Choose input method:",
+            ["Manual Text Input", "Sample Social Media Posts"],
+            horizontal=True
         )
-        text_input = selected_sample
-    
-    # Analysis button
-    if st.button("🔍 Analyze Text", type="primary", disabled=not text_input):
-        if text_input:
-            with st.spinner("Analyzing text for emotional indicators..."):
-                # Perform sentiment analysis
-                analysis_result = analyzer.analyze_text(text_input)
-                
-                # Store in session state
-                st.session_state.analysis_history.append({
-                    'timestamp': datetime.now(),
-                    'text': text_input[:100] + "..." if len(text_input) > 100 else text_input,
-                    'result': analysis_result
-                })
-                
-                # Display results
-                st.success("Analysis complete!")
-                
-                # Risk level indicator
-                risk_level = analysis_result['risk_level']
-                risk_colors = {
-                    'Low': '#4CAF50',
-                    'Moderate': '#FF9800', 
-                    'High': '#F44336'
-                }
-                
-                st.markdown(f"""
-                <div style="background-color: {risk_colors[risk_level]}; color: white; padding: 15px; border-radius: 10px; text-align: center; margin: 20px 0;">
-                    <h3>Risk Level: {risk_level}</h3>
-                    <p>{analysis_result['risk_description']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Detailed sentiment scores
-                st.subheader("📊 Sentiment Analysis Results")
-                
-                col_a, col_b, col_c = st.columns(3)
-                
-                with col_a:
-                    st.metric(
-                        "Overall Sentiment",
-                        f"{analysis_result['overall_sentiment']:.2f}",
-                        help="Range: -1.0 (very negative) to 1.0 (very positive)"
-                    )
-                
-                with col_b:
-                    st.metric(
-                        "Emotional Intensity",
-                        f"{analysis_result['emotion_intensity']:.2f}",
-                        help="Range: 0.0 (neutral) to 1.0 (very intense)"
+        
+        if input_method == "Manual Text Input":
+            text_input = st.text_area(
+                "Enter text to analyze:",
+                height=150,
+                placeholder="Share your thoughts, feelings, or any text you'd like to analyze for emotional indicators..."
+            )
+        else:
+            # Sample posts for demonstration - Kenya context
+            sample_posts = [
+                "I've been feeling really overwhelmed with life in Nairobi. Everything seems too expensive and stressful.",
+                "Had a wonderful day at Uhuru Park with my family! Feeling blessed and grateful.",
+                "Can't sleep again thinking about my job situation. I feel so alone in this big city.",
+                "Just got a new job opportunity! Hard work and prayer really pay off.",
+                "I don't see the point in anything anymore. Life feels hopeless since I moved to town.",
+                "Attending prayers at church really helped me today. Feeling more at peace.",
+                "Kuna stress sana with this economy. I don't know how to cope anymore.",
+                "Family time in shags always makes me feel better. Rural life has its peace."
+            ]
+            
+            selected_sample = st.selectbox(
+                "Select a sample post to analyze:",
+                [""] + sample_posts
+            )
+            text_input = selected_sample
+        
+        # Analysis button
+        if st.button("🔍 Analyze Text", type="primary", disabled=not text_input):
+            if text_input:
+                with st.spinner("Analyzing text for emotional indicators..."):
+                    # Perform sentiment analysis
+                    analysis_result = analyzer.analyze_text(text_input)
+                    
+                    # Store in session state
+                    st.session_state.analysis_history.append(
+                        datetime.now(),
+                        text_input[:100] + "..." if len(text_input) > 100 else text_input,
+                        analysis_result
                     )
-                
-                with col_c:
-                    st.metric(
-                        "Confidence Score",
-                        f"{analysis_result['confidence']:.2f}",
-                        help="Model confidence in the analysis"
+                    
+                    # Display results
+                    st.success("Analysis complete!")
+                    
+                    # Risk level indicator
+                    risk_level = analysis_result['risk_level']
+                    
+                    st.markdown(f"""
+                    <div style="background-color: {RISK_COLORS[risk_level]}; color: white; padding: 15px; border-radius: 10px; text-align: center; margin: 20px 0;">
+                        <h3>Risk Level: {risk_level}</h3>
+                        <p>{analysis_result['risk_description']}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    # Detailed sentiment scores
+                    st.subheader("📊 Sentiment Analysis Results")
+                    
+                    col_a, col_b, col_c = st.columns(3)
+                    
+                    with col_a:
+                        st.metric(
+                            "Overall Sentiment",
+                            f"{analysis_result['overall_sentiment']:.2f}",
+                            help="Range: -1.0 (very negative) to 1.0 (very positive)"
+                        )
+                    
+                    with col_b:
+                        st.metric(
+                            "Emotional Intensity",
+                            f"{analysis_result['emotion_intensity']:.2f}",
+                            help="Range: 0.0 (neutral) to 1.0 (very intense)"
+                        )
+                    
+                    with col_c:
+                        st.metric(
+                            "Confidence Score",
+                            f"{analysis_result['confidence']:.2f}",
+                            help="Model confidence in the analysis"
+                        )
+                    
+                    # Emotion breakdown
+                    st.subheader("🎭 Emotional Indicators")
+                    # Built with graph_objects: plotly.express takes ~80 ms per figure,
+                    # most of a rerun, for the same chart
+                    scores = list(analysis_result['emotions'].values())
+                    fig_emotions = go.Figure(go.Bar(
+                        x=list(analysis_result['emotions']),
+                        y=scores,
+                        marker=dict(color=scores, colorscale='RdYlGn_r', colorbar=dict(title='Score'))
+                    ))
+                    fig_emotions.update_layout(
+                        title="Detected Emotional Indicators",
+                        xaxis_title="Emotion",
+                        yaxis_title="Score",
+                        showlegend=False
                     )
-                
-                # Emotion breakdown
-                st.subheader("🎭 Emotional Indicators")
-                emotions_df = pd.DataFrame(
-                    list(analysis_result['emotions'].items()),
-                    columns=['Emotion', 'Score']
-                )
-                
-                fig_emotions = px.bar(
-                    emotions_df,
-                    x='Emotion',
-                    y='Score',
-                    title="Detected Emotional Indicators",
-                    color='Score',
-                    color_continuous_scale='RdYlGn_r'
-                )
-                fig_emotions.update_layout(showlegend=False)
-                st.plotly_chart(fig_emotions, use_container_width=True)
-                
-                # Mental health keywords
-                if analysis_result['mental_health_keywords']:
-                    st.subheader("🔍 Mental Health Indicators")
-                    keywords_text = ", ".join(analysis_result['mental_health_keywords'])
-                    st.info(f"Detected keywords: {keywords_text}")
-                
-                # Recommendations based on risk level
-                st.subheader("💡 Recommendations")
-                if risk_level == "High":
-                    st.error("""
-                    **Immediate Action Recommended:**
-                    - Consider reaching out to a mental health professional
-                    - Contact a crisis helpline if you're having thoughts of self-harm
-                    - Reach out to trusted friends, family, or support networks
-                    - Practice grounding techniques and self-care
-                    """)
-                elif risk_level == "Moderate":
-                    st.warning("""
-                    **Consider Support:**
-                    - Talk to someone you trust about how you're feeling
-                    - Consider scheduling an appointment with a counselor
-                    - Practice stress management techniques
-                    - Monitor your emotional well-being
-                    """)
-                else:
-                    st.success("""
-                    **Continue Positive Practices:**
-                    - Maintain healthy coping strategies
-                    - Stay connected with your support network
-                    - Continue activities that promote well-being
-                    - Be mindful of any changes in your emotional state
-                    """)
-
-with col2:
-    st.header("📈 Analysis History")
-    
-    if st.session_state.analysis_history:
-        # Clear history button
-        if st.button("🗑️ Clear History"):
-            st.session_state.analysis_history = []
-            st.rerun()
+                    st.plotly_chart(fig_emotions, use_container_width=True)
+                    
+                    # Mental health keywords
+                    if analysis_result['mental_health_keywords']:
+                        st.subheader("🔍 Mental Health Indicators")
+                        keywords_text = ", ".join(analysis_result['mental_health_keywords'])
+                        st.info(f"Detected keywords: {keywords_text}")
+                    
+                    # Recommendations based on risk level
+                    st.subheader("💡 Recommendations")
+                    if risk_level == "High":
+                        st.error("""
+                        **Immediate Action Recommended:**
+                        - Consider reaching out to a mental health professional
+                        - Contact a crisis helpline if you're having thoughts of self-harm
+                        - Reach out to trusted friends, family, or support networks
+                        - Practice grounding techniques and self-care
+                        """)
+                    elif risk_level == "Moderate":
+                        st.warning("""
+                        **Consider Support:**
+                        - Talk to someone you trust about how you're feeling
+                        - Consider scheduling an appointment with a counselor
+                        - Practice stress management techniques
+                        - Monitor your emotional well-being
+                        """)
+                    else:
+                        st.success("""
+                        **Continue Positive Practices:**
+                        - Maintain healthy coping strategies
+                        - Stay connected with your support network
+                        - Continue activities that promote well-being
+                        - Be mindful of any changes in your emotional state
+                        """)
+
+    with col2:
+        st.header("📈 Analysis History")
         
-        # Display recent analyses
-        for i, analysis in enumerate(reversed(st.session_state.analysis_history[-10:])):
-            with st.expander(f"Analysis {len(st.session_state.analysis_history) - i}"):
-                st.write(f"**Time:** {analysis['timestamp'].strftime('%Y-%m-%d %H:%M')}")
-                st.write(f"**Text:** {analysis['text']}")
-                st.write(f"**Risk Level:** {analysis['result']['risk_level']}")
-                st.write(f"**Sentiment:** {analysis['result']['overall_sentiment']:.2f}")
+        history = st.session_state.analysis_history
         
-        # Trend visualization
-        if len(st.session_state.analysis_history) > 1:
-            st.subheader("📊 Sentiment Trends")
-            
-            # Prepare trend data
-            timestamps = [a['timestamp'] for a in st.session_state.analysis_history]
-            sentiments = [a['result']['overall_sentiment'] for a in st.session_state.analysis_history]
-            risk_levels = [a['result']['risk_level'] for a in st.session_state.analysis_history]
-            
-            # Create trend chart
-            fig_trend = go.Figure()
-            fig_trend.add_trace(go.Scatter(
-                x=timestamps,
-                y=sentiments,
-                mode='lines+markers',
-                name='Sentiment Score',
-                line=dict(color='#2E86AB', width=2)
-            ))
-            
-            fig_trend.update_layout(
-                title="Sentiment Over Time",
-                xaxis_title="Time",
-                yaxis_title="Sentiment Score",
-                yaxis=dict(range=[-1, 1]),
-                height=300
-            )
+        if len(history):
+            # Clear history button; the callback runs before the rerun renders
+            st.button("🗑️ Clear History", on_click=history.clear)
             
-            st.plotly_chart(fig_trend, use_container_width=True)
+            # Display recent analyses
+            for number, analysis in history.recent(10):
+                with st.expander(f"Analysis {number}"):
+                    st.write(f"**Time:** {analysis['timestamp'].strftime('%Y-%m-%d %H:%M')}")
+                    st.write(f"**Text:** {analysis['text']}")
+                    st.write(f"**Risk Level:** {analysis['result']['risk_level']}")
+                    st.write(f"**Sentiment:** {analysis['result']['overall_sentiment']:.2f}")
             
-            # Risk level distribution
-            risk_counts = pd.Series(risk_levels).value_counts()
-            fig_risk = px.pie(
-                values=risk_counts.values,
-                names=risk_counts.index,
-                title="Risk Level Distribution",
-                color_discrete_map={
-                    'Low': '#4CAF50',
-                    'Moderate': '#FF9800',
-                    'High': '#F44336'
-                }
-            )
-            fig_risk.update_layout(height=300)
-            st.plotly_chart(fig_risk, use_container_width=True)
+            # Trend visualization
+            if len(history) > 1:
+                st.subheader("📊 Sentiment Trends")
+                st.metric(
+                    "Average Sentiment",
+                    f"{history.mean_sentiment():.2f}",
+                    help=f"Mean over the last {len(history)} analyses"
+                )
+                
+                st.plotly_chart(sentiment_trend_figure(history.uid, history.version, history),
+                                use_container_width=True)
+                
+                # Risk level distribution
+                st.plotly_chart(risk_distribution_figure(history.uid, history.version, history),
+                                use_container_width=True)
+        
+        else:
+            st.info("No analysis history yet. Start by analyzing some text!")
     
-    else:
-        st.info("No analysis history yet. Start by analyzing some text!")
+    if RERUN_TIMING:
+        st.caption(f"⏱️ Analysis section rendered in {(time.perf_counter() - fragment_start) * 1000:.0f} ms")
+
+
+analysis_section()
 
 # Mental Health Resources Section - Kenya Focused
 st.header("🌟 Mental Health Resources in Kenya")
 
-resources = get_kenya_mental_health_resources()
+resources = load_kenya_resources()
 
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "🏥 Professional Help", 
@@ -377,3 +420,6 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+if RERUN_TIMING:
+    st.caption(f"⏱️ Full rerun took {(time.perf_counter() - script_start) * 1000:.0f} ms")
@@ -0,0 +1,390 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import api_server
+from priority_scheduler import BATCH, INTERACTIVE
+
+# Routes that run the analyzer and so go through admission control; every
+# other route (health, resources, documentation, stats, metrics) is cheap
+ANALYSIS_PATHS = frozenset(['/api/analyze', '/api/triage', '/api/batch-analyze', '/api/batch-analyze/stream'])
+
+# Analysis routes a person is waiting on, admitted ahead of batch routes
+INTERACTIVE_PATHS = frozenset(['/api/analyze', '/api/triage'])
+
+# Analyses allowed to run at once, and how many more may wait for a slot
+MAX_CONCURRENCY = int(os.environ.get('WELLNET_ASYNC_CONCURRENCY', str(os.cpu_count() or 1)))
+MAX_QUEUE = int(os.environ.get('WELLNET_ASYNC_QUEUE_DEPTH', '32'))
+QUEUE_TIMEOUT = float(os.environ['WELLNET_ASYNC_QUEUE_TIMEOUT']) if os.environ.get('WELLNET_ASYNC_QUEUE_TIMEOUT') else None
+RETRY_AFTER_SECONDS = int(os.environ.get('WELLNET_RETRY_AFTER', '1'))
+
+# Threads for the cheap routes, kept apart from the analysis threads
+LIGHT_WORKERS = int(os.environ.get('WELLNET_ASYNC_LIGHT_WORKERS', '4'))
+
+# Run /api/analyze on the batch engine's worker processes rather than in the
+# analysis threads, so CPU-bound work never holds this process's GIL
+OFFLOAD_ANALYSIS = os.environ.get('WELLNET_ASYNC_OFFLOAD', '1') != '0'
+
+
+class AdmissionController:
+    """Bound the analyses running at once and the queue waiting behind them.
+
+    Requests beyond ``max_concurrency`` wait for a slot, interactive ones
+    ahead of batch ones and in arrival order among equals. Once
+    ``max_queue`` are already waiting, a request is refused so the caller
+    can answer 503 instead of letting latency grow without limit, unless it
+    is more urgent than the newest of the least urgent waiters, which is
+    refused in its place. So is a request that has waited longer than
+    ``queue_timeout`` seconds. Must only be used from the event loop thread.
+    """
+
+    def __init__(self, max_concurrency, max_queue, queue_timeout=None):
+        """Configure the limits."""
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._waiters = []
+        self._order = itertools.count()
+
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.displaced = 0
+        self.timed_out = 0
+
+    async def acquire(self, priority=BATCH):
+        """Wait for a slot; return 'admitted', or 'rejected' / 'timed_out' to refuse."""
+        if self.active < self.max_concurrency:
+            self.active += 1
+            self.admitted += 1
+            return 'admitted'
+
+        if self.waiting >= self.max_queue and not self._displace(priority):
+            self.rejected += 1
+            return 'rejected'
+
+        turn = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), turn))
+        self.waiting += 1
+        try:
+            outcome = await asyncio.wait_for(turn, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.waiting -= 1
+            self.timed_out += 1
+            return 'timed_out'
+        except asyncio.CancelledError:
+            if not turn.done() or turn.cancelled():
+                self.waiting -= 1
+            elif turn.result() == 'admitted':
+                # Handed a slot just as the request went away: pass it on
+                self.release()
+            raise
+
+        if outcome == 'admitted':
+            self.admitted += 1
+        else:
+            self.rejected += 1
+        return outcome
+
+    def _displace(self, priority):
+        """Refuse the newest of the least urgent waiters, if less urgent than priority; return whether one was."""
+        waiting = [waiter for waiter in self._waiters if not waiter[2].done()]
+        if not waiting:
+            return False
+        victim = max(waiting)
+        if victim[0] <= priority:
+            return False
+        self.waiting -= 1
+        self.displaced += 1
+        victim[2].set_result('rejected')
+        return True
+
+    def release(self):
+        """Free the slot taken by a successful acquire, handing it to the most urgent waiter."""
+        while self._waiters:
+            turn = heapq.heappop(self._waiters)[2]
+            # Skip waiters that timed out, went away or were displaced
+            if not turn.done():
+                self.waiting -= 1
+                turn.set_result('admitted')
+                return
+        self.active -= 1
+
+    def stats(self):
+        """Return current occupancy and counters."""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'queue_timeout_seconds': self.queue_timeout,
+            'active': self.active,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'displaced': self.displaced,
+            'timed_out': self.timed_out
+        }
+
+
+class RequestBody:
+    """Readable ``wsgi.input`` that pulls the ASGI request body on demand.
+
+    Meant to be read from an executor thread: each refill hands ``receive``
+    to the event loop and waits for the next chunk, so a streamed upload is
+    never held in memory as a whole.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    def _fill(self):
+        """Append the next body chunk to the buffer."""
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message['type'] == 'http.disconnect':
+            self._more = False
+            return
+        self._buffer += message.get('body', b'')
+        self._more = message.get('more_body', False)
+
+    def read(self, size=-1):
+        """Read up to size bytes, or everything that is left."""
+        while self._more and (size is None or size < 0 or len(self._buffer) < size):
+            self._fill()
+
+        if size is None or size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def readline(self, size=-1):
+        """Read one line, or at most size bytes of it."""
+        searched = 0
+        while True:
+            end = self._buffer.find(b'\n', searched)
+            if end >= 0:
+                end += 1
+                break
+            if not self._more or (size is not None and 0 <= size <= len(self._buffer)):
+                end = len(self._buffer)
+                break
+            searched = len(self._buffer)
+            self._fill()
+
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return data
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        # The body stream ends with the request, so Werkzeug may read it directly
+        'wsgi.input_terminated': True
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        value = value.decode('latin-1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+
+    return environ
+
+
+class AsyncAPIServer:
+    """ASGI front end for the Flask API with admission control.
+
+    Every route of ``api_server`` is served by running the Flask app in a
+    thread pool, so the two servers cannot drift apart. Analysis routes run
+    on a pool sized to the concurrency limit and are admitted by an
+    ``AdmissionController``, /api/analyze and /api/triage ahead of batch
+    routes; requests it refuses get 503 with Retry-After. Those threads
+    mostly wait on the batch engine's worker processes, where the CPU-bound
+    analysis happens. All other routes use a separate small pool, so health
+    checks and resource lookups, crisis resources among them, never queue
+    behind analyses.
+    """
+
+    def __init__(self, wsgi_app, max_concurrency=MAX_CONCURRENCY, max_queue=MAX_QUEUE,
+                 queue_timeout=QUEUE_TIMEOUT, retry_after=RETRY_AFTER_SECONDS, light_workers=LIGHT_WORKERS):
+        self.wsgi_app = wsgi_app
+        self.admission = AdmissionController(max_concurrency, max_queue, queue_timeout)
+        self.retry_after = retry_after
+        self.analysis_executor = ThreadPoolExecutor(
+            max_workers=self.admission.max_concurrency, thread_name_prefix='wellnet-analysis')
+        self.light_executor = ThreadPoolExecutor(
+            max_workers=max(1, light_workers), thread_name_prefix='wellnet-light')
+
+        if api_server.metrics is not None:
+            self._admission_counter = api_server.metrics.counter(
+                'wellnet_admission_total', 'Analysis requests by admission outcome.', ['outcome'])
+        else:
+            self._admission_counter = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] not in ANALYSIS_PATHS or scope['method'] == 'OPTIONS':
+            await self._call_wsgi(scope, receive, send, self.light_executor)
+            return
+
+        priority = INTERACTIVE if scope['path'] in INTERACTIVE_PATHS else BATCH
+        outcome = await self.admission.acquire(priority)
+        self._count_admission(outcome)
+        if outcome != 'admitted':
+            await self._send_busy(send)
+            return
+
+        try:
+            await self._call_wsgi(scope, receive, send, self.analysis_executor)
+        finally:
+            self.admission.release()
+
+    def _count_admission(self, outcome):
+        """Record an admission decision for /api/metrics."""
+        if self._admission_counter is not None:
+            self._admission_counter.inc(outcome)
+
+    async def _send_busy(self, send):
+        """Answer 503 with Retry-After without touching the Flask app."""
+        body = json.dumps({
+            'error': 'Server is busy, please retry later',
+            'status': 'error',
+            'retry_after_seconds': self.retry_after
+        }).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                (b'retry-after', str(self.retry_after).encode('latin-1')),
+                (b'access-control-allow-origin', b'*')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _call_wsgi(self, scope, receive, send, executor):
+        """Run the Flask app for one request on executor and relay its response."""
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, RequestBody(receive, loop))
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def run():
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response['start'] = {
+                    'type': 'http.response.start',
+                    'status': int(status.split(' ', 1)[0]),
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                for name, value in headers]
+                }
+
+            iterable = self.wsgi_app(environ, start_response)
+            try:
+                # Responses with a known length are small: hand them back whole
+                # and send them from the loop in one message
+                if any(name == b'content-length' for name, _ in response['start']['headers']):
+                    return response['start'], b''.join(iterable)
+
+                # Streamed responses are relayed chunk by chunk as they are produced
+                send_from_thread(response['start'])
+                for chunk in iterable:
+                    if chunk:
+                        send_from_thread({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                send_from_thread({'type': 'http.response.body', 'body': b''})
+                return None
+            finally:
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+
+        result = await loop.run_in_executor(executor, run)
+        if result is not None:
+            start, body = result
+            await send(start)
+            await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def _warm_up():
+        """Warm up the analyzer and worker processes; /api/health/ready stays 503 if this fails."""
+        try:
+            api_server.warm_up()
+        except Exception:
+            api_server.logger.exception("Warm-up failed")
+
+    async def _lifespan(self, receive, send):
+        """Handle server startup and shutdown."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Warm up in the background: liveness answers at once, readiness when it is done
+                asyncio.get_running_loop().run_in_executor(self.light_executor, self._warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.analysis_executor.shutdown(wait=False)
+                self.light_executor.shutdown(wait=False)
+                api_server.batch_engine.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+api_server.offload_single_analysis = OFFLOAD_ANALYSIS
+app = AsyncAPIServer(api_server.app)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("asgi_server needs an ASGI server: pip install uvicorn "
+                 "(or run `hypercorn asgi_server:app` with any other ASGI server)")
+
+    print("🇰🇪 Starting WellNet Kenya Mental Health API Server (async)...")
+    print("📋 API Documentation: http://localhost:3000/api/documentation")
+    print(f"⚖️ Admission control: {app.admission.max_concurrency} concurrent analyses, "
+          f"{app.admission.max_queue} queued, then 503 with Retry-After")
+    uvicorn.run(app, host='0.0.0.0', port=3000)
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from priority_scheduler import BATCH, INTERACTIVE, PriorityScheduler
+from sentiment_analyzer import SentimentAnalyzer
+
+# Worker processes are started by a fork server that has already imported
+# the analyzer, never forked from a server whose other threads may hold a lock
+# the child would then wait on forever; spawned where there is no fork server
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    POOL_CONTEXT = multiprocessing.get_context('forkserver')
+    POOL_CONTEXT.set_forkserver_preload(['__main__', 'batch_engine'])
+else:
+    POOL_CONTEXT = multiprocessing.get_context('spawn')
+
+# Analyzer owned by each pool worker process, built once by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(analyzer_options):
+    """Build the worker's SentimentAnalyzer when the process starts."""
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(**analyzer_options)
+
+
+def _analyze_chunk(texts, mode='full'):
+    """Analyze one chunk of texts inside a worker process.
+
+    Full analyses go through ``analyze_batch``; other modes are analyzed text
+    by text, with the same None-for-empty and exception-in-place results.
+    """
+    if mode == 'full':
+        return _worker_analyzer.analyze_batch(texts, return_exceptions=True)
+
+    results = []
+    for text in texts:
+        try:
+            results.append(_worker_analyzer.analyze_text(text, mode=mode))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _analyze_text(text, mode, long_text=False):
+    """Analyze one text inside a worker process, returning its stage timings too."""
+    timings = []
+    _worker_analyzer.enable_stage_timing(lambda stage, seconds: timings.append((stage, seconds)))
+    try:
+        if long_text:
+            return _worker_analyzer.analyze_long_text(text, mode=mode), timings
+        return _worker_analyzer.analyze_text(text, mode=mode), timings
+    finally:
+        _worker_analyzer.disable_stage_timing()
+
+
+class ParallelBatchEngine:
+    """Spread batch analysis over a persistent pool of worker processes.
+
+    Texts are split into chunks of ``chunk_size`` so each round trip to a
+    worker carries several texts. Results come back in input order, with the
+    exception in place of the result for any text that failed, just like
+    ``SentimentAnalyzer.analyze_batch(texts, return_exceptions=True)``.
+    Batches smaller than ``serial_threshold``, or an engine with a single
+    worker, are analyzed in-process with ``analyzer`` instead, since there
+    the pool overhead would outweigh the work.
+
+    At most one task per worker is handed to the pool at a time, through a
+    ``PriorityScheduler``: a single text from ``analyze_text`` goes to the
+    next worker that frees up, ahead of the remaining chunks of any batch.
+    """
+
+    def __init__(self, analyzer, workers=None, chunk_size=8, serial_threshold=16, analyzer_options=None):
+        """Configure the engine; the pool itself starts on first use."""
+        self.analyzer = analyzer
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.serial_threshold = serial_threshold
+        self.analyzer_options = analyzer_options or {}
+        self.scheduler = PriorityScheduler(self.workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        """Return the worker pool, starting it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=POOL_CONTEXT,
+                    initializer=_init_worker,
+                    initargs=(self.analyzer_options,)
+                )
+            return self._executor
+
+    def _discard_pool(self, executor):
+        """Forget a pool that broke when a worker died, so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _submit(self, priority, function, *args):
+        """Submit function to the pool once the scheduler grants a slot; the slot is freed when it finishes.
+
+        A pool broken by a worker that died is replaced: at once if it is
+        found broken here, and for the next call if a task fails with it.
+        """
+        self.scheduler.acquire(priority)
+        try:
+            executor = self._pool()
+            try:
+                future = executor.submit(function, *args)
+            except BrokenProcessPool:
+                self._discard_pool(executor)
+                executor = self._pool()
+                future = executor.submit(function, *args)
+        except BaseException:
+            self.scheduler.release()
+            raise
+
+        def finished(future):
+            self.scheduler.release()
+            if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                self._discard_pool(executor)
+
+        future.add_done_callback(finished)
+        return future
+
+    def analyze(self, texts):
+        """Analyze texts, in parallel when the batch is large enough."""
+        if self.workers <= 1 or len(texts) < self.serial_threshold:
+            return self.analyzer.analyze_batch(texts, return_exceptions=True)
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+
+        futures = [self._submit(BATCH, _analyze_chunk, chunk) for chunk in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def analyze_text(self, text, mode='full', observer=None, long_text=False):
+        """Analyze one text on a worker process, keeping the CPU work off this process.
+
+        With ``long_text`` the worker runs ``analyze_long_text`` instead.
+
+        Stage durations measured in the worker are replayed to
+        ``observer(stage, seconds)``, as ``enable_stage_timing`` would report
+        them in-process.
+        """
+        result, timings = self._submit(INTERACTIVE, _analyze_text, text, mode, long_text).result()
+        if observer is not None:
+            for stage, seconds in timings:
+                observer(stage, seconds)
+        return result
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,69 @@
+"""Time the Streamlit app's rerun when the user clicks Analyze.
+
+Drives ``app.py`` headlessly with Streamlit's ``AppTest``: picks a sample
+post, clicks Analyze ``--clicks`` times and reports the median wall time of
+each rerun and how many elements it rendered. With the analysis section
+in a fragment, the app's own timing captions (``WELLNET_RERUN_TIMING``)
+also give the time of the fragment alone, which is what a click costs in
+a live session; ``AppTest`` always reruns the whole script.
+
+Run from the repository root, optionally against an older copy of the app:
+
+    python -m benchmarks.bench_app_rerun
+    git show <commit>:app.py > app_before.py
+    python -m benchmarks.bench_app_rerun --script app_before.py
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+
+TIMING_CAPTION = re.compile(r'(Analysis section rendered in|Full rerun took) (\d+) ms')
+
+
+def count_elements(node):
+    """Elements in a rendered block, recursively."""
+    children = getattr(node, 'children', None)
+    if not children:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default='app.py')
+    parser.add_argument('--clicks', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ['WELLNET_RERUN_TIMING'] = '1'
+    os.environ.setdefault('WELLNET_ENABLE_SPACY', '0')
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(args.script, default_timeout=120)
+    app.run()  # first run loads the analyzer and fills the caches
+    app.radio[0].set_value("Sample Social Media Posts").run()
+    app.selectbox[0].select(app.selectbox[0].options[1]).run()
+
+    wall, fragment, full = [], [], []
+    for _ in range(args.clicks):
+        button = next(b for b in app.button if 'Analyze' in b.label)
+        start = time.perf_counter()
+        button.click().run()
+        wall.append((time.perf_counter() - start) * 1000)
+        for caption in app.caption:
+            match = TIMING_CAPTION.search(caption.value)
+            if match:
+                (fragment if match.group(1).startswith('Analysis') else full).append(int(match.group(2)))
+
+    print(f"script: {args.script}")
+    print(f"elements rendered per rerun: main {count_elements(app.main)}, sidebar {count_elements(app.sidebar)}")
+    print(f"click rerun, whole script (AppTest wall time): {statistics.median(wall):.1f} ms median")
+    if full:
+        print(f"full rerun (app's own timer):                 {statistics.median(full):.1f} ms median")
+    if fragment:
+        print(f"analysis fragment only (live click cost):     {statistics.median(fragment):.1f} ms median")
+
+
+if __name__ == '__main__':
+    main()
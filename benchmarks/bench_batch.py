@@ -0,0 +1,56 @@
+"""Compare per-item cost of analyze_batch with a loop over analyze_text.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --sizes 1 50 1000
+
+The 100k batch takes a few minutes; pass ``--sizes`` to skip it.
+"""
+import argparse
+import time
+
+from sentiment_analyzer import SentimentAnalyzer
+
+SAMPLE_POSTS = [
+    "I've been feeling really overwhelmed with life in Nairobi. Everything seems too expensive and stressful.",
+    "Had a wonderful day at Uhuru Park with my family! Feeling blessed and grateful.",
+    "Can't sleep again thinking about my job situation. I feel so alone in this big city.",
+    "Just got a new job opportunity! Hard work and prayer really pay off.",
+    "I don't see the point in anything anymore. Life feels hopeless since I moved to town.",
+    "Attending prayers at church really helped me today. Feeling more at peace.",
+    "Kuna stress sana with this economy. I don't know how to cope anymore.",
+    "Family time in shags always makes me feel better. Rural life has its peace."
+]
+
+
+def make_batch(size):
+    """Cycle through the sample posts, varying each copy slightly."""
+    return [f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} ({i})" for i in range(size)]
+
+
+def time_per_item(function, texts):
+    """Return the wall time per item of ``function(texts)`` in microseconds."""
+    start = time.perf_counter()
+    function(texts)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 50, 1_000, 100_000])
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    analyzer.analyze_batch(make_batch(8))  # warm up lazy TextBlob/VADER state
+
+    print(f"{'batch size':>10} {'loop (us/item)':>16} {'batch (us/item)':>17} {'speedup':>9}")
+    for size in args.sizes:
+        texts = make_batch(size)
+        loop = time_per_item(lambda items: [analyzer.analyze_text(text) for text in items], texts)
+        batch = time_per_item(analyzer.analyze_batch, texts)
+        print(f"{size:>10} {loop:>16.1f} {batch:>17.1f} {loop / batch:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Time bursts of identical /api/analyze requests with and without coalescing.
+
+Each burst posts the same body from ``--burst`` threads at once, as a
+viral post or a retrying client does, through the Flask test client. Every
+burst uses a different text from the synthetic corpus, so no earlier burst
+has filled the result cache for it. Reports the median wall time of a
+burst, how many analyses actually ran per burst, and the coalescing
+counters from ``/api/stats``. Short and medium posts are often analyzed
+before the next thread of a burst starts, which then hits the result cache
+instead; coalescing matters for analyses that take longer than a burst
+takes to arrive.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_coalescing
+    python -m benchmarks.bench_coalescing --burst 32 --bursts 50 --band medium
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.corpus import generate_corpus
+
+
+def run_burst(client, body, size):
+    """Post body from size threads released together; return the burst's wall time."""
+    barrier = threading.Barrier(size + 1)
+    statuses = []
+
+    def post():
+        barrier.wait()
+        statuses.append(client.post('/api/analyze', json=body).status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(size)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert statuses == [200] * size, statuses
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--burst', type=int, default=16, help='identical requests per burst')
+    parser.add_argument('--bursts', type=int, default=10)
+    parser.add_argument('--band', choices=['short', 'medium', 'long'], default='long')
+    args = parser.parse_args()
+
+    # Analyze in-process, as the Flask server does
+    os.environ['WELLNET_BATCH_WORKERS'] = '1'
+    import api_server
+
+    client = api_server.app.test_client()
+    coalescer = api_server.coalescer or api_server.SingleFlight()
+    texts = generate_corpus(counts={args.band: args.bursts * 2})[args.band]
+    client.post('/api/analyze', json={'text': 'warm up'})
+
+    # Count the analyses that really run, whichever path the request takes
+    analyses = []
+    analyze_text = api_server.analyzer.analyze_text
+
+    def counted_analyze_text(*args, **kwargs):
+        analyses.append(1)
+        return analyze_text(*args, **kwargs)
+
+    api_server.analyzer.analyze_text = counted_analyze_text
+
+    print(f"{args.bursts} bursts of {args.burst} identical {args.band} posts")
+    print(f"{'coalescing':>10} {'burst (ms)':>11} {'analyses/burst':>15} {'speedup':>8}")
+    baseline = None
+    for label, enabled, batch in (('off', False, texts[:args.bursts]), ('on', True, texts[args.bursts:])):
+        api_server.coalescer = coalescer if enabled else None
+        analyses.clear()
+        times = [run_burst(client, {'text': text}, args.burst) for text in batch]
+        elapsed = statistics.median(times) * 1000
+        baseline = baseline or elapsed
+        print(f"{label:>10} {elapsed:>11.1f} {len(analyses) / len(batch):>15.1f} {baseline / elapsed:>7.1f}x")
+
+    api_server.analyzer.analyze_text = analyze_text
+    print(f"\n/api/stats coalescing: {client.get('/api/stats').get_json()['coalescing']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark the compiled keyword matcher against per-keyword scans.
+
+Substring mode is compared with the original one-scan-per-keyword loops of
+``extract_mental_health_keywords``, ``extract_positive_keywords`` and
+``analyze_emotions``. Word boundary mode is compared with one ``\b`` regex
+search per keyword, the straightforward way to get the same matches.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_keyword_matching
+"""
+import random
+import re
+import timeit
+
+from sentiment_analyzer import SentimentAnalyzer
+
+FILLER_WORDS = [
+    'today', 'nairobi', 'work', 'matatu', 'school', 'church', 'money', 'rain',
+    'the', 'and', 'i', 'feel', 'really', 'very', 'with', 'my', 'life', 'shags',
+    'highway', 'download', 'student', 'teacher', 'ugali', 'mama', 'boda'
+]
+
+
+def build_text(analyzer, length, keyword_density=0.02, seed=42):
+    """Build a synthetic post of roughly ``length`` characters."""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < length:
+        if rng.random() < keyword_density:
+            word = rng.choice(analyzer.keyword_matcher.phrases)
+        else:
+            word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def scan_each_keyword(analyzer, text):
+    """Reference implementation: one ``in`` scan per keyword and table."""
+    text_lower = text.lower()
+    mental_health = [keyword for keywords in analyzer.mental_health_keywords.values()
+                     for keyword in keywords if keyword in text_lower]
+    positive = [keyword for keywords in analyzer.positive_keywords.values()
+                for keyword in keywords if keyword in text_lower]
+    emotions = {emotion: sum(1 for word in words if word in text_lower)
+                for emotion, words in analyzer.emotion_keywords.items()}
+    return mental_health, positive, emotions
+
+
+def search_each_keyword(analyzer, text):
+    """Reference implementation for word boundary mode."""
+    text_lower = text.lower()
+    return {keyword for keyword in analyzer.keyword_matcher.phrases
+            if re.search(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)', text_lower)}
+
+
+def scan_once(analyzer, text):
+    """Single pass through the compiled matcher."""
+    matches = analyzer.find_keywords(text)
+    mental_health = analyzer.extract_mental_health_keywords(text, matches)
+    positive = analyzer.extract_positive_keywords(text, matches)
+    emotions = {emotion: sum(1 for word in words if word in matches)
+                for emotion, words in analyzer.emotion_keywords.items()}
+    return mental_health, positive, emotions
+
+
+def report(title, baseline_name, baseline, candidate, analyzer):
+    """Time ``baseline`` against ``candidate`` over growing synthetic texts."""
+    print(title)
+    print(f"{'length':>10} {'density':>8} {baseline_name:>22} {'compiled (ms)':>15} {'speedup':>9}")
+    for keyword_density in (0.005, 0.05):
+        for length in (100, 1_000, 10_000, 100_000, 1_000_000):
+            text = build_text(analyzer, length, keyword_density)
+            assert baseline(analyzer, text) == candidate(analyzer, text)
+
+            number = max(1, 200_000 // length)
+            slow = min(timeit.repeat(lambda: baseline(analyzer, text), number=number, repeat=5)) / number
+            fast = min(timeit.repeat(lambda: candidate(analyzer, text), number=number, repeat=5)) / number
+            print(f"{length:>10} {keyword_density:>8} {slow * 1000:>22.3f} "
+                  f"{fast * 1000:>15.3f} {slow / fast:>8.1f}x")
+    print()
+
+
+def main():
+    report("Substring matching (default)", "per-keyword (ms)",
+           scan_each_keyword, scan_once, SentimentAnalyzer())
+
+    boundary_analyzer = SentimentAnalyzer(word_boundaries=True)
+    report("Word boundary matching", "per-keyword regex (ms)",
+           search_each_keyword, lambda analyzer, text: analyzer.find_keywords(text),
+           boundary_analyzer)
+
+
+if __name__ == '__main__':
+    main()
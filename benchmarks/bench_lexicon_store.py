@@ -0,0 +1,106 @@
+"""Compare the analyzer's own lexicon dicts with a memory-mapped lexicon store.
+
+Builds a lexicon store in a temporary directory, then, in fresh
+interpreters, times constructing the analyzer and its first full analysis
+(which is when TextBlob loads its lexicon) and reads the process's unique
+memory (USS) from ``/proc/self/smaps_rollup``. Pages of the mapped store are
+counted as shared once another process maps it too, so a worker pool holds
+one copy. Then times ``analyze_text`` per length band with each analyzer, in
+this process.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_lexicon_store
+    python -m benchmarks.bench_lexicon_store --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus
+
+SCENARIO = """
+import json, time
+start = time.perf_counter()
+from sentiment_analyzer import SentimentAnalyzer
+imported = time.perf_counter()
+analyzer = SentimentAnalyzer(enable_spacy=False, lexicon_store={lexicon_store!r})
+constructed = time.perf_counter()
+analyzer.analyze_text("Kuna stress sana with this economy. I don't know how to cope anymore.")
+analyzed = time.perf_counter()
+fields = {{}}
+with open('/proc/self/smaps_rollup') as smaps:
+    for line in smaps:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            fields[parts[0].rstrip(':')] = int(parts[1])
+print(json.dumps({{
+    'construct_ms': (constructed - imported) * 1000,
+    'first_analysis_ms': (analyzed - constructed) * 1000,
+    'uss_mb': (fields['Private_Clean'] + fields['Private_Dirty']) / 1024
+}}))
+"""
+
+
+def cold_start(lexicon_store, repeat=3):
+    """Run the scenario in fresh interpreters and keep the fastest run."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', SCENARIO.format(lexicon_store=lexicon_store)],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['construct_ms'] + run['first_analysis_ms'])
+
+
+def per_text_us(analyzer, texts, repeat):
+    """Best mean analyze_text time per text over repeat passes, in microseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            analyzer.analyze_text(text)
+        best = min(best, (time.perf_counter() - start) / len(texts))
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    from lexicon_store import write_lexicon_store
+    from sentiment_analyzer import SentimentAnalyzer
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'lexicons.bin')
+        start = time.perf_counter()
+        write_lexicon_store(path, SentimentAnalyzer(enable_spacy=False).lexicon_sections())
+        print(f"Built a {os.path.getsize(path) / 1024:.0f} kB store in {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'lexicons':>8} {'construct':>10} {'first result':>13} {'USS':>9}")
+        for label, lexicon_store in (('dicts', None), ('store', path)):
+            run = cold_start(lexicon_store, args.repeat)
+            print(f"{label:>8} {run['construct_ms']:>8.0f}ms {run['first_analysis_ms']:>11.0f}ms "
+                  f"{run['uss_mb']:>7.1f}MB")
+
+        analyzers = {'dicts': SentimentAnalyzer(enable_spacy=False),
+                     'store': SentimentAnalyzer(enable_spacy=False, lexicon_store=path)}
+        for analyzer in analyzers.values():
+            analyzer.analyze_text('warm up')
+        corpus = generate_corpus(counts={'short': 300, 'medium': 60, 'long': 5})
+
+        print(f"\n{'band':>8} {'dicts (us)':>11} {'store (us)':>11} {'change':>8}")
+        for band, texts in corpus.items():
+            dicts, store = (per_text_us(analyzer, texts, args.repeat) for analyzer in analyzers.values())
+            print(f"{band:>8} {dicts:>11.0f} {store:>11.0f} {store / dicts - 1:>+8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark the analysis modes and report how often they agree with full mode.
+
+For every length band of the synthetic corpus this times ``analyze_text`` in
+each mode, then compares the risk levels from ``fast`` and ``keywords-only``
+with ``full`` on the same texts: overall agreement, a confusion matrix, and
+how often the cheaper mode under-rates risk (the costly mistake for triage).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_modes
+    python -m benchmarks.bench_modes --fit     # refit the mode calibrations
+
+``--fit`` prints least-squares fits against full mode on the corpus, for
+updating ``SentimentAnalyzer.mode_calibration``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus
+from sentiment_analyzer import SentimentAnalyzer
+
+RISK_ORDER = ['Low', 'Moderate', 'High']
+
+
+def time_mode(analyzer, texts, mode):
+    """Return results and mean microseconds per text for one mode."""
+    start = time.perf_counter()
+    results = [analyzer.analyze_text(text, mode=mode) for text in texts]
+    return results, (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def agreement_report(full_results, mode_results):
+    """Return agreement, under-triage rate, confusion matrix and sentiment error."""
+    confusion = np.zeros((3, 3), dtype=int)
+    for full, other in zip(full_results, mode_results):
+        confusion[RISK_ORDER.index(full['risk_level']), RISK_ORDER.index(other['risk_level'])] += 1
+
+    total = confusion.sum()
+    sentiment_error = np.mean([abs(full['overall_sentiment'] - other['overall_sentiment'])
+                               for full, other in zip(full_results, mode_results)])
+    return {
+        'agreement': np.trace(confusion) / total,
+        'under_triage': np.tril(confusion, -1).sum() / total,
+        'over_triage': np.triu(confusion, 1).sum() / total,
+        'confusion': confusion,
+        'sentiment_mae': sentiment_error,
+    }
+
+
+def fit_calibration(analyzer, full_results):
+    """Least-squares fits of full-mode quantities from what cheaper modes can see."""
+    polarity = np.array([r['detailed_scores']['textblob']['polarity'] for r in full_results])
+    compound = np.array([r['detailed_scores']['vader']['compound'] for r in full_results])
+    overall = np.array([r['overall_sentiment'] for r in full_results])
+    positive = np.array([len(r['positive_keywords']) for r in full_results])
+    negative = np.array([len(r['mental_health_keywords']) for r in full_results])
+    ones = np.ones_like(compound)
+
+    polarity_fit = np.linalg.lstsq(np.c_[compound, ones], polarity, rcond=None)[0]
+    agreement_fit = np.linalg.lstsq(np.c_[ones, np.abs(compound)], 1 - np.abs(polarity - compound), rcond=None)[0]
+    keyword_fit = np.linalg.lstsq(np.c_[positive, negative, ones], overall, rcond=None)[0]
+
+    print("Fitted calibration (current values in parentheses):")
+    current = analyzer.mode_calibration
+    fitted = {
+        ('fast', 'polarity_slope'): polarity_fit[0],
+        ('fast', 'polarity_intercept'): polarity_fit[1],
+        ('fast', 'agreement_intercept'): agreement_fit[0],
+        ('fast', 'agreement_slope'): agreement_fit[1],
+        ('keywords-only', 'positive_weight'): keyword_fit[0],
+        ('keywords-only', 'negative_weight'): keyword_fit[1],
+        ('keywords-only', 'intercept'): keyword_fit[2],
+    }
+    for (mode, name), value in fitted.items():
+        print(f"  {mode:>14}.{name:<20} {value:>8.3f}  ({current[mode][name]})")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analysis mode speed and agreement report')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--fit', action='store_true', help='print refitted mode calibrations')
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    corpus = generate_corpus(seed=args.seed, counts={'short': 1000, 'medium': 200, 'long': 20})
+    analyzer.analyze_text("warm up")
+
+    all_full = []
+    for band, texts in corpus.items():
+        print(f"== {band} ({len(texts)} texts)")
+        full_results, full_time = time_mode(analyzer, texts, 'full')
+        all_full.extend(full_results)
+        print(f"{'mode':>14} {'us/text':>10} {'speedup':>8} {'agreement':>10} {'under':>7} {'over':>7} {'sent. MAE':>10}")
+        print(f"{'full':>14} {full_time:>10.0f} {1:>7.1f}x")
+
+        for mode in analyzer.analysis_modes[1:]:
+            mode_results, mode_time = time_mode(analyzer, texts, mode)
+            report = agreement_report(full_results, mode_results)
+            print(f"{mode:>14} {mode_time:>10.0f} {full_time / mode_time:>7.1f}x {report['agreement']:>10.1%} "
+                  f"{report['under_triage']:>7.1%} {report['over_triage']:>7.1%} {report['sentiment_mae']:>10.3f}")
+            print(f"{'':>14} full (rows) vs {mode} (columns), {' / '.join(RISK_ORDER)}:")
+            for level, row in zip(RISK_ORDER, report['confusion']):
+                print(f"{'':>14} {level:>9} {row[0]:>6} {row[1]:>6} {row[2]:>6}")
+        print()
+
+    if args.fit:
+        fit_calibration(analyzer, all_full)
+
+
+if __name__ == '__main__':
+    main()
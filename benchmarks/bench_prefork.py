@@ -0,0 +1,111 @@
+"""Compare worker memory and start-up time of the preforking launcher with and without preload.
+
+Starts ``prefork_server.py`` with ``--workers`` workers, once with the app
+preloaded in the master (``WELLNET_PRELOAD=1``) and once with every worker
+loading its own (``WELLNET_PRELOAD=0``). Once all workers are ready, posts
+``--requests`` analyses from the synthetic corpus, then reads each worker's
+memory from ``/proc/<pid>/smaps_rollup``: unique memory (USS, the pages only
+that worker holds) and proportional memory (PSS, shared pages split between
+the processes that share them). Reports time from fork to ready per worker,
+and the PSS of master and workers together. Linux only.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prefork
+    python -m benchmarks.bench_prefork --workers 8 --requests 500
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.corpus import generate_corpus
+
+READY_LINE = re.compile(r'Worker (\d+) ready ([\d.]+) ms after fork')
+
+
+def free_port():
+    """A TCP port nothing is listening on right now."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def memory_kb(pid):
+    """USS and PSS of a process in kB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Private_Clean'] + fields['Private_Dirty'], fields['Pss']
+
+
+def run_launcher(preload, workers, texts, timeout=300):
+    """Start the launcher, wait for its workers, load it, measure, stop it."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    port = free_port()
+    env = dict(os.environ, WELLNET_WORKERS=str(workers), WELLNET_PORT=str(port),
+               WELLNET_PRELOAD='1' if preload else '0', WELLNET_METRICS='0')
+    started = time.perf_counter()
+    master = subprocess.Popen([sys.executable, 'prefork_server.py'], cwd=root, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        fork_to_ready = {}
+        for line in master.stdout:
+            for match in READY_LINE.finditer(line):
+                fork_to_ready[int(match.group(1))] = float(match.group(2))
+            if len(fork_to_ready) == workers or time.perf_counter() - started > timeout:
+                break
+        all_ready = time.perf_counter() - started
+
+        for text in texts:
+            request = urllib.request.Request(
+                f'http://127.0.0.1:{port}/api/analyze', data=json.dumps({'text': text}).encode('utf-8'),
+                headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(request).read()
+
+        workers_memory = [memory_kb(pid) for pid in fork_to_ready]
+        master_memory = memory_kb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+    return {
+        'all_ready_s': all_ready,
+        'fork_to_ready_ms': list(fork_to_ready.values()),
+        'worker_uss_mb': [uss / 1024 for uss, _ in workers_memory],
+        'total_pss_mb': (master_memory[1] + sum(pss for _, pss in workers_memory)) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = [post for posts in generate_corpus(counts={'short': 150, 'medium': 45, 'long': 5}).values()
+              for post in posts]
+    texts = [corpus[i % len(corpus)] for i in range(args.requests)]
+
+    print(f"{args.workers} workers, {args.requests} requests")
+    print(f"{'mode':>10} {'all ready':>10} {'fork to ready (median/max)':>27} "
+          f"{'USS per worker':>15} {'total PSS':>10}")
+    for label, preload in (('preload', True), ('no preload', False)):
+        run = run_launcher(preload, args.workers, texts)
+        fork_to_ready = run['fork_to_ready_ms']
+        print(f"{label:>10} {run['all_ready_s']:>9.1f}s "
+              f"{statistics.median(fork_to_ready):>15.0f} / {max(fork_to_ready):>6.0f} ms "
+              f"{statistics.mean(run['worker_uss_mb']):>12.1f} MB {run['total_pss_mb']:>7.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Microbenchmark preprocess_text against the original replace chain.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_preprocess
+"""
+import re
+import timeit
+
+from sentiment_analyzer import SentimentAnalyzer
+
+POSTS = {
+    'typical': (
+        "I've been feeling really overwhelmed with life in Nairobi. Everything seems too "
+        "expensive and stressful.\n\nHad a wonderful day at Uhuru Park with my family! Feeling "
+        "blessed and grateful. Kuna stress sana with this economy.  I don't know how to cope "
+        "anymore. Family time in shags always makes me feel better. "
+    ),
+    'contraction-heavy': (
+        "I can't sleep and I don't know why.  I'm tired, we're all tired\n"
+        "and it won't stop. Haven't eaten, they'll say I'd be fine. "
+    ),
+}
+
+CONTRACTIONS = {
+    "don't": "do not",
+    "won't": "will not",
+    "can't": "cannot",
+    "n't": " not",
+    "'re": " are",
+    "'ve": " have",
+    "'ll": " will",
+    "'d": " would",
+    "'m": " am"
+}
+
+
+def replace_chain(text):
+    """The original implementation: one regex plus nine str.replace calls."""
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    for contraction, expansion in CONTRACTIONS.items():
+        text = text.replace(contraction, expansion)
+    return text
+
+
+def main():
+    analyzer = SentimentAnalyzer()
+
+    print(f"{'text':>18} {'input':>8} {'replace chain (us)':>20} {'normalizer (us)':>17} {'speedup':>9}")
+    for name, post in POSTS.items():
+        for label, length in (('100 B', 100), ('10 KB', 10_000), ('1 MB', 1_000_000)):
+            text = (post * (length // len(post) + 1))[:length]
+            assert replace_chain(text) == analyzer.preprocess_text(text)
+
+            number = max(1, 2_000_000 // length)
+            chain = min(timeit.repeat(lambda: replace_chain(text), number=number, repeat=5)) / number
+            single = min(timeit.repeat(lambda: analyzer.preprocess_text(text), number=number, repeat=5)) / number
+            print(f"{name:>18} {label:>8} {chain * 1e6:>20.1f} {single * 1e6:>17.1f} {chain / single:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Time /api/analyze while batch clients keep the worker processes busy.
+
+``--batch-clients`` threads post 50-text ``/api/batch-analyze`` requests
+back to back through the Flask test client, while one interactive client
+posts single texts, run on the batch engine's worker processes as under
+the async server. Reports the interactive latency with the engine's
+priority scheduler, which hands the next free worker to a single text
+ahead of queued batch chunks, and without it, when every task waits in the
+pool's first-in, first-out queue. Batch throughput is reported too.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_priority
+    python -m benchmarks.bench_priority --workers 4 --batch-clients 4 --requests 100
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.corpus import generate_corpus
+
+
+def run(client, batch_texts, interactive_texts, batch_clients):
+    """Flood with batches while timing the interactive posts; return (latencies, batch texts per second)."""
+    stop = threading.Event()
+    analyzed = []
+
+    def batch_client():
+        while not stop.is_set():
+            assert client.post('/api/batch-analyze', json={'texts': batch_texts}).status_code == 200
+            analyzed.append(len(batch_texts))
+
+    threads = [threading.Thread(target=batch_client) for _ in range(batch_clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    latencies = []
+    start = time.perf_counter()
+    for text in interactive_texts:
+        sent = time.perf_counter()
+        assert client.post('/api/analyze', json={'text': text}).status_code == 200
+        latencies.append(time.perf_counter() - sent)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(analyzed) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-clients', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=50, help='interactive requests per run')
+    args = parser.parse_args()
+
+    os.environ.update(WELLNET_BATCH_WORKERS=str(args.workers), WELLNET_BATCH_SERIAL_THRESHOLD='1',
+                      WELLNET_CACHE_SIZE='0', WELLNET_COALESCE='0', WELLNET_METRICS='0')
+    import api_server
+    from priority_scheduler import PriorityScheduler
+
+    api_server.offload_single_analysis = True
+    api_server.warm_up()
+    client = api_server.app.test_client()
+    corpus = generate_corpus(counts={'short': args.requests * 2, 'medium': 50})
+    scheduler = api_server.batch_engine.scheduler
+
+    print(f"{args.workers} workers, {args.batch_clients} batch clients posting 50 medium texts, "
+          f"{args.requests} interactive posts")
+    print(f"{'scheduler':>10} {'median (ms)':>12} {'p95 (ms)':>9} {'max (ms)':>9} {'batch texts/s':>14}")
+    for label, texts, batch_scheduler in (
+            ('FIFO', corpus['short'][:args.requests], PriorityScheduler(2 ** 30)),
+            ('priority', corpus['short'][args.requests:], scheduler)):
+        api_server.batch_engine.scheduler = batch_scheduler
+        latencies, throughput = run(client, corpus['medium'], texts, args.batch_clients)
+        latencies = sorted(latency * 1000 for latency in latencies)
+        print(f"{label:>10} {statistics.median(latencies):>12.1f} "
+              f"{latencies[int(len(latencies) * 0.95) - 1]:>9.1f} {latencies[-1]:>9.1f} {throughput:>14.0f}")
+
+    api_server.batch_engine.shutdown()
+
+
+if __name__ == '__main__':
+    main()
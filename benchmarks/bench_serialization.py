@@ -0,0 +1,108 @@
+"""Compare encode time and payload size of the /api/batch-analyze response per serializer.
+
+Builds the rows and columnar response bodies exactly as the endpoint does,
+for batches from the synthetic corpus, then encodes each with Flask's
+``jsonify`` (the previous path, including converting columnar arrays to
+lists), the standard library JSON fallback, orjson and MessagePack (each
+when installed). Reports the median encode time and the raw and gzipped
+body sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --sizes 50 1000 --repeat 50
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import time
+
+from benchmarks.corpus import generate_corpus
+import serializers
+
+
+def as_lists(document):
+    """Copy of document with NumPy values converted for ``jsonify``."""
+    if isinstance(document, dict):
+        return {key: as_lists(value) for key, value in document.items()}
+    if isinstance(document, list):
+        return [as_lists(value) for value in document]
+    try:
+        return serializers.plain_value(document)
+    except TypeError:
+        return document
+
+
+def encoders(app):
+    """Encoder name -> function returning the encoded body, for what is installed."""
+    from flask import jsonify
+
+    def flask_jsonify(document):
+        with app.app_context():
+            return jsonify(as_lists(document)).get_data()
+
+    available = {
+        'jsonify': flask_jsonify,
+        'json': lambda document: (json.dumps(document, default=serializers.plain_value,
+                                             separators=(',', ':')) + '\n').encode('utf-8')
+    }
+    if serializers.orjson is not None:
+        available['orjson'] = serializers.JSONSerializer().dumps
+    if serializers.msgpack is not None:
+        available['msgpack'] = serializers.MessagePackSerializer().dumps
+    return available
+
+
+def median_ms(function, document, repeat):
+    """Median wall time of function(document) in milliseconds."""
+    function(document)  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(document)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 1000],
+                        help='texts per batch (the endpoint accepts up to 50)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # Analyze in-process without the cache; only encoding is timed
+    os.environ['WELLNET_CACHE_SIZE'] = '0'
+    os.environ['WELLNET_BATCH_WORKERS'] = '1'
+    import api_server
+
+    corpus = [post for posts in generate_corpus(counts={'short': 200, 'medium': 50}).values() for post in posts]
+    available = encoders(api_server.app)
+    missing = [name for name, module in (('orjson', serializers.orjson), ('msgpack', serializers.msgpack))
+               if module is None]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+
+    print(f"{'texts':>6} {'format':>9} {'encoder':>8} {'encode (ms)':>12} {'vs jsonify':>11} "
+          f"{'bytes':>10} {'gzip bytes':>11}")
+    for size in args.sizes:
+        texts = [corpus[i % len(corpus)] for i in range(size)]
+        analyses = api_server.analyzer.analyze_batch(texts)
+        documents = {
+            'rows': api_server.rows_batch_response(texts, analyses),
+            'columnar': api_server.columnar_batch_response(texts, analyses)
+        }
+        for response_format, document in documents.items():
+            baseline = None
+            for name, encode in available.items():
+                elapsed = median_ms(encode, document, args.repeat)
+                baseline = baseline or elapsed
+                body = encode(document)
+                print(f"{size:>6} {response_format:>9} {name:>8} {elapsed:>12.3f} {baseline / elapsed:>10.1f}x "
+                      f"{len(body):>10} {len(gzip.compress(body)):>11}")
+
+
+if __name__ == '__main__':
+    main()
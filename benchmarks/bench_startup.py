@@ -0,0 +1,72 @@
+"""Measure analyzer cold start with spaCy loaded eagerly, lazily or disabled.
+
+Each scenario runs in a fresh interpreter and reports the time to import
+``sentiment_analyzer``, to construct the analyzer, to finish the first
+analysis, and the peak RSS afterwards.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup
+"""
+import json
+import os
+import subprocess
+import sys
+
+SCENARIO = """
+import json, resource, sys, time
+start = time.perf_counter()
+from sentiment_analyzer import SentimentAnalyzer
+imported = time.perf_counter()
+analyzer = SentimentAnalyzer(enable_spacy={enable_spacy})
+if {eager}:
+    analyzer.nlp
+constructed = time.perf_counter()
+analyzer.analyze_text("Kuna stress sana with this economy. I don't know how to cope anymore.")
+analyzed = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'first_analysis_ms': (analyzed - start) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'spacy_imported': 'spacy' in sys.modules,
+    'spacy_model_loaded': analyzer._nlp is not None
+}}))
+"""
+
+SCENARIOS = {
+    'eager spaCy (previous behaviour)': {'enable_spacy': True, 'eager': True},
+    'lazy spaCy (default)': {'enable_spacy': True, 'eager': False},
+    'spaCy disabled': {'enable_spacy': False, 'eager': False},
+}
+
+
+def run_scenario(options, repeat=3):
+    """Run a scenario in fresh interpreters and keep the fastest run."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', SCENARIO.format(**options)],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['first_analysis_ms'])
+
+
+def main():
+    print(f"{'scenario':<34} {'import':>9} {'construct':>10} {'first result':>13} {'max RSS':>9} {'spaCy':>14}")
+    for name, options in SCENARIOS.items():
+        run = run_scenario(options)
+        if run['spacy_model_loaded']:
+            spacy_state = 'model loaded'
+        elif run['spacy_imported']:
+            spacy_state = 'imported only'
+        else:
+            spacy_state = 'not imported'
+        print(f"{name:<34} {run['import_ms']:>7.0f}ms {run['construct_ms']:>8.0f}ms "
+              f"{run['first_analysis_ms']:>11.0f}ms {run['max_rss_mb']:>7.0f}MB {spacy_state:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare ``SentimentAnalyzer.triage`` with ``analyze_text`` on the synthetic corpus.
+
+For every length band this times both on the same texts and reports texts
+per second and the speedup, how often triage had to run TextBlob, and how
+its risk levels compare with full analysis: a confusion matrix, and the
+under-triaged and High-mismatch counts, both of which must be zero.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_triage
+    python -m benchmarks.bench_triage --short 5000 --medium 500 --long 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus
+from sentiment_analyzer import SentimentAnalyzer
+
+RISK_ORDER = ['Low', 'Moderate', 'High']
+
+
+def timed(function, texts, repeat):
+    """Return function's results on texts and the best mean seconds per text over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(text) for text in texts]
+        elapsed = (time.perf_counter() - start) / len(texts)
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--short', type=int, default=1000)
+    parser.add_argument('--medium', type=int, default=200)
+    parser.add_argument('--long', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer(enable_spacy=False)
+    corpus = generate_corpus(seed=args.seed, counts={'short': args.short, 'medium': args.medium, 'long': args.long})
+    analyzer.analyze_text("warm up")
+    analyzer.triage("warm up")
+
+    textblob_runs = []
+
+    def count_textblob_runs(stage, seconds):
+        if stage == 'textblob':
+            textblob_runs.append(seconds)
+
+    all_texts, all_full, all_triage = [], [], []
+    total_full = total_triage = 0.0
+    print(f"{'band':>7} {'texts':>6} {'full/s':>9} {'triage/s':>9} {'speedup':>8} {'textblob':>9} "
+          f"{'under':>6} {'High diff':>9} {'over':>6}")
+    for band, texts in corpus.items():
+        full, full_time = timed(analyzer.analyze_text, texts, args.repeat)
+        triage, triage_time = timed(analyzer.triage, texts, args.repeat)
+
+        # How many texts triage could not settle without TextBlob
+        textblob_runs.clear()
+        analyzer.enable_stage_timing(count_textblob_runs)
+        for text in texts:
+            analyzer.triage(text)
+        analyzer.disable_stage_timing()
+
+        full_levels = [result['risk_level'] for result in full]
+        under = sum(RISK_ORDER.index(t) < RISK_ORDER.index(f) for f, t in zip(full_levels, triage))
+        high_diff = sum((t == 'High') != (f == 'High') for f, t in zip(full_levels, triage))
+        over = sum(RISK_ORDER.index(t) > RISK_ORDER.index(f) for f, t in zip(full_levels, triage))
+        print(f"{band:>7} {len(texts):>6} {1 / full_time:>9.0f} {1 / triage_time:>9.0f} "
+              f"{full_time / triage_time:>7.1f}x {len(textblob_runs) / len(texts):>9.1%} "
+              f"{under:>6} {high_diff:>9} {over:>6}")
+
+        all_texts.extend(texts)
+        all_full.extend(full_levels)
+        all_triage.extend(triage)
+        total_full += full_time * len(texts)
+        total_triage += triage_time * len(texts)
+
+    print(f"\nWhole corpus: {len(all_texts) / total_full:.0f} texts/s full, "
+          f"{len(all_texts) / total_triage:.0f} texts/s triage, {total_full / total_triage:.1f}x")
+    confusion = np.zeros((3, 3), dtype=int)
+    for full, triage in zip(all_full, all_triage):
+        confusion[RISK_ORDER.index(full), RISK_ORDER.index(triage)] += 1
+    print(f"full (rows) vs triage (columns), {' / '.join(RISK_ORDER)}:")
+    for level, row in zip(RISK_ORDER, confusion):
+        print(f"{level:>9} {row[0]:>6} {row[1]:>6} {row[2]:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""Benchmark suite for the analysis pipeline and the API.
+
+Times every stage of ``SentimentAnalyzer`` on its own, the full
+``analyze_text``, and the Flask endpoints through the test client, on a
+seeded synthetic corpus (see ``benchmarks.corpus``) split into length bands.
+Results are written as JSON and can be compared against a stored baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                         # writes bench_results.json
+    python -m benchmarks.suite --save-baseline         # stores benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --fail-on-regression
+
+The result cache is disabled and batch analysis runs in-process while
+benchmarking, so timings measure the work itself and not the machine's core
+count or cache hit rate.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.corpus import DEFAULT_COUNTS, generate_corpus
+
+DEFAULT_OUTPUT = 'bench_results.json'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def measure(function, items, repeat):
+    """Call function on every item ``repeat`` times and summarize per-call latency."""
+    function(items[0])  # warm up
+
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter_ns()
+            function(item)
+            samples.append(time.perf_counter_ns() - start)
+
+    samples.sort()
+    return {
+        'calls': len(samples),
+        'mean_us': statistics.fmean(samples) / 1000,
+        'median_us': statistics.median(samples) / 1000,
+        'p95_us': samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000,
+        'min_us': samples[0] / 1000,
+    }
+
+
+def prepare(analyzer, texts):
+    """Precompute each stage's inputs so stages can be timed in isolation."""
+    items = []
+    for text in texts:
+        processed = analyzer.preprocess_text(text)
+        textblob_results = analyzer.analyze_with_textblob(processed)
+        vader_results = analyzer.analyze_with_vader(processed)
+        items.append({
+            'raw': text,
+            'processed': processed,
+            'sentiment_scores': {'textblob': textblob_results, 'vader': vader_results},
+            'mental_health_keywords': analyzer.extract_mental_health_keywords(processed),
+            'emotions': analyzer.analyze_emotions(processed),
+        })
+    return items
+
+
+def pipeline_stages(analyzer):
+    """Stage name to a function of a prepared item."""
+    return {
+        'preprocess_text': lambda item: analyzer.preprocess_text(item['raw']),
+        'analyze_with_textblob': lambda item: analyzer.analyze_with_textblob(item['processed']),
+        'analyze_with_vader': lambda item: analyzer.analyze_with_vader(item['processed']),
+        'extract_mental_health_keywords': lambda item: analyzer.extract_mental_health_keywords(item['processed']),
+        'extract_positive_keywords': lambda item: analyzer.extract_positive_keywords(item['processed']),
+        'analyze_emotions': lambda item: analyzer.analyze_emotions(item['processed']),
+        'calculate_risk_level': lambda item: analyzer.calculate_risk_level(
+            item['sentiment_scores'], item['mental_health_keywords'], item['emotions']),
+        'analyze_text': lambda item: analyzer.analyze_text(item['raw']),
+    }
+
+
+def run_pipeline(corpus, repeat):
+    """Time every analyzer stage on every length band."""
+    from sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    results = {}
+    for band, texts in corpus.items():
+        items = prepare(analyzer, texts)
+        for stage, function in pipeline_stages(analyzer).items():
+            results[f'pipeline.{stage}.{band}'] = measure(function, items, repeat)
+    return results
+
+
+def run_api(corpus, repeat):
+    """Time the Flask endpoints through the test client."""
+    import api_server
+
+    client = api_server.app.test_client()
+
+    def check(response):
+        assert response.status_code == 200, response.status_code
+        return response
+
+    results = {}
+    for path in ('/api/health', '/api/documentation', '/api/resources/crisis',
+                 '/api/resources/mental-health', '/api/resources/safety-planning'):
+        results[f'api.GET {path}'] = measure(lambda _: check(client.get(path)), [None] * 20, repeat)
+
+    for band, texts in corpus.items():
+        results[f'api.POST /api/analyze.{band}'] = measure(
+            lambda text: check(client.post('/api/analyze', json={'text': text})), texts, repeat)
+
+        batches = [texts[i:i + 50] for i in range(0, len(texts), 50)]
+        results[f'api.POST /api/batch-analyze.{band}'] = measure(
+            lambda batch: check(client.post('/api/batch-analyze', json={'texts': batch})), batches, repeat)
+
+    return results
+
+
+def metadata(args):
+    """Describe the run so results can be matched to code and machine."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'corpus_counts': args.counts,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against the baseline and return the regressed names."""
+    regressions = []
+    print(f"{'benchmark':<58} {'median (us)':>12} {'baseline':>12} {'change':>8}")
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<58} {stats['median_us']:>12.1f} {'-':>12} {'new':>8}")
+            continue
+
+        ratio = stats['median_us'] / previous['median_us'] if previous['median_us'] else 1.0
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<58} {stats['median_us']:>12.1f} {previous['median_us']:>12.1f} "
+              f"{(ratio - 1) * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WellNet analysis and API benchmark suite')
+    parser.add_argument('--seed', type=int, default=2024, help='corpus seed')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over each band')
+    parser.add_argument('--quick', action='store_true', help='use a tenth of the default corpus')
+    parser.add_argument('--only', choices=['pipeline', 'api'], help='run one group of benchmarks')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help=f'also write results to {DEFAULT_BASELINE}')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    # Measure the work itself, not cache hits or the pool's core count
+    os.environ['WELLNET_CACHE_SIZE'] = '0'
+    os.environ['WELLNET_BATCH_WORKERS'] = '1'
+
+    args.counts = {band: max(1, count // 10) if args.quick else count for band, count in DEFAULT_COUNTS.items()}
+    corpus = generate_corpus(seed=args.seed, counts=args.counts)
+
+    results = {}
+    if args.only in (None, 'pipeline'):
+        results.update(run_pipeline(corpus, args.repeat))
+    if args.only in (None, 'api'):
+        results.update(run_api(corpus, args.repeat))
+
+    report = {'metadata': metadata(args), 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+
+    print(f"\nResults written to {args.output}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import heapq
+import math
+
+# Mean Earth radius
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(lat, lon):
+    """Point on the unit sphere for a latitude and longitude in degrees."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord):
+    """Great-circle distance for the straight-line distance between unit vectors."""
+    return 2 * math.asin(min(1.0, chord / 2)) * EARTH_RADIUS_KM
+
+
+class KDTree:
+    """Static k-d tree over 3-D points answering k-nearest-neighbour queries.
+
+    Nodes are (point index, split axis, left, right) tuples, split at the
+    median so the tree stays balanced.
+    """
+
+    def __init__(self, points):
+        self.points = list(points)
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices, depth):
+        """Build the subtree for indices, splitting on the axis for this depth."""
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        middle = len(indices) // 2
+        return (indices[middle], axis,
+                self._build(indices[:middle], depth + 1),
+                self._build(indices[middle + 1:], depth + 1))
+
+    def nearest(self, point, k):
+        """Return up to k (squared distance, point index) pairs, nearest first."""
+        best = []  # max-heap of (-squared distance, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            candidate = self.points[index]
+            distance = ((candidate[0] - point[0]) ** 2 + (candidate[1] - point[1]) ** 2
+                        + (candidate[2] - point[2]) ** 2)
+            if len(best) < k:
+                heapq.heappush(best, (-distance, index))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, index))
+
+            offset = point[axis] - candidate[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            # The far side can only help if the splitting plane is closer than the worst kept
+            if len(best) < k or offset * offset < -best[0][0]:
+                visit(far)
+
+        if k > 0:
+            visit(self.root)
+        return sorted((-distance, index) for distance, index in best)
+
+
+class FacilityLocator:
+    """Nearest facilities to a point, by great-circle distance.
+
+    Facilities are records with ``coordinates`` ({'lat': ..., 'lon': ...}).
+    They are indexed as unit vectors in a k-d tree: straight-line distance
+    between unit vectors orders points exactly as great-circle distance
+    does, with no special cases at the poles or the antimeridian.
+    """
+
+    def __init__(self, records):
+        self.facilities = [record for record in records if record.get('coordinates')]
+        self.tree = KDTree(to_unit_vector(f['coordinates']['lat'], f['coordinates']['lon'])
+                           for f in self.facilities)
+
+    def nearest(self, lat, lon, k=3):
+        """Return the k nearest facilities as copies with a ``distance_km`` field."""
+        results = []
+        for squared_chord, index in self.tree.nearest(to_unit_vector(lat, lon), k):
+            results.append(dict(self.facilities[index],
+                                distance_km=round(chord_to_km(math.sqrt(squared_chord)), 2)))
+        return results
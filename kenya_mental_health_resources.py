@@ -1,3 +1,20 @@
+# Facilities with a physical location carry approximate 'coordinates'
+# ({'lat': ..., 'lon': ...}, in degrees) for the nearest-help lookup.
+
+# Kenya's 47 counties, grouped into the regions named by regional resources
+KENYA_REGIONS = {
+    'Nairobi County': ['Nairobi'],
+    'Central Region': ['Kiambu', 'Kirinyaga', "Murang'a", 'Nyandarua', 'Nyeri'],
+    'Coast Region': ['Kilifi', 'Kwale', 'Lamu', 'Mombasa', 'Taita-Taveta', 'Tana River'],
+    'Eastern Region': ['Embu', 'Isiolo', 'Kitui', 'Machakos', 'Makueni', 'Marsabit', 'Meru', 'Tharaka-Nithi'],
+    'North Eastern Region': ['Garissa', 'Mandera', 'Wajir'],
+    'Rift Valley': ['Baringo', 'Bomet', 'Elgeyo-Marakwet', 'Kajiado', 'Kericho', 'Laikipia', 'Nakuru',
+                    'Nandi', 'Narok', 'Samburu', 'Trans Nzoia', 'Turkana', 'Uasin Gishu', 'West Pokot'],
+    'Western Kenya': ['Bungoma', 'Busia', 'Homa Bay', 'Kakamega', 'Kisii', 'Kisumu', 'Migori', 'Nyamira',
+                      'Siaya', 'Vihiga']
+}
+
+
 def get_kenya_mental_health_resources():
     """Return Kenya-specific mental health resources and information."""
     
@@ -14,6 +31,8 @@ def get_kenya_mental_health_resources():
             {
                 'title': 'Mathari National Teaching and Referral Hospital',
                 'description': 'Kenya\'s largest psychiatric hospital with over 500 beds, providing specialized mental health services, training and research.',
+                'county': 'Nairobi',
+                'coordinates': {'lat': -1.2585, 'lon': 36.8425},
                 'website': 'https://mntrh.go.ke',
                 'phone': '+254 20 2337694',
                 'email': 'info@mntrh.go.ke'
@@ -29,6 +48,8 @@ def get_kenya_mental_health_resources():
             {
                 'title': 'Kenyatta National Hospital - Mental Health',
                 'description': 'National referral hospital with comprehensive psychiatric services and youth mental health center.',
+                'county': 'Nairobi',
+                'coordinates': {'lat': -1.3005, 'lon': 36.8065},
                 'website': 'https://knh.or.ke',
                 'phone': '+254 20 2726300',
                 'youth_center': 'Free services every Tuesday 8am-4pm (ages 25 and under)'
@@ -36,6 +57,8 @@ def get_kenya_mental_health_resources():
             {
                 'title': 'Moi Teaching and Referral Hospital - Eldoret',
                 'description': 'Regional referral hospital with psychiatric services covering Western Kenya region.',
+                'county': 'Uasin Gishu',
+                'coordinates': {'lat': 0.5160, 'lon': 35.2805},
                 'website': 'https://mtrh.go.ke',
                 'phone': '+254 53 2063300'
             }
@@ -83,11 +106,14 @@ def get_kenya_mental_health_resources():
             {
                 'title': 'Meru Mental Health Initiative',
                 'description': 'Rural mental health support and traditional healing integration programs.',
+                'county': 'Meru',
                 'website': 'https://merumentalhealth.org'
             },
             {
                 'title': 'Kamiti Rehabilitation Centre',
                 'description': 'Substance abuse and addiction treatment programs with mental health support.',
+                'county': 'Kiambu',
+                'coordinates': {'lat': -1.1700, 'lon': 36.9000},
                 'website': 'https://kamitirehabcentre.org'
             },
             {
@@ -178,7 +204,8 @@ def get_kenya_crisis_resources():
                 'website': 'https://befrienders.org/find-support-now/befrienders-kenya/',
                 'email': 'befrienderskenya@gmail.com',
                 'description': 'Free confidential emotional support and suicide prevention. Monday-Friday 9am-5pm.',
-                'address': 'La Colline Gardens, Masaba Road, Upper Hill, Nairobi'
+                'address': 'La Colline Gardens, Masaba Road, Upper Hill, Nairobi',
+                'coordinates': {'lat': -1.2985, 'lon': 36.8145}
             },
             {
                 'name': 'EMKF Suicide Prevention Hotline',
@@ -214,28 +241,32 @@ def get_kenya_crisis_resources():
                 'region': 'Nairobi County',
                 'phone': '+254 20 3741051',
                 'mobile': '+254 721 296912',
-                'address': '2nd Floor, Kalson Towers, The Crescent, Off Parklands Road'
+                'address': '2nd Floor, Kalson Towers, The Crescent, Off Parklands Road',
+                'coordinates': {'lat': -1.2625, 'lon': 36.8105}
             },
             {
                 'name': 'KAPC Mombasa Branch',
                 'region': 'Coast Region',
                 'phone': '+254 41 2493050',
                 'mobile': '+254 725 797888',
-                'address': 'Kenyatta Avenue, Narok Rd, Mombasa Real Estate Building'
+                'address': 'Kenyatta Avenue, Narok Rd, Mombasa Real Estate Building',
+                'coordinates': {'lat': -4.0575, 'lon': 39.6655}
             },
             {
                 'name': 'KAPC Kisumu Branch',
                 'region': 'Western Kenya',
                 'phone': '+254 57 2027071',
                 'mobile': '+254 733 868610',
-                'address': 'Mamboleo Junction, off Kakamega Road'
+                'address': 'Mamboleo Junction, off Kakamega Road',
+                'coordinates': {'lat': -0.0715, 'lon': 34.7925}
             },
             {
                 'name': 'KAPC Eldoret Branch',
                 'region': 'Rift Valley',
                 'phone': '+254 53 2030682',
                 'mobile': '+254 712 141272',
-                'address': 'Rehema Complex, Ronald Ngala Street'
+                'address': 'Rehema Complex, Ronald Ngala Street',
+                'coordinates': {'lat': 0.5140, 'lon': 35.2700}
             }
         ],
         
@@ -0,0 +1,83 @@
+import re
+
+
+class KeywordMatcher:
+    """Find every phrase from a fixed set in a text, compiled once up front.
+
+    With ``word_boundaries`` enabled the phrases are compiled into a single
+    trie-shaped regular expression wrapped in a lookahead, so the text is
+    walked once and the longest phrase starting at each position is reported.
+    Shorter phrases that are prefixes of that match are filled in from a table
+    built at compile time, so overlapping phrases ('numb', 'numb the pain')
+    are all found.
+
+    Plain substring matching (the default, and the analyzer's historical
+    behaviour) is faster with Python's own substring search than with the
+    regex engine, which has to step through the text one character at a time.
+    In that mode each distinct phrase is checked once, shortest first, and a
+    phrase is skipped outright when a shorter phrase it contains was absent.
+    """
+
+    def __init__(self, phrases, word_boundaries=False):
+        """Compile the matcher for the given phrases."""
+        self.phrases = list(dict.fromkeys(phrases))
+        self.word_boundaries = word_boundaries
+
+        if word_boundaries:
+            trie = {}
+            for phrase in self.phrases:
+                node = trie
+                for char in phrase:
+                    node = node.setdefault(char, {})
+                node[''] = True
+
+            self._pattern = re.compile(r'(?<!\w)(?=(' + self._trie_to_regex(trie) + '))')
+
+            # Phrases guaranteed to match wherever the longer phrase matches
+            self._implied = {
+                phrase: frozenset(
+                    prefix for prefix in self.phrases
+                    if phrase.startswith(prefix) and (
+                        len(prefix) == len(phrase) or not re.match(r'\w', phrase[len(prefix)])
+                    )
+                )
+                for phrase in self.phrases
+            }
+        else:
+            # Phrases containing no other phrase are always checked; the rest
+            # are paired with the longest phrase they contain, shortest first
+            self._independent = []
+            self._dependent = []
+            for phrase in sorted(self.phrases, key=len):
+                contained = [other for other in self.phrases if other != phrase and other in phrase]
+                if contained:
+                    self._dependent.append((phrase, max(contained, key=len)))
+                else:
+                    self._independent.append(phrase)
+
+    def _trie_to_regex(self, node):
+        """Render a trie node as a regex that prefers the longest phrase."""
+        branches = [re.escape(char) + self._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char]
+
+        if not branches:
+            return r'(?!\w)'
+
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + r'|(?!\w))'
+        return body
+
+    def find(self, text):
+        """Return the set of phrases that occur in the text."""
+        if self.word_boundaries:
+            found = set()
+            for match in set(self._pattern.findall(text)):
+                found.update(self._implied[match])
+            return found
+
+        found = {phrase for phrase in self._independent if phrase in text}
+        for phrase, contained in self._dependent:
+            if contained in found and phrase in text:
+                found.add(phrase)
+        return found
@@ -0,0 +1,278 @@
+"""Compact, memory-mapped store of the lexicons the analyzer looks words up in.
+
+``write_lexicon_store`` compiles word tables into one read-only file, and
+``LexiconStore`` maps that file into memory. Every process that opens the
+file shares the same pages through the OS page cache, and nothing is parsed
+or copied when it is opened, so an analyzer built on it is ready at once
+and holds no lexicon dicts of its own.
+
+Each section of the file is a minimal perfect hash over its keys: a CRC-32
+of the key picks a bucket, whose displacement picks the one slot the key can
+be in. A lookup hashes the key at most twice and compares it once, whether
+or not it is present. Values are rows of float64, so scores round-trip
+exactly, or UTF-8 strings. Numbers are little-endian and read in place,
+so a store is only read on little-endian machines (x86-64, ARM).
+
+Build the analyzer's store after installing or upgrading vaderSentiment or
+textblob:
+
+    python lexicon_store.py lexicons.bin
+"""
+import mmap
+import struct
+import sys
+import zlib
+from collections.abc import Mapping
+
+MAGIC = b'WLEX'
+VERSION = 1
+
+# Magic, version and section count, then one directory entry per section:
+# name, kind, floats per row, entry count and where the section starts
+HEADER = struct.Struct('<4sII')
+DIRECTORY_ENTRY = struct.Struct('<32sBxxxIIQ')
+
+FLOAT_ROWS = 0
+STRINGS = 1
+
+# Entries a section remembers per process, hits and misses alike, so the
+# words a process looks up most are found with one dict lookup
+MEMO_SIZE = 4096
+
+_UNSEEN = object()
+_ABSENT = object()
+
+
+def _encode(key):
+    return key.encode('utf-8', 'surrogatepass')
+
+
+def _perfect_hash(keys):
+    """Return (displacements, slot of each key) for a minimal perfect hash of keys.
+
+    Buckets are placed largest first. A bucket of several keys gets the
+    smallest displacement that sends all of them to distinct free slots; a
+    bucket of one key takes any free slot, stored as ``-slot - 1``.
+    """
+    count = len(keys)
+    buckets = [[] for _ in range(count)]
+    for index, key in enumerate(keys):
+        buckets[zlib.crc32(key) % count].append(index)
+
+    displacements = [0] * count
+    slots = [None] * count
+    taken = [False] * count
+    for bucket in sorted(range(count), key=lambda bucket: -len(buckets[bucket])):
+        members = buckets[bucket]
+        if len(members) < 2:
+            break
+        displacement = 1
+        while True:
+            positions = [zlib.crc32(keys[index], displacement) % count for index in members]
+            if len(set(positions)) == len(positions) and not any(taken[position] for position in positions):
+                break
+            displacement += 1
+        displacements[bucket] = displacement
+        for index, position in zip(members, positions):
+            slots[index] = position
+            taken[position] = True
+
+    free = (position for position in range(count) if not taken[position])
+    for bucket, members in enumerate(buckets):
+        if len(members) == 1:
+            position = next(free)
+            displacements[bucket] = -position - 1
+            slots[members[0]] = position
+    return displacements, slots
+
+
+def _pad(data):
+    """data padded to a multiple of 8 bytes, so the next section is aligned."""
+    return data + b'\0' * (-len(data) % 8)
+
+
+def _offsets(blobs):
+    """uint32 start offsets of each blob in their concatenation, plus the end."""
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return struct.pack(f'<{len(offsets)}I', *offsets)
+
+
+def _section_bytes(table):
+    """Encode one table: displacements, key offsets, values, then the key and value bytes."""
+    keys = [_encode(key) for key in table]
+    values = list(table.values())
+    displacements, slots = _perfect_hash(keys)
+    order = [None] * len(keys)
+    for index, slot in enumerate(slots):
+        order[slot] = index
+    keys = [keys[index] for index in order]
+    values = [values[index] for index in order]
+
+    if values and isinstance(values[0], str):
+        kind, width = STRINGS, 0
+        encoded = [_encode(value) for value in values]
+        value_bytes = _pad(_offsets(encoded)) + _pad(b''.join(encoded))
+    else:
+        kind = FLOAT_ROWS
+        rows = [value if isinstance(value, (tuple, list)) else (value,) for value in values]
+        width = len(rows[0]) if rows else 1
+        value_bytes = struct.pack(f'<{len(rows) * width}d', *(float(x) for row in rows for x in row))
+
+    data = (_pad(struct.pack(f'<{len(displacements)}i', *displacements)) + _pad(_offsets(keys))
+            + value_bytes + _pad(b''.join(keys)))
+    return kind, width, len(keys), data
+
+
+def write_lexicon_store(path, sections):
+    """Write sections, a dict of name -> {key: value}, to path as a lexicon store.
+
+    Values are floats, equal-length tuples of floats, or strings; each
+    section holds one kind.
+    """
+    encoded = {name: _section_bytes(table) for name, table in sections.items()}
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(encoded)
+    offset += -offset % 8
+
+    directory = []
+    for name, (kind, width, count, data) in encoded.items():
+        if len(name.encode('ascii')) > 32:
+            raise ValueError(f"Section name {name!r} is longer than 32 characters")
+        directory.append(DIRECTORY_ENTRY.pack(name.encode('ascii'), kind, width, count, offset))
+        offset += len(data)
+
+    with open(path, 'wb') as output:
+        output.write(_pad(HEADER.pack(MAGIC, VERSION, len(encoded)) + b''.join(directory)))
+        for _, _, _, data in encoded.values():
+            output.write(data)
+
+
+class LexiconSection(Mapping):
+    """Read-only mapping over one section of a ``LexiconStore``.
+
+    Float sections of width one give floats, wider ones tuples of floats,
+    string sections strings. The first ``memo_size`` distinct keys looked
+    up, hits and misses alike, are remembered in a small per-process dict,
+    so common words cost one dict lookup after their first.
+    """
+
+    def __init__(self, buffer, kind, width, count, offset, memo_size=MEMO_SIZE):
+        self.kind = kind
+        self.width = width
+        self.memo_size = memo_size
+        self._count = count
+        self._memo = {}
+
+        def view(size, fmt):
+            nonlocal offset
+            section = buffer[offset:offset + size * struct.calcsize(fmt)].cast(fmt)
+            offset += size * struct.calcsize(fmt)
+            offset += -offset % 8
+            return section
+
+        self._displacements = view(count, 'i')
+        self._key_offsets = view(count + 1, 'I')
+        if kind == STRINGS:
+            self._value_offsets = view(count + 1, 'I')
+            self._values = view(self._value_offsets[count] if count else 0, 'B')
+        else:
+            self._values = view(count * width, 'd')
+        self._keys = view(self._key_offsets[count] if count else 0, 'B')
+
+    def _slot(self, key):
+        """The slot key is stored in, or None when it is not in the section."""
+        if not self._count:
+            return None
+        key = _encode(key)
+        displacement = self._displacements[zlib.crc32(key) % self._count]
+        slot = -displacement - 1 if displacement < 0 else zlib.crc32(key, displacement) % self._count
+        if self._keys[self._key_offsets[slot]:self._key_offsets[slot + 1]] != key:
+            return None
+        return slot
+
+    def _value(self, slot):
+        """The value stored in slot."""
+        if self.kind == STRINGS:
+            return bytes(self._values[self._value_offsets[slot]:self._value_offsets[slot + 1]]).decode(
+                'utf-8', 'surrogatepass')
+        if self.width == 1:
+            return self._values[slot]
+        return tuple(self._values[slot * self.width:(slot + 1) * self.width].tolist())
+
+    def _find(self, key):
+        """Look key up in the file, remembering the answer while the memo has room."""
+        slot = self._slot(key)
+        value = _ABSENT if slot is None else self._value(slot)
+        if len(self._memo) < self.memo_size:
+            self._memo[key] = value
+        return value
+
+    def __getitem__(self, key):
+        value = self._memo.get(key, _UNSEEN)
+        if value is _UNSEEN:
+            value = self._find(key)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        value = self._memo.get(key, _UNSEEN)
+        if value is _UNSEEN:
+            value = self._find(key)
+        return value is not _ABSENT
+
+    def get(self, key, default=None):
+        value = self._memo.get(key, _UNSEEN)
+        if value is _UNSEEN:
+            value = self._find(key)
+        return default if value is _ABSENT else value
+
+    def __iter__(self):
+        for slot in range(self._count):
+            yield bytes(self._keys[self._key_offsets[slot]:self._key_offsets[slot + 1]]).decode(
+                'utf-8', 'surrogatepass')
+
+    def __len__(self):
+        return self._count
+
+
+class LexiconStore(Mapping):
+    """A lexicon store file, mapped read-only into memory: section name -> ``LexiconSection``."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+
+        magic, version, count = HEADER.unpack_from(buffer)
+        if sys.byteorder != 'little':
+            raise ValueError("Lexicon stores can only be read on little-endian machines")
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} lexicon store; rebuild it with "
+                             f"python lexicon_store.py {path}")
+
+        self._sections = {}
+        for index in range(count):
+            name, kind, width, entries, offset = DIRECTORY_ENTRY.unpack_from(
+                buffer, HEADER.size + index * DIRECTORY_ENTRY.size)
+            self._sections[name.rstrip(b'\0').decode('ascii')] = LexiconSection(buffer, kind, width, entries, offset)
+
+    def __getitem__(self, name):
+        return self._sections[name]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+
+if __name__ == '__main__':
+    from sentiment_analyzer import SentimentAnalyzer
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'lexicons.bin'
+    sections = SentimentAnalyzer(enable_spacy=False).lexicon_sections()
+    write_lexicon_store(path, sections)
+    print(f"Wrote {path}: " + ', '.join(f"{name} ({len(table)})" for name, table in sections.items()))
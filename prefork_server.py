@@ -0,0 +1,202 @@
+"""Preforking production launcher for the WellNet API.
+
+The master process builds the analyzer, its compiled keyword tables and
+lexicons, the resource indexes and (when enabled) the spaCy model, runs a
+warm-up analysis, then forks the workers. Workers share those pages with the
+master copy-on-write instead of each building their own, so they are ready
+within milliseconds of the fork and add little memory each.
+
+    python prefork_server.py
+
+Each worker analyzes batches in-process rather than starting its own pool
+of batch processes; set ``WELLNET_BATCH_WORKERS`` to give every worker a
+pool of that many.
+
+``create_app`` is also an app factory for any other preforking WSGI server
+that loads the app before forking, e.g. ``gunicorn --preload
+'prefork_server:create_app()'``.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+WORKERS = int(os.environ.get('WELLNET_WORKERS', str(os.cpu_count() or 1)))
+PRELOAD = os.environ.get('WELLNET_PRELOAD', '1') != '0'
+PORT = int(os.environ.get('WELLNET_PORT', '3000'))
+
+# The workers already spread requests over the CPUs. A batch pool in each
+# would add a CPU count of analyzers per worker, built after the fork and
+# never shared, so by default workers analyze batches themselves
+os.environ.setdefault('WELLNET_BATCH_WORKERS', '1')
+
+# Seconds a worker keeps an idle connection open, which also bounds how long
+# a stopping worker waits for clients that hold one
+KEEP_ALIVE_TIMEOUT = 5
+
+# Exit status of a worker that could not start; the master then gives up
+# instead of forking replacements that would fail the same way
+WORKER_BOOT_ERROR = 3
+
+
+def create_app():
+    """Import the API, load everything it uses and warm it up; return the WSGI app.
+
+    The collector is paused while the app loads, so no freed objects leave
+    holes between the long-lived ones, and the result is frozen: the
+    collector in a forked worker never traverses these objects and so never
+    writes to, and copies, their pages. Reference counts still change on
+    use, so pages holding the objects a request touches are copied anyway.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        import api_server
+
+        api_server.warm_up(load_spacy=True)
+    finally:
+        gc.freeze()
+        if enabled:
+            gc.enable()
+    return api_server.app
+
+
+class WorkerRequestHandler(WSGIRequestHandler):
+    """Request handler that drops connections idle for ``KEEP_ALIVE_TIMEOUT`` seconds."""
+
+    timeout = KEEP_ALIVE_TIMEOUT
+
+
+class PreforkServer:
+    """Fork ``workers`` processes that accept connections on one shared socket.
+
+    The socket is bound as soon as the server is created, so a port in use
+    is reported before anything is loaded. With an ``app`` the workers
+    inherit it ready to serve; with None each worker calls ``create_app``
+    itself after the fork. A worker that dies is
+    replaced, unless it failed while starting. SIGTERM or SIGINT stops the
+    workers, letting their in-flight requests finish, and then the master.
+    """
+
+    def __init__(self, workers, port, host='0.0.0.0'):
+        self.app = None
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.listener = socket.create_server((host, port), backlog=128)
+        self._pids = {}
+        self._stopping = False
+
+    def run(self, app=None):
+        """Start the workers and supervise them until stopped; return the exit status."""
+        self.app = app
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+
+        status = 0
+        while self._pids:
+            pid, wait_status = os.wait()
+            if self._pids.pop(pid, None) is None:
+                continue
+            code = os.waitstatus_to_exitcode(wait_status)
+            if self._stopping:
+                continue
+            if code == WORKER_BOOT_ERROR:
+                print(f"Worker {pid} failed to start; stopping", file=sys.stderr)
+                status = 1
+                self._stop()
+                continue
+            print(f"Worker {pid} exited with status {code}; starting a replacement", file=sys.stderr)
+            self._spawn()
+
+        self.listener.close()
+        return status
+
+    def _stop(self, signum=None, frame=None):
+        """Ask every worker to finish its requests and exit."""
+        self._stopping = True
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self):
+        """Fork one worker; in the child this never returns."""
+        # Anything still buffered would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid:
+            self._pids[pid] = forked_at
+            if self._stopping:
+                # Asked to stop while forking, after the others were signalled
+                os.kill(pid, signal.SIGTERM)
+            return
+
+        status = 0
+        try:
+            status = self._serve(forked_at)
+        except SystemExit:
+            pass
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def _serve(self, forked_at):
+        """Worker main loop: load the app if needed, then serve until SIGTERM."""
+        signal.signal(signal.SIGTERM, _exit_worker)
+        signal.signal(signal.SIGINT, _exit_worker)
+        try:
+            app = self.app or create_app()
+            import api_server
+
+            server = make_server(self.host, self.port, app, threaded=True,
+                                 request_handler=WorkerRequestHandler, fd=self.listener.fileno())
+            # Tracked, not daemon, request threads are what server_close waits for
+            server.daemon_threads = False
+        except Exception:
+            traceback.print_exc()
+            return WORKER_BOOT_ERROR
+
+        api_server.readiness['fork_to_ready_ms'] = round((time.perf_counter() - forked_at) * 1000, 1)
+        # One write per line, so lines from workers starting together never interleave
+        sys.stdout.write(f"👷 Worker {os.getpid()} ready {api_server.readiness['fork_to_ready_ms']} ms after fork\n")
+        sys.stdout.flush()
+        try:
+            server.serve_forever()
+        except SystemExit:
+            pass
+        finally:
+            # Waits for the requests still being handled, and idle connections to time out
+            server.server_close()
+        return 0
+
+
+def _exit_worker(signum, frame):
+    """Leave the worker's serve loop."""
+    raise SystemExit(0)
+
+
+if __name__ == '__main__':
+    print("🇰🇪 Starting WellNet Kenya Mental Health API Server (preforked)...")
+    print(f"🚀 {WORKERS} workers on http://localhost:{PORT}, "
+          f"{'sharing the preloaded analyzer' if PRELOAD else 'each loading its own analyzer'}")
+    server = PreforkServer(WORKERS, PORT)
+    started = time.perf_counter()
+    app = create_app() if PRELOAD else None
+    if PRELOAD:
+        print(f"📦 App preloaded and warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+    sys.exit(server.run(app))
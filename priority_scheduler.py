@@ -0,0 +1,70 @@
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+# Priorities, most urgent first: a person waiting on one analysis, then bulk work
+INTERACTIVE = 0
+BATCH = 1
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+
+class PriorityScheduler:
+    """Share a fixed number of slots between threads, most urgent waiter first.
+
+    A thread that finds every slot taken waits; a freed slot passes straight
+    to the waiter with the lowest priority number, oldest first among equals,
+    so interactive work never queues behind batch work that arrived earlier.
+    Work already holding a slot is never interrupted.
+    """
+
+    def __init__(self, slots):
+        self.slots = max(1, slots)
+        self._waiters = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+        self.active = 0
+        self.granted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.waited = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def acquire(self, priority=BATCH):
+        """Take a slot, waiting for one if all are taken."""
+        with self._lock:
+            self.granted[priority] += 1
+            if self.active < self.slots:
+                self.active += 1
+                return
+            self.waited[priority] += 1
+            turn = threading.Event()
+            heapq.heappush(self._waiters, (priority, next(self._order), turn))
+        turn.wait()
+
+    def release(self):
+        """Free a slot, handing it to the most urgent waiter if there is one."""
+        with self._lock:
+            if self._waiters:
+                heapq.heappop(self._waiters)[2].set()
+            else:
+                self.active -= 1
+
+    @contextmanager
+    def slot(self, priority=BATCH):
+        """Hold a slot for the duration of a with block."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        """Return occupancy, and slots granted and waited for by priority."""
+        with self._lock:
+            return {
+                'slots': self.slots,
+                'active': self.active,
+                'waiting': len(self._waiters),
+                'granted': {PRIORITY_NAMES[priority]: count for priority, count in self.granted.items()},
+                'waited': {PRIORITY_NAMES[priority]: count for priority, count in self.waited.items()}
+            }
@@ -0,0 +1,185 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Optional: only needed for the shared backend of multi-worker deployments
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class MemoryBackend:
+    """Token buckets held in this process, for a single server process.
+
+    At most ``max_clients`` buckets are kept; the least recently used one is
+    dropped beyond that, which only ever gives that client a full bucket
+    back early.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_clients=100000):
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, capacity, rate):
+        """Refill key's bucket, take cost tokens if it holds that many; return (allowed, tokens left)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clients(self):
+        """Number of buckets held."""
+        with self._lock:
+            return len(self._buckets)
+
+
+class RedisBackend:
+    """Token buckets in Redis, shared by every worker process and server.
+
+    Each bucket is refilled and charged in one Lua script, on the Redis
+    server's clock, so concurrent workers never both spend the same tokens.
+    Buckets expire once they would be full again. Pass a ``redis.Redis``
+    client, or any stand-in with the same ``eval``, or a ``url``; needs
+    Redis 5 or later.
+    """
+
+    name = 'redis'
+
+    SCRIPT = """
+local capacity, rate, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client=None, url=None, prefix='wellnet:rate-limit:'):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The shared rate limit backend needs the redis package: pip install redis")
+            client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key, cost, capacity, rate):
+        """Refill key's bucket, take cost tokens if it holds that many; return (allowed, tokens left)."""
+        allowed, tokens = self.client.eval(self.SCRIPT, 1, self.prefix + key, repr(capacity), repr(rate), repr(cost))
+        if isinstance(tokens, bytes):
+            tokens = tokens.decode('ascii')
+        return bool(allowed), float(tokens)
+
+    def clients(self):
+        """Not tracked: buckets live in Redis."""
+        return None
+
+
+class RateLimitDecision:
+    """Outcome of charging one request to its client's bucket."""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'reset', 'retry_after')
+
+    def __init__(self, allowed, limit, remaining, reset, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Per-client token buckets, charged by the cost of each request.
+
+    Every client may spend ``limit`` tokens per ``window`` seconds: its
+    bucket holds up to ``limit`` tokens and refills continuously at
+    ``limit / window`` per second, so bursts up to the limit are allowed and
+    a steady client is held to the average. A request is charged its full
+    cost, such as the number of texts it analyzes, so a request costing
+    more than ``limit`` can never be allowed: callers must refuse or split
+    it before charging.
+
+    Clients are identified by a BLAKE2b digest, so API keys and addresses
+    are never stored. The digest is unkeyed, so every worker sharing a
+    backend agrees on it.
+    """
+
+    def __init__(self, limit, window=60.0, backend=None):
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window
+        self.backend = backend or MemoryBackend()
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, client, cost=1):
+        """Charge client cost tokens and return a ``RateLimitDecision``.
+
+        A cost of 0 charges nothing and is allowed while the client has a
+        token left, for requests whose cost is only known as they go.
+        Raises ValueError for a cost above ``limit``.
+        """
+        if cost > self.limit:
+            raise ValueError(f"Cost {cost} exceeds the rate limit of {self.limit}")
+        key = hashlib.blake2b(client.encode('utf-8'), digest_size=16).hexdigest()
+        allowed, tokens = self.backend.take(key, cost, self.limit, self.rate)
+        if not cost:
+            allowed = tokens >= 1
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+
+        # Seconds until the bucket is full again, and until it holds cost tokens
+        reset = math.ceil((self.limit - tokens) / self.rate)
+        retry_after = 0 if allowed else max(1, math.ceil((max(cost, 1) - tokens) / self.rate))
+        return RateLimitDecision(allowed, self.limit, math.floor(tokens), reset, retry_after)
+
+    def headers(self, decision):
+        """RateLimit response headers for a decision, with Retry-After when it was refused."""
+        headers = {
+            'RateLimit-Policy': f'{self.limit};w={self.window:g}',
+            'RateLimit-Limit': str(decision.limit),
+            'RateLimit-Remaining': str(decision.remaining),
+            'RateLimit-Reset': str(decision.reset)
+        }
+        if not decision.allowed:
+            headers['Retry-After'] = str(decision.retry_after)
+        return headers
+
+    def stats(self):
+        """Return the policy and decision counters."""
+        with self._lock:
+            return {
+                'enabled': True,
+                'backend': self.backend.name,
+                'limit': self.limit,
+                'window_seconds': self.window,
+                'clients': self.backend.clients(),
+                'allowed': self.allowed,
+                'limited': self.limited
+            }
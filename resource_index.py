@@ -0,0 +1,166 @@
+import bisect
+import re
+
+from kenya_mental_health_resources import (
+    KENYA_REGIONS,
+    get_kenya_mental_health_resources,
+    get_kenya_crisis_resources,
+    get_kenya_safety_planning_resources
+)
+
+# Resource groups by the type name used in search queries
+RESOURCE_TYPES = {
+    'crisis': get_kenya_crisis_resources,
+    'mental-health': get_kenya_mental_health_resources,
+    'safety-planning': get_kenya_safety_planning_resources
+}
+
+# Languages recognised in resource text; every resource is in English
+LANGUAGES = ('english', 'swahili', 'sheng')
+
+# Query words too common to narrow a search
+STOPWORDS = frozenset(['a', 'an', 'and', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'])
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def normalize_name(name):
+    """Fold a county or region name so 'Murang'a', 'muranga' and 'MURANGA' agree."""
+    return ''.join(TOKEN_PATTERN.findall(name.lower()))
+
+
+def tokenize(text):
+    """Lowercase word tokens of text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class ResourceIndex:
+    """In-memory inverted indexes over every Kenya resource record.
+
+    Records are numbered once, and each filter (county, region, type,
+    category, language, toll-free, keyword) maps a value to the set of
+    record numbers it selects, so a search is a handful of set
+    intersections. A county or region filter selects the resources located
+    there plus those that serve the whole country; local ones rank first.
+    """
+
+    def __init__(self, resource_types=None):
+        """Flatten and index the records returned by each resource function."""
+        resource_types = resource_types or RESOURCE_TYPES
+
+        self.county_names = {}
+        self.county_region = {}
+        for region, counties in KENYA_REGIONS.items():
+            for county in counties:
+                self.county_names[normalize_name(county)] = county
+                self.county_region[county] = region
+        self.region_names = {normalize_name(region): region for region in KENYA_REGIONS}
+        # 'Coast' and 'Western' work as well as 'Coast Region' and 'Western Kenya'
+        for region in KENYA_REGIONS:
+            self.region_names.setdefault(normalize_name(region.split()[0]), region)
+
+        self.records = []
+        self.local = set()
+        self.national = set()
+        self.by_county = {}
+        self.by_region = {}
+        self.by_type = {}
+        self.by_category = {}
+        self.by_language = {}
+        self.toll_free = set()
+        self.by_token = {}
+
+        for resource_type, get_resources in resource_types.items():
+            for category, records in get_resources().items():
+                for record in records:
+                    self._add(resource_type, category, record)
+
+        self.vocabulary = sorted(self.by_token)
+
+    def _add(self, resource_type, category, record):
+        """Index one record under every value it can be searched by."""
+        record_id = len(self.records)
+        self.records.append(dict(record, type=resource_type, category=category))
+
+        self.by_type.setdefault(resource_type, set()).add(record_id)
+        self.by_category.setdefault(category, set()).add(record_id)
+
+        if record.get('county'):
+            county = record['county']
+            self.local.add(record_id)
+            self.by_county.setdefault(county, set()).add(record_id)
+            self.by_region.setdefault(self.county_region[county], set()).add(record_id)
+        elif record.get('region'):
+            region = record['region']
+            self.local.add(record_id)
+            self.by_region.setdefault(region, set()).add(record_id)
+            for county in KENYA_REGIONS[region]:
+                self.by_county.setdefault(county, set()).add(record_id)
+        elif record.get('country', 'Kenya') == 'Kenya':
+            self.national.add(record_id)
+
+        text = ' '.join(value for value in record.values() if isinstance(value, str)).lower()
+        self.by_language.setdefault('english', set()).add(record_id)
+        for language in LANGUAGES:
+            if language in text:
+                self.by_language.setdefault(language, set()).add(record_id)
+        if 'toll-free' in text or re.search(r'(?<!\d)0800', text):
+            self.toll_free.add(record_id)
+
+        title = record.get('title') or record.get('name', '')
+        for token in set(tokenize(title + ' ' + record.get('description', ''))):
+            self.by_token.setdefault(token, set()).add(record_id)
+
+    def resolve_county(self, name):
+        """Return the canonical county name, or None if it is not a Kenyan county."""
+        return self.county_names.get(normalize_name(name))
+
+    def resolve_region(self, name):
+        """Return the canonical region name, or None if it is unknown."""
+        return self.region_names.get(normalize_name(name))
+
+    def _keyword_matches(self, token):
+        """Records with a word starting with token, so 'counsel' finds 'counselling'."""
+        matches = set()
+        start = bisect.bisect_left(self.vocabulary, token)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            matches |= self.by_token[word]
+        return matches
+
+    def search(self, county=None, region=None, resource_type=None, category=None,
+               language=None, toll_free=None, q=None):
+        """Return matching records, local ones first, then in catalogue order.
+
+        ``county`` and ``region`` must already be canonical names (see
+        ``resolve_county`` and ``resolve_region``). Every given filter must
+        match; each word of ``q`` must prefix a word of the title or
+        description.
+        """
+        filters = []
+        if county is not None:
+            filters.append(self.by_county.get(county, set()) | self.national)
+        if region is not None:
+            filters.append(self.by_region.get(region, set()) | self.national)
+        if resource_type is not None:
+            filters.append(self.by_type.get(resource_type, set()))
+        if category is not None:
+            filters.append(self.by_category.get(category, set()))
+        if language is not None:
+            filters.append(self.by_language.get(language.lower(), set()))
+        if toll_free is not None:
+            filters.append(self.toll_free if toll_free else set(range(len(self.records))) - self.toll_free)
+        for token in tokenize(q or ''):
+            if token not in STOPWORDS:
+                filters.append(self._keyword_matches(token))
+
+        if filters:
+            filters.sort(key=len)
+            matches = filters[0].intersection(*filters[1:])
+        else:
+            matches = range(len(self.records))
+
+        located = county is not None or region is not None
+        ordered = sorted(matches, key=lambda record_id: (located and record_id not in self.local, record_id))
+        return [self.records[record_id] for record_id in ordered]
@@ -1,20 +1,127 @@
+import copy
 import re
+import time
 import numpy as np
 from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import spacy
+from textblob.en import sentiment as textblob_lexicon
+from textblob._text import EMOTICONS, PUNCTUATION as TEXTBLOB_PUNCTUATION
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, NEGATE, SPECIAL_CASES, SentiText, SentimentIntensityAnalyzer, allcap_differential
+)
 from collections import Counter
 
+from keyword_matcher import KeywordMatcher
+from lexicon_store import LexiconStore
+from result_cache import ResultCache
+from analysis_results import ResultBatch
+
+# A sentence for long-text windows: text up to and including its terminal
+# punctuation, or up to the end of the line
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]*')
+
+# What TextBlob's tokenizer splits a text on besides whitespace
+
+# Allowance for rounding when an average is compared with a bound on its terms
+ROUNDING_MARGIN = 1e-9
+
+
+# Emotion indicators, scored by how many words of each list appear; each
+# analyzer starts from its own copy
+EMOTION_KEYWORDS = {
+    'sadness': ['sad', 'depressed', 'down', 'blue', 'melancholy', 'grief', 'sorrow'],
+    'anxiety': ['anxious', 'worried', 'nervous', 'stressed', 'panic', 'fear'],
+    'anger': ['angry', 'mad', 'furious', 'rage', 'irritated', 'frustrated'],
+    'fear': ['scared', 'afraid', 'terrified', 'frightened', 'fearful'],
+    'joy': ['happy', 'joyful', 'excited', 'cheerful', 'delighted', 'pleased'],
+    'trust': ['trust', 'confident', 'secure', 'safe', 'comfortable'],
+    'anticipation': ['excited', 'eager', 'hopeful', 'optimistic', 'expecting'],
+    'disgust': ['disgusted', 'revolted', 'sick', 'nauseated']
+}
+
+
+class _StoredTextBlobSentiment(type(textblob_lexicon)):
+    """TextBlob's sentiment scorer, reading its lexicon from a ``LexiconStore``.
+    
+    Scores text exactly as ``TextBlob(text).sentiment`` does without ever
+    loading TextBlob's XML lexicon. The store keeps each word's overall
+    scores and its adverb ('RB') scores, which is all TextBlob uses for
+    untagged text.
+    """
+    
+    def __init__(self, words, labels):
+        super().__init__(tokenizer=textblob_lexicon.tokenizer, negations=textblob_lexicon.negations,
+                         modifiers=textblob_lexicon.modifiers, modifier=textblob_lexicon.modifier)
+        self._words = words
+        self.labeler = labels
+    
+    def __contains__(self, word):
+        return word in self._words
+    
+    def __getitem__(self, word):
+        polarity, subjectivity, intensity, *adverb = self._words[word]
+        senses = {None: (polarity, subjectivity, intensity)}
+        if adverb[0] == adverb[0]:  # NaN when the word is not an adverb
+            senses['RB'] = tuple(adverb)
+        return senses
+
+
+class _VaderWindow:
+    """The words around one word of a text, standing in for VADER's SentiText."""
+    
+    __slots__ = ('words_and_emoticons', 'is_cap_diff')
+    
+    def __init__(self, words, is_cap_diff):
+        self.words_and_emoticons = words
+        self.is_cap_diff = is_cap_diff
+
+
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize the sentiment analyzer with multiple NLP tools."""
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, word_boundaries=False, cache_size=0, cache_max_bytes=None, cache_ttl=None,
+                 enable_spacy=True, lexicon_store=None):
+        """Initialize the sentiment analyzer with multiple NLP tools.
+
+        Set ``word_boundaries`` to only count keywords that appear as whole
+        words or phrases (so 'high' no longer matches 'highway').
+
+        ``cache_size`` (entries) and/or ``cache_max_bytes`` enable an LRU cache
+        of results keyed by a hash of the preprocessed text, with entries
+        expiring after ``cache_ttl`` seconds if given. The cache is off by
+        default.
+
+        spaCy is only imported and its model loaded the first time ``nlp`` is
+        used; ``enable_spacy=False`` turns it off entirely.
+        
+        ``lexicon_store`` is a file written by ``python lexicon_store.py``, or
+        an open ``LexiconStore``. VADER and TextBlob then look words up in
+        that shared, memory-mapped file instead of loading their own
+        lexicons, with the same results.
+        """
+        if isinstance(lexicon_store, str):
+            lexicon_store = LexiconStore(lexicon_store)
+        self.lexicon_store = lexicon_store
+        if lexicon_store is not None:
+            self.vader_analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+            self.vader_analyzer.lexicon = lexicon_store['vader']
+            self.vader_analyzer.emojis = lexicon_store['vader_emoji']
+            self._textblob_sentiment = _StoredTextBlobSentiment(lexicon_store['textblob'],
+                                                                lexicon_store['textblob_labels'])
+        else:
+            self.vader_analyzer = SentimentIntensityAnalyzer()
+            self._textblob_sentiment = None
+        # Every emoji VADER spells out is non-ASCII, so ASCII text skips its
+        # per-character emoji lookups, which cost most with a lexicon store
+        self._ascii_vader_analyzer = copy.copy(self.vader_analyzer)
+        self._ascii_vader_analyzer.emojis = {}
+        
+        if cache_size or cache_max_bytes:
+            self.cache = ResultCache(max_entries=cache_size or None, max_bytes=cache_max_bytes, ttl=cache_ttl)
+        else:
+            self.cache = None
         
-        # Try to load spaCy model, fall back to basic processing if not available
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            self.nlp = None
+        # spaCy model, loaded lazily by the nlp property
+        self.enable_spacy = enable_spacy
+        self._nlp = None
+        self._nlp_loaded = False
         
         # Mental health keywords and indicators
         self.mental_health_keywords = {
@@ -36,19 +143,33 @@ class SentimentAnalyzer:
             'support': ['friends', 'family', 'loved ones', 'support', 'help'],
             'coping': ['meditation', 'exercise', 'therapy', 'counseling', 'self-care']
         }
-    
-    def preprocess_text(self, text):
-        """Clean and preprocess text for analysis."""
-        # Convert to lowercase
-        text = text.lower()
         
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        self.emotion_keywords = {emotion: list(words) for emotion, words in EMOTION_KEYWORDS.items()}
         
-        # Handle contractions and common abbreviations
-        contractions = {
+        # Risk indicators used by calculate_risk_level
+        self.high_risk_keywords = ['suicide', 'kill myself', 'end it all', 'want to die', 'self harm']
+        self.moderate_risk_keywords = ['depressed', 'hopeless', 'worthless', 'anxious', 'panic']
+        self.risk_levels = [
+            ('Low', 'Text shows generally stable emotional content. Continue maintaining positive mental health practices.'),
+            ('Moderate', 'Some concerning indicators detected. Consider seeking support or monitoring your well-being.'),
+            ('High', 'Indicators suggest significant emotional distress. Professional support is strongly recommended.')
+        ]
+        
+        # Risk points each mental health keyword adds, precomputed for batches
+        self.keyword_risk_weights = {}
+        for keywords in self.mental_health_keywords.values():
+            for keyword in keywords:
+                if any(hrk in keyword for hrk in self.high_risk_keywords):
+                    self.keyword_risk_weights[keyword] = 3
+                elif any(mrk in keyword for mrk in self.moderate_risk_keywords):
+                    self.keyword_risk_weights[keyword] = 1
+                else:
+                    self.keyword_risk_weights[keyword] = 0
+        
+        # Contractions and common abbreviations expanded by preprocess_text
+        self.contractions = {
             "don't": "do not",
-            "won't": "will not", 
+            "won't": "will not",
             "can't": "cannot",
             "n't": " not",
             "'re": " are",
@@ -58,22 +179,195 @@ class SentimentAnalyzer:
             "'m": " am"
         }
         
-        for contraction, expansion in contractions.items():
-            text = text.replace(contraction, expansion)
+        # Contraction rules split around the apostrophe and grouped by the
+        # character that follows it; within a group leftmost then longest rule
+        # first, so the expansion is deterministic however contractions overlap
+        self._contraction_rules = {}
+        for contraction, expansion in self.contractions.items():
+            prefix, suffix = contraction.split("'", 1)
+            self._contraction_rules.setdefault(suffix[:1], []).append((prefix, suffix, expansion))
+        for rules in self._contraction_rules.values():
+            rules.sort(key=lambda rule: (-len(rule[0]), -len(rule[1]), rule[0], rule[1]))
+        
+        # Analysis modes accepted by analyze_text, fastest last. The fast and
+        # keywords-only calibrations are least-squares fits against full mode
+        # on the synthetic benchmark corpus (python -m benchmarks.bench_modes --fit)
+        self.analysis_modes = ('full', 'fast', 'keywords-only')
+        self.mode_calibration = {
+            'fast': {
+                'polarity_slope': 0.352,
+                'polarity_intercept': 0.007,
+                'agreement_intercept': 0.843,
+                'agreement_slope': -0.469
+            },
+            'keywords-only': {
+                'positive_weight': 0.084,
+                'negative_weight': -0.082,
+                'intercept': 0.042
+            }
+        }
+        
+        # Long texts (analyze_long_text) are scored in windows of this many
+        # sentences, cut short once a window reaches window_max_chars
+        self.window_sentences = 5
+        self.window_max_chars = 1000
+        
+        # triage scores VADER word by word: a lexicon word with none of these
+        # words from three before it to two after scores its lexicon valence
+        self._vader_context_words = set(NEGATE) | {'no', 'least', 'never', 'so', 'this', 'without', 'doubt', 'kind'}
+        for phrase in list(BOOSTER_DICT) + list(SPECIAL_CASES):
+            self._vader_context_words.update(phrase.split())
+        
+        # TextBlob polarity and intensity by word, for triage's polarity floor
+        if lexicon_store is not None:
+            self._textblob_polarity = lexicon_store['textblob_polarity']
+            self._textblob_intensity = lexicon_store['textblob_intensity']
+        else:
+            self._textblob_polarity = {}
+            self._textblob_intensity = {}
+            for word, entries in textblob_lexicon.items():
+                polarity, _, intensity = entries[None]
+                if polarity:
+                    self._textblob_polarity[word] = polarity
+                if intensity > 1:
+                    self._textblob_intensity[word] = intensity
+        # TextBlob scores an emoticon by the first mood it is listed under
+        self._textblob_emoticons = {}
+        for (_, polarity), emoticons in EMOTICONS.items():
+            for emoticon in emoticons:
+                self._textblob_emoticons.setdefault(emoticon.lower(), polarity)
+        
+        # Stages reported by enable_stage_timing, and the methods that run them
+        self.timed_stages = {
+            'preprocess': 'preprocess_text',
+            'textblob': 'analyze_with_textblob',
+            'vader': 'analyze_with_vader',
+            'keywords': 'find_keywords',
+            'emotions': 'analyze_emotions',
+            'risk': 'calculate_risk_level',
+            'total': 'analyze_text',
+            'triage': 'triage'
+        }
         
-        return text
+        # Compile every keyword table into one matcher so a text is scanned once
+        all_keywords = []
+        for table in (self.mental_health_keywords, self.positive_keywords, self.emotion_keywords):
+            for keywords in table.values():
+                all_keywords.extend(keywords)
+        self.keyword_matcher = KeywordMatcher(all_keywords, word_boundaries=word_boundaries)
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first use; None when disabled or not installed."""
+        if not self._nlp_loaded:
+            self._nlp_loaded = True
+            if self.enable_spacy:
+                # Try to load spaCy model, fall back to basic processing if not available
+                try:
+                    import spacy
+                    self._nlp = spacy.load("en_core_web_sm")
+                except (ImportError, OSError):
+                    self._nlp = None
+        return self._nlp
+    
+    def enable_stage_timing(self, observer):
+        """Report how long each analysis stage takes to ``observer(stage, seconds)``.
+        
+        The stage methods listed in ``timed_stages`` are wrapped on this
+        instance only. ``disable_stage_timing`` removes the wrappers again, so
+        an analyzer without timing runs the plain methods with no overhead.
+        """
+        self.disable_stage_timing()
+        for stage, method_name in self.timed_stages.items():
+            setattr(self, method_name, self._timed(stage, getattr(self, method_name), observer))
+    
+    def disable_stage_timing(self):
+        """Stop reporting stage durations."""
+        for method_name in self.timed_stages.values():
+            self.__dict__.pop(method_name, None)
+    
+    @staticmethod
+    def _timed(stage, method, observer):
+        """Wrap a bound method so its duration is reported under stage."""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                observer(stage, time.perf_counter() - start)
+        return timed
+    
+    def preprocess_text(self, text):
+        """Clean and preprocess text for analysis.
+        
+        Lowercases, collapses whitespace and expands contractions, copying the
+        text a handful of times rather than once per contraction. The result
+        is lowercase, so the keyword helpers can use it as-is.
+        """
+        # Lowercase, then collapse whitespace runs and trim the ends
+        text = ' '.join(text.lower().split())
+        
+        # Handle contractions and common abbreviations
+        if "'" not in text:
+            return text
+        return self._expand_contractions(text)
+    
+    def _expand_contractions(self, text):
+        """Expand contractions in one walk over the apostrophes in text."""
+        pieces = []
+        parts = text.split("'")
+        before = parts[0]
+        
+        for after in parts[1:]:
+            for prefix, suffix, expansion in self._contraction_rules.get(after[:1], ()):
+                if before.endswith(prefix) and after.startswith(suffix):
+                    pieces.append(before[:len(before) - len(prefix)])
+                    pieces.append(expansion)
+                    before = after[len(suffix):]
+                    break
+            else:
+                pieces.append(before)
+                pieces.append("'")
+                before = after
+        
+        pieces.append(before)
+        return ''.join(pieces)
     
     def analyze_with_textblob(self, text):
         """Analyze sentiment using TextBlob."""
-        blob = TextBlob(text)
+        if self._textblob_sentiment is not None:
+            polarity, subjectivity = self._textblob_sentiment(text)
+        else:
+            polarity, subjectivity = TextBlob(text).sentiment
         return {
-            'polarity': blob.sentiment.polarity,  # -1 to 1
-            'subjectivity': blob.sentiment.subjectivity  # 0 to 1
+            'polarity': polarity,  # -1 to 1
+            'subjectivity': subjectivity  # 0 to 1
+        }
+    
+    def lexicon_sections(self):
+        """The word tables ``python lexicon_store.py`` compiles into a lexicon store.
+        
+        VADER's lexicon and emoji descriptions; TextBlob's overall and adverb
+        scores per word, and its word labels; and the polarity and intensity
+        tables of ``triage``.
+        """
+        nan = float('nan')
+        textblob_words = {}
+        for word, senses in textblob_lexicon.items():
+            textblob_words[word] = tuple(senses[None]) + tuple(senses.get('RB', (nan, nan, nan)))
+        return {
+            'vader': dict(self.vader_analyzer.lexicon),
+            'vader_emoji': dict(self.vader_analyzer.emojis),
+            'textblob': textblob_words,
+            'textblob_labels': dict(textblob_lexicon.labeler),
+            'textblob_polarity': dict(self._textblob_polarity),
+            'textblob_intensity': dict(self._textblob_intensity)
         }
     
     def analyze_with_vader(self, text):
         """Analyze sentiment using VADER."""
-        scores = self.vader_analyzer.polarity_scores(text)
+        vader = self._ascii_vader_analyzer if text.isascii() else self.vader_analyzer
+        scores = vader.polarity_scores(text)
         return {
             'compound': scores['compound'],  # -1 to 1
             'positive': scores['pos'],
@@ -81,106 +375,77 @@ class SentimentAnalyzer:
             'neutral': scores['neu']
         }
     
-    def extract_mental_health_keywords(self, text):
-        """Extract mental health related keywords from text."""
-        found_keywords = []
-        text_lower = text.lower()
+    def find_keywords(self, text, lowercase=True):
+        """Return the set of all known keywords present in text.
         
+        Pass ``lowercase=False`` for text that is already lowercase, such as
+        the output of ``preprocess_text``.
+        """
+        return self.keyword_matcher.find(text.lower() if lowercase else text)
+    
+    def extract_mental_health_keywords(self, text, matches=None):
+        """Extract mental health related keywords from text.
+        
+        ``matches`` may carry the result of ``find_keywords`` for the same
+        text so the text is not scanned again.
+        """
+        if matches is None:
+            matches = self.find_keywords(text)
+        
+        found_keywords = []
         for category, keywords in self.mental_health_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
+                if keyword in matches:
                     found_keywords.append(keyword)
         
         return found_keywords
     
-    def extract_positive_keywords(self, text):
+    def extract_positive_keywords(self, text, matches=None):
         """Extract positive mental health indicators from text."""
-        found_keywords = []
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.find_keywords(text)
         
+        found_keywords = []
         for category, keywords in self.positive_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
+                if keyword in matches:
                     found_keywords.append(keyword)
         
         return found_keywords
     
-    def analyze_emotions(self, text):
+    def analyze_emotions(self, text, matches=None):
         """Analyze emotional content using keyword matching and sentiment."""
+        if matches is None:
+            matches = self.find_keywords(text)
+        
         emotions = {
-            'sadness': 0,
-            'anxiety': 0,
-            'anger': 0,
-            'fear': 0,
-            'joy': 0,
-            'trust': 0,
-            'anticipation': 0,
-            'disgust': 0
+            emotion: sum(1 for word in words if word in matches) / 10
+            for emotion, words in self.emotion_keywords.items()
         }
         
-        text_lower = text.lower()
-        
-        # Sadness indicators
-        sad_words = ['sad', 'depressed', 'down', 'blue', 'melancholy', 'grief', 'sorrow']
-        emotions['sadness'] = sum(1 for word in sad_words if word in text_lower) / 10
-        
-        # Anxiety indicators
-        anxiety_words = ['anxious', 'worried', 'nervous', 'stressed', 'panic', 'fear']
-        emotions['anxiety'] = sum(1 for word in anxiety_words if word in text_lower) / 10
-        
-        # Anger indicators
-        anger_words = ['angry', 'mad', 'furious', 'rage', 'irritated', 'frustrated']
-        emotions['anger'] = sum(1 for word in anger_words if word in text_lower) / 10
-        
-        # Fear indicators
-        fear_words = ['scared', 'afraid', 'terrified', 'frightened', 'fearful']
-        emotions['fear'] = sum(1 for word in fear_words if word in text_lower) / 10
-        
-        # Joy indicators
-        joy_words = ['happy', 'joyful', 'excited', 'cheerful', 'delighted', 'pleased']
-        emotions['joy'] = sum(1 for word in joy_words if word in text_lower) / 10
-        
-        # Trust indicators
-        trust_words = ['trust', 'confident', 'secure', 'safe', 'comfortable']
-        emotions['trust'] = sum(1 for word in trust_words if word in text_lower) / 10
-        
-        # Anticipation indicators
-        anticipation_words = ['excited', 'eager', 'hopeful', 'optimistic', 'expecting']
-        emotions['anticipation'] = sum(1 for word in anticipation_words if word in text_lower) / 10
-        
-        # Disgust indicators
-        disgust_words = ['disgusted', 'revolted', 'sick', 'nauseated']
-        emotions['disgust'] = sum(1 for word in disgust_words if word in text_lower) / 10
-        
         # Normalize scores
         max_score = max(emotions.values()) if max(emotions.values()) > 0 else 1
         emotions = {k: min(v / max_score, 1.0) for k, v in emotions.items()}
         
         return emotions
     
-    def calculate_risk_level(self, sentiment_scores, mental_health_keywords, emotions):
-        """Calculate mental health risk level based on analysis."""
+    def _sentiment_risk_points(self, score):
+        """Risk points for a TextBlob polarity or VADER compound score."""
+        if score < -0.5:
+            return 2
+        elif score < -0.2:
+            return 1
+        return 0
+    
+    def _indicator_risk_points(self, mental_health_keywords, emotions):
+        """Risk points from mental health keywords and negative emotion intensity."""
         risk_score = 0
         
-        # Sentiment contribution
-        if sentiment_scores['textblob']['polarity'] < -0.5:
-            risk_score += 2
-        elif sentiment_scores['textblob']['polarity'] < -0.2:
-            risk_score += 1
-        
-        if sentiment_scores['vader']['compound'] < -0.5:
-            risk_score += 2
-        elif sentiment_scores['vader']['compound'] < -0.2:
-            risk_score += 1
-        
         # Mental health keywords contribution
-        high_risk_keywords = ['suicide', 'kill myself', 'end it all', 'want to die', 'self harm']
-        moderate_risk_keywords = ['depressed', 'hopeless', 'worthless', 'anxious', 'panic']
-        
         for keyword in mental_health_keywords:
-            if any(hrk in keyword for hrk in high_risk_keywords):
+            if any(hrk in keyword for hrk in self.high_risk_keywords):
                 risk_score += 3
-            elif any(mrk in keyword for mrk in moderate_risk_keywords):
+            elif any(mrk in keyword for mrk in self.moderate_risk_keywords):
                 risk_score += 1
         
         # Emotion intensity contribution
@@ -192,51 +457,101 @@ class SentimentAnalyzer:
         elif negative_intensity > 1.0:
             risk_score += 1
         
-        # Determine risk level
+        return risk_score
+    
+    def _risk_level_for(self, risk_score):
+        """The (level, description) pair for a risk score."""
         if risk_score >= 5:
-            return 'High', 'Indicators suggest significant emotional distress. Professional support is strongly recommended.'
+            return self.risk_levels[2]
         elif risk_score >= 2:
-            return 'Moderate', 'Some concerning indicators detected. Consider seeking support or monitoring your well-being.'
+            return self.risk_levels[1]
         else:
-            return 'Low', 'Text shows generally stable emotional content. Continue maintaining positive mental health practices.'
+            return self.risk_levels[0]
+    
+    def calculate_risk_level(self, sentiment_scores, mental_health_keywords, emotions):
+        """Calculate mental health risk level based on analysis."""
+        risk_score = (self._sentiment_risk_points(sentiment_scores['textblob']['polarity'])
+                      + self._sentiment_risk_points(sentiment_scores['vader']['compound'])
+                      + self._indicator_risk_points(mental_health_keywords, emotions))
+        return self._risk_level_for(risk_score)
     
-    def analyze_text(self, text):
-        """Perform comprehensive sentiment and mental health analysis."""
+    def analyze_text(self, text, mode='full', use_cache=True):
+        """Perform comprehensive sentiment and mental health analysis.
+        
+        ``mode`` trades accuracy for speed: ``'full'`` uses TextBlob, VADER
+        and keywords; ``'fast'`` skips TextBlob and estimates its polarity
+        from VADER; ``'keywords-only'`` skips both sentiment models. The
+        result's ``mode`` field records which one produced it. With
+        ``use_cache=False`` the result cache is neither read nor filled.
+        """
+        if mode not in self.analysis_modes:
+            raise ValueError(f"Unknown analysis mode '{mode}', expected one of {', '.join(self.analysis_modes)}")
+        
         if not text or not text.strip():
             return None
         
         # Preprocess text
         processed_text = self.preprocess_text(text)
         
+        # Identical normalized texts share one cached result; the cache is
+        # read once, so one call never mixes cached and uncached paths
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cache_key = cache.key(processed_text, mode)
+            cached_result = cache.get(cache_key)
+            if cached_result is not None:
+                return cached_result
+        
         # Perform sentiment analysis
-        textblob_results = self.analyze_with_textblob(processed_text)
-        vader_results = self.analyze_with_vader(processed_text)
+        textblob_results = self.analyze_with_textblob(processed_text) if mode == 'full' else None
+        vader_results = self.analyze_with_vader(processed_text) if mode != 'keywords-only' else None
         
-        # Extract keywords
-        mental_health_keywords = self.extract_mental_health_keywords(processed_text)
-        positive_keywords = self.extract_positive_keywords(processed_text)
+        # Extract keywords (one scan shared by every keyword table)
+        matches = self.find_keywords(processed_text, lowercase=False)
+        mental_health_keywords = self.extract_mental_health_keywords(processed_text, matches)
+        positive_keywords = self.extract_positive_keywords(processed_text, matches)
         
         # Analyze emotions
-        emotions = self.analyze_emotions(processed_text)
-        
-        # Calculate overall sentiment (weighted average)
-        overall_sentiment = (textblob_results['polarity'] * 0.6 + vader_results['compound'] * 0.4)
+        emotions = self.analyze_emotions(processed_text, matches)
+        
+        if mode == 'full':
+            # Calculate overall sentiment (weighted average)
+            overall_sentiment = (textblob_results['polarity'] * 0.6 + vader_results['compound'] * 0.4)
+            sentiment_scores = {'textblob': textblob_results, 'vader': vader_results}
+            sentiment_agreement = 1 - abs(textblob_results['polarity'] - vader_results['compound'])
+        elif mode == 'fast':
+            # Stand in for TextBlob with a polarity estimated from VADER
+            calibration = self.mode_calibration['fast']
+            compound = vader_results['compound']
+            estimated_polarity = max(-1.0, min(1.0, calibration['polarity_slope'] * compound
+                                               + calibration['polarity_intercept']))
+            overall_sentiment = estimated_polarity * 0.6 + compound * 0.4
+            sentiment_scores = {'textblob': {'polarity': estimated_polarity}, 'vader': vader_results}
+            sentiment_agreement = calibration['agreement_intercept'] + calibration['agreement_slope'] * abs(compound)
+        else:
+            # Sentiment from keyword counts alone, fed to both risk inputs
+            calibration = self.mode_calibration['keywords-only']
+            overall_sentiment = max(-1.0, min(1.0, calibration['positive_weight'] * len(positive_keywords)
+                                              + calibration['negative_weight'] * len(mental_health_keywords)
+                                              + calibration['intercept']))
+            sentiment_scores = {'textblob': {'polarity': overall_sentiment}, 'vader': {'compound': overall_sentiment}}
+            sentiment_agreement = len(positive_keywords) * 0.1
         
         # Calculate emotion intensity
         emotion_intensity = max(emotions.values()) if emotions.values() else 0
         
         # Calculate risk level
         risk_level, risk_description = self.calculate_risk_level(
-            {'textblob': textblob_results, 'vader': vader_results},
+            sentiment_scores,
             mental_health_keywords,
             emotions
         )
         
         # Calculate confidence score
-        sentiment_agreement = 1 - abs(textblob_results['polarity'] - vader_results['compound'])
         confidence = min(sentiment_agreement + (len(mental_health_keywords) * 0.1), 1.0)
         
-        return {
+        result = {
+            'mode': mode,
             'overall_sentiment': overall_sentiment,
             'emotion_intensity': emotion_intensity,
             'confidence': confidence,
@@ -250,3 +565,354 @@ class SentimentAnalyzer:
                 'vader': vader_results
             }
         }
+        
+        if cache is not None:
+            cache.put(cache_key, result)
+        
+        return result
+    
+    def _iter_sentences(self, text):
+        """Yield (start, end) spans of text's sentences, cutting any longer than a window."""
+        for match in SENTENCE_PATTERN.finditer(text):
+            start, end = match.span()
+            if not text[start:end].strip():
+                continue
+            while end - start > self.window_max_chars:
+                cut = text.rfind(' ', start + 1, start + self.window_max_chars)
+                if cut == -1:
+                    cut = start + self.window_max_chars
+                yield start, cut
+                start = cut
+            yield start, end
+    
+    def iter_windows(self, text):
+        """Yield (start, end) spans of consecutive sentence windows covering text."""
+        window_start = window_end = None
+        sentences = 0
+        for start, end in self._iter_sentences(text):
+            if window_start is not None and (sentences == self.window_sentences
+                                             or end - window_start > self.window_max_chars):
+                yield window_start, window_end
+                window_start = None
+            if window_start is None:
+                window_start, sentences = start, 0
+            window_end = end
+            sentences += 1
+        if window_start is not None:
+            yield window_start, window_end
+    
+    def analyze_long_text(self, text, mode='full', stop_on_high=True, use_cache=True):
+        """Analyze a long text window by window instead of as one block.
+        
+        The text is split into windows of ``window_sentences`` sentences, each
+        scored with ``analyze_text`` as it is reached, so one distressed
+        passage is not averaged away by the rest of the text. The result has
+        every window's scores, the highest-risk window with its full
+        analysis, and the text's risk level: that of its worst window. With
+        ``stop_on_high`` scoring stops at the first High-risk window, so the
+        cost of a long text is bounded when it matters most. ``use_cache``
+        is passed on to ``analyze_text``.
+        """
+        if mode not in self.analysis_modes:
+            raise ValueError(f"Unknown analysis mode '{mode}', expected one of {', '.join(self.analysis_modes)}")
+        
+        if not text or not text.strip():
+            return None
+        
+        risk_order = [level for level, _ in self.risk_levels]
+        windows = []
+        worst = None
+        weighted_sentiment = 0.0
+        mental_health_keywords = {}
+        positive_keywords = {}
+        stopped_early = False
+        
+        # Text with no sentences, only terminators such as '...', is one window
+        for start, end in list(self.iter_windows(text)) or [(0, len(text))]:
+            result = self.analyze_text(text[start:end], mode=mode, use_cache=use_cache)
+            if result is None:
+                continue
+            
+            window = {
+                'index': len(windows),
+                'start': start,
+                'end': end,
+                'overall_sentiment': result['overall_sentiment'],
+                'emotion_intensity': result['emotion_intensity'],
+                'confidence': result['confidence'],
+                'risk_level': result['risk_level'],
+                'mental_health_keywords': result['mental_health_keywords']
+            }
+            windows.append(window)
+            weighted_sentiment += result['overall_sentiment'] * (end - start)
+            mental_health_keywords.update(dict.fromkeys(result['mental_health_keywords']))
+            positive_keywords.update(dict.fromkeys(result['positive_keywords']))
+            
+            # Worst window: highest risk, then most negative sentiment
+            rank = (risk_order.index(result['risk_level']), -result['overall_sentiment'])
+            if worst is None or rank > worst[0]:
+                worst = (rank, window, result)
+            
+            if stop_on_high and result['risk_level'] == risk_order[-1]:
+                stopped_early = end < len(text.rstrip())
+                break
+        
+        if worst is None:
+            return None
+        
+        _, worst_window, worst_result = worst
+        analyzed_chars = windows[-1]['end']
+        total_weight = sum(window['end'] - window['start'] for window in windows)
+        return {
+            'mode': mode,
+            'long_text': True,
+            'overall_sentiment': weighted_sentiment / total_weight,
+            'emotion_intensity': max(window['emotion_intensity'] for window in windows),
+            'confidence': worst_result['confidence'],
+            'risk_level': worst_result['risk_level'],
+            'risk_description': worst_result['risk_description'],
+            'mental_health_keywords': list(mental_health_keywords),
+            'positive_keywords': list(positive_keywords),
+            'windows': windows,
+            'max_risk_window': dict(worst_window, analysis=worst_result),
+            'windows_analyzed': len(windows),
+            'analyzed_chars': analyzed_chars,
+            'stopped_early': stopped_early
+        }
+    
+    def _vader_compound(self, text):
+        """VADER's compound score for text, exactly as ``polarity_scores`` gives it.
+        
+        A lexicon word with no negation, booster, idiom or 'least' from three
+        words before it to two after scores its plain lexicon valence; the
+        others go through VADER's own ``sentiment_valence`` on just those
+        words, rather than every word being checked against the whole text.
+        Text with emoji, which VADER first spells out, goes to
+        ``polarity_scores``.
+        """
+        if not text.isascii():
+            return self.vader_analyzer.polarity_scores(text)['compound']
+        
+        text = text.strip()
+        words = [word if word.isalnum() else SentiText._strip_punc_if_word(word) for word in text.split()]
+        if text.islower():
+            lowered, is_cap_diff = words, False
+        else:
+            lowered, is_cap_diff = [word.lower() for word in words], allcap_differential(words)
+        context = [word in self._vader_context_words or "n't" in word for word in lowered]
+        lexicon = self.vader_analyzer.lexicon
+        
+        sentiments = [0] * len(words)
+        for i, word in enumerate(lowered):
+            if word not in lexicon or word in BOOSTER_DICT:
+                continue
+            if word == 'kind' and lowered[i + 1:i + 2] == ['of']:
+                continue
+            start = max(0, i - 3)
+            if not any(context[start:i + 3]) and not (is_cap_diff and words[i].isupper()):
+                sentiments[i] = lexicon[word]
+            else:
+                window = _VaderWindow(words[start:i + 3], is_cap_diff)
+                sentiments[i] = self.vader_analyzer.sentiment_valence(0, window, words[i], i - start, [])[0]
+        
+        if 'but' in lowered:
+            sentiments = self.vader_analyzer._but_check(words, sentiments)
+        return self.vader_analyzer.score_valence(sentiments, text)['compound']
+    
+    def _textblob_polarity_floor(self, text):
+        """A value TextBlob's polarity for text cannot fall below, found without scoring it.
+        
+        The polarity is the mean of one score per sentiment word or emoticon
+        among TextBlob's own tokens, so it is no lower than the lowest score
+        any of them could get: a negative word or emoticon strengthened by
+        the strongest intensifier in the text and every exclamation mark,
+        or, if the text has a negation, a negated positive word, which
+        scores -0.5 at most. Emoticons are never negated.
+        """
+        words = set(' '.join(textblob_lexicon.tokenizer(text)).lower().split())
+        
+        intensity = max([self._textblob_intensity[word] for word in words if word in self._textblob_intensity],
+                        default=1.0)
+        exclamations = text.count('!')
+        boost = intensity * 1.25 ** exclamations if exclamations <= 64 else float('inf')
+        negated = not words.isdisjoint(textblob_lexicon.negations)
+        
+        floor = 0.0
+        for word in words:
+            if word in self._textblob_polarity:
+                polarity = self._textblob_polarity[word]
+                if polarity < 0:
+                    floor = min(floor, max(-1.0, polarity * boost))
+                elif negated:
+                    floor = min(floor, -0.5 * min(1.0, polarity * boost))
+            elif (not word.isalpha() and len(word) <= 5 and word not in TEXTBLOB_PUNCTUATION
+                  and self._textblob_emoticons.get(word, 0) < 0):
+                # Matched exactly as TextBlob matches emoticons
+                floor = min(floor, max(-1.0, self._textblob_emoticons[word] * boost))
+        return floor - ROUNDING_MARGIN
+    
+    def triage(self, text):
+        """Return just the risk level of text, stopping as soon as it is settled.
+        
+        Keyword and emotion risk points (the high-risk phrases of
+        ``calculate_risk_level``) come first, then VADER's compound score.
+        TextBlob only scores the text if it could still reach High with its
+        points, judged from the lowest polarity TextBlob could give its
+        tokens (``_textblob_polarity_floor``). High
+        is returned exactly when ``analyze_text`` gives High, and the level
+        is never lower than its; below High, a text may come back Moderate
+        where full analysis says Low. Returns None for empty text.
+        """
+        if not text or not text.strip():
+            return None
+        
+        processed_text = self.preprocess_text(text)
+        matches = self.find_keywords(processed_text, lowercase=False)
+        risk_score = self._indicator_risk_points(self.extract_mental_health_keywords(processed_text, matches),
+                                                 self.analyze_emotions(processed_text, matches))
+        
+        if risk_score < 5:
+            risk_score += self._sentiment_risk_points(self._vader_compound(processed_text))
+        
+        if risk_score < 5:
+            ceiling = risk_score + self._sentiment_risk_points(self._textblob_polarity_floor(processed_text))
+            if ceiling < 5:
+                return self._risk_level_for(ceiling)[0]
+            risk_score += self._sentiment_risk_points(self.analyze_with_textblob(processed_text)['polarity'])
+        
+        return self._risk_level_for(risk_score)[0]
+    
+    def analyze_batch(self, texts, return_exceptions=False, use_cache=True):
+        """Analyze many texts at once, returning one result per text.
+        
+        Each text is scored on its own (TextBlob, VADER and the keyword scan);
+        the blended sentiment, emotion normalization, risk level and confidence
+        are then computed for the whole batch as NumPy column operations.
+        Results match ``analyze_text`` item for item and empty texts give
+        ``None``. With ``return_exceptions`` a text that fails to analyze gets
+        its exception in place of a result instead of aborting the batch.
+        With ``use_cache=False`` the result cache is neither read nor filled.
+        """
+        results = [None] * len(texts)
+        cache = self.cache if use_cache else None
+        
+        indices = []
+        cache_keys = []
+        textblob_scores = []
+        vader_scores = []
+        mental_health_keywords = []
+        positive_keywords = []
+        emotion_counts = []
+        keyword_risk = []
+        
+        # Per-text scoring
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            
+            try:
+                processed_text = self.preprocess_text(text)
+                
+                cache_key = None
+                if cache is not None:
+                    cache_key = cache.key(processed_text, 'full')
+                    cached_result = cache.get(cache_key)
+                    if cached_result is not None:
+                        results[index] = cached_result
+                        continue
+                
+                textblob_results = self.analyze_with_textblob(processed_text)
+                vader_results = self.analyze_with_vader(processed_text)
+                matches = self.find_keywords(processed_text, lowercase=False)
+                found_keywords = self.extract_mental_health_keywords(processed_text, matches)
+                found_positive = self.extract_positive_keywords(processed_text, matches)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+                continue
+            
+            indices.append(index)
+            cache_keys.append(cache_key)
+            textblob_scores.append(textblob_results)
+            vader_scores.append(vader_results)
+            mental_health_keywords.append(found_keywords)
+            positive_keywords.append(found_positive)
+            emotion_counts.append([sum(1 for word in words if word in matches)
+                                   for words in self.emotion_keywords.values()])
+            keyword_risk.append(sum(self.keyword_risk_weights[keyword] for keyword in found_keywords))
+        
+        if not indices:
+            return results
+        
+        polarity = np.array([scores['polarity'] for scores in textblob_scores])
+        compound = np.array([scores['compound'] for scores in vader_scores])
+        keyword_count = np.array([len(keywords) for keywords in mental_health_keywords])
+        
+        # Overall sentiment (weighted average)
+        overall_sentiment = polarity * 0.6 + compound * 0.4
+        
+        # Emotion normalization, row by row
+        emotions = np.array(emotion_counts, dtype=float) / 10
+        max_score = emotions.max(axis=1)
+        max_score[max_score <= 0] = 1
+        emotions = np.minimum(emotions / max_score[:, None], 1.0)
+        emotion_intensity = emotions.max(axis=1)
+        
+        # Risk score, mirroring calculate_risk_level
+        negative_intensity = emotions[:, 0] + emotions[:, 1] + emotions[:, 2] + emotions[:, 3]
+        risk_score = (
+            np.select([polarity < -0.5, polarity < -0.2], [2, 1], 0)
+            + np.select([compound < -0.5, compound < -0.2], [2, 1], 0)
+            + np.array(keyword_risk)
+            + np.select([negative_intensity > 2.0, negative_intensity > 1.0], [2, 1], 0)
+        )
+        risk_index = np.select([risk_score >= 5, risk_score >= 2], [2, 1], 0)
+        
+        # Confidence score
+        sentiment_agreement = 1 - np.abs(polarity - compound)
+        confidence = np.minimum(sentiment_agreement + (keyword_count * 0.1), 1.0)
+        
+        emotion_names = list(self.emotion_keywords)
+        columns = zip(
+            indices, overall_sentiment.tolist(), emotion_intensity.tolist(), confidence.tolist(),
+            risk_index.tolist(), mental_health_keywords, positive_keywords, emotions.tolist(),
+            textblob_scores, vader_scores
+        )
+        for index, sentiment, intensity, conf, risk, keywords, positive, emotion_row, textblob_results, vader_results in columns:
+            risk_level, risk_description = self.risk_levels[risk]
+            results[index] = {
+                'mode': 'full',
+                'overall_sentiment': sentiment,
+                'emotion_intensity': intensity,
+                'confidence': conf,
+                'risk_level': risk_level,
+                'risk_description': risk_description,
+                'mental_health_keywords': keywords,
+                'positive_keywords': positive,
+                'emotions': dict(zip(emotion_names, emotion_row)),
+                'detailed_scores': {
+                    'textblob': textblob_results,
+                    'vader': vader_results
+                }
+            }
+        
+        if cache is not None:
+            for index, cache_key in zip(indices, cache_keys):
+                cache.put(cache_key, results[index])
+        
+        return results
+    
+    def analyze_batch_compact(self, texts, chunk_size=1024):
+        """Analyze many texts into a ``ResultBatch`` instead of a list of dicts.
+        
+        Texts go through ``analyze_batch`` ``chunk_size`` at a time, so only
+        one chunk's result dicts exist at once however large the batch. Texts
+        that fail are recorded in the batch's ``errors``.
+        """
+        batch = ResultBatch(len(texts), self.emotion_keywords, self.risk_levels, self.analysis_modes)
+        for start in range(0, len(texts), chunk_size):
+            chunk_results = self.analyze_batch(texts[start:start + chunk_size], return_exceptions=True)
+            for offset, result in enumerate(chunk_results):
+                batch.set(start + offset, result)
+        return batch
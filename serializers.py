@@ -0,0 +1,92 @@
+import json
+import math
+
+import numpy as np
+
+# Both encoders are optional: orjson only makes JSON faster, and MessagePack
+# is offered to clients only when msgpack is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def plain_value(value):
+    """Encode what the encoders lack native support for: NumPy arrays (NaN as None) and scalars."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return [None if math.isnan(item) else item for item in value.tolist()]
+        return value.tolist()
+    if isinstance(value, np.generic):
+        item = value.item()
+        return None if isinstance(item, float) and math.isnan(item) else item
+    raise TypeError(f'Object of type {type(value).__name__} is not serializable')
+
+
+class JSONSerializer:
+    """Compact JSON with a trailing newline, like ``jsonify``.
+
+    Uses orjson when it is installed, which also writes NumPy arrays straight
+    from their buffers; otherwise the standard library encoder.
+    """
+
+    name = 'json'
+    mimetype = JSON_MIMETYPE
+
+    def dumps(self, document):
+        if orjson is not None:
+            return orjson.dumps(document, default=plain_value,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(document, default=plain_value, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def loads(self, data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MessagePackSerializer:
+    """MessagePack, with strings as str and bytes as bin. Needs msgpack."""
+
+    name = 'msgpack'
+    mimetype = MSGPACK_MIMETYPES[0]
+
+    def dumps(self, document):
+        return msgpack.packb(document, default=plain_value, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+# Serializers by media type, in order of preference when an Accept header
+# rates several equally; the first one is the default
+SERIALIZERS = {JSON_MIMETYPE: JSONSerializer()}
+
+
+def register(serializer, mimetypes=None):
+    """Offer serializer for each of mimetypes (default: its own ``mimetype``)."""
+    for mimetype in mimetypes or (serializer.mimetype,):
+        SERIALIZERS[mimetype] = serializer
+
+
+if msgpack is not None:
+    register(MessagePackSerializer(), MSGPACK_MIMETYPES)
+
+
+def negotiate(accept):
+    """Return (media type, serializer) for a parsed Accept header, JSON if nothing acceptable is offered."""
+    mimetype = accept.best_match(SERIALIZERS, default=JSON_MIMETYPE)
+    return mimetype, SERIALIZERS[mimetype]
+
+
+def for_content_type(mimetype):
+    """Serializer that can decode a request body of mimetype, or None."""
+    return SERIALIZERS.get(mimetype)
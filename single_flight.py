@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+
+
+class _Call:
+    """One in-flight computation and the callers waiting on it."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent, identical computations into one.
+
+    The first caller for a key runs the computation; callers that arrive with
+    the same key while it runs wait for it and get the same result, or the
+    same exception. Nothing is kept once the computation finishes, so a later
+    call runs it again. Keys are keyed BLAKE2b digests of the normalized text,
+    like ``ResultCache`` keys, so the text itself is never held.
+
+    The result is shared, not copied: callers must not modify it.
+    """
+
+    def __init__(self):
+        self._secret = os.urandom(16)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.executed = 0
+        self.coalesced = 0
+
+    def key(self, text, namespace=''):
+        """Return the key for an already normalized text.
+
+        ``namespace`` separates computations that differ for the same text,
+        such as different analysis modes.
+        """
+        digest = hashlib.blake2b(digest_size=16, key=self._secret)
+        digest.update(namespace.encode('utf-8') + b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def do(self, key, function):
+        """Return ``(function(), shared)``, running function once for all concurrent callers of key.
+
+        ``shared`` is true for callers that waited on another caller's run.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        """Return computation counters and the share of calls that were coalesced."""
+        with self._lock:
+            calls = self.executed + self.coalesced
+            return {
+                'enabled': True,
+                'in_flight': len(self._calls),
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'coalesce_rate': round(self.coalesced / calls, 4) if calls else 0.0
+            }
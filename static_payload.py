@@ -0,0 +1,33 @@
+import gzip
+import hashlib
+import json
+
+
+class StaticPayload:
+    """JSON document encoded once, kept as bytes with a gzip variant.
+
+    Each variant has a strong ETag derived from the encoded body, so every
+    process serving the same content hands out the same tags, and a tag only
+    changes when the content does.
+    """
+
+    def __init__(self, document, last_modified=None):
+        """Encode document the way ``jsonify`` does, compactly."""
+        self.body = (json.dumps(document, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+        # mtime=0 keeps the compressed bytes identical from build to build
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.last_modified = last_modified
+
+        digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.etag = digest
+        self.gzip_etag = digest + '-gzip'
+
+    def variant(self, gzipped):
+        """Return (body, etag) for the identity or gzip representation."""
+        if gzipped:
+            return self.gzip_body, self.gzip_etag
+        return self.body, self.etag
+
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header set names either representation."""
+        return if_none_match.contains_weak(self.etag) or if_none_match.contains_weak(self.gzip_etag)
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.mark.parametrize('text', ['...', '!!!', '?!.'])
+def test_text_of_only_terminators_is_one_window(text):
+    analyzer = SentimentAnalyzer(enable_spacy=False)
+    result = analyzer.analyze_long_text(text)
+    assert result['risk_level'] == analyzer.analyze_text(text)['risk_level']
+    assert [(window['start'], window['end']) for window in result['windows']] == [(0, len(text))]
+
+
+def test_api_analyzes_long_text_of_only_terminators():
+    os.environ.setdefault('WELLNET_BATCH_WORKERS', '1')
+    os.environ.setdefault('WELLNET_ENABLE_SPACY', '0')
+    import api_server
+
+    client = api_server.app.test_client()
+    response = client.post('/api/analyze', json={'text': '...', 'long_text': True})
+    assert response.status_code == 200
+    assert response.get_json()['analysis']['long_text']
@@ -0,0 +1,101 @@
+import math
+import os
+
+import pytest
+
+from rate_limiter import RateLimiter, RedisBackend
+
+
+class FakeRedis:
+    """Runs RedisBackend's script in Python, on a clock the test moves, replying as Redis does."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.hashes = {}
+        self.expiry = {}
+
+    def eval(self, script, numkeys, key, capacity, rate, cost):
+        assert script == RedisBackend.SCRIPT and numkeys == 1
+        capacity, rate, cost = float(capacity), float(rate), float(cost)
+        bucket = self.hashes.get(key, {})
+        tokens = float(bucket.get('tokens', capacity))
+        updated = float(bucket.get('updated', self.now))
+        tokens = min(capacity, tokens + max(0.0, self.now - updated) * rate)
+        allowed = 0
+        if tokens >= cost:
+            tokens -= cost
+            allowed = 1
+        # Lua's tostring, returned as a bulk string
+        self.hashes[key] = {'tokens': '%.14g' % tokens, 'updated': '%.14g' % self.now}
+        self.expiry[key] = math.ceil((capacity - tokens) / rate) + 1
+        return [allowed, ('%.14g' % tokens).encode('ascii')]
+
+
+def test_batch_is_charged_one_token_per_text():
+    limiter = RateLimiter(10, window=60)
+    decision = limiter.take('client', 7)
+    assert decision.allowed
+    assert decision.remaining == 3
+
+    # The rest of the bucket cannot cover another 7 texts
+    decision = limiter.take('client', 7)
+    assert not decision.allowed
+    assert decision.remaining == 3
+    assert decision.retry_after >= 1
+
+
+def test_cost_above_limit_is_never_charged():
+    limiter = RateLimiter(10, window=60)
+    with pytest.raises(ValueError):
+        limiter.take('client', 11)
+    assert limiter.take('client', 0).remaining == 10
+
+
+def test_api_refuses_batch_larger_than_limit():
+    os.environ.setdefault('WELLNET_BATCH_WORKERS', '1')
+    os.environ.setdefault('WELLNET_ENABLE_SPACY', '0')
+    import api_server
+
+    limiter = api_server.rate_limiter
+    api_server.rate_limiter = RateLimiter(5, window=60)
+    try:
+        client = api_server.app.test_client()
+        response = client.post('/api/batch-analyze', json={'texts': ['I feel low'] * 6})
+        assert response.status_code == 413
+        assert api_server.rate_limiter.take('ip:127.0.0.1', 0).remaining == 5
+
+        response = client.post('/api/batch-analyze', json={'texts': ['I feel low'] * 5})
+        assert response.status_code == 200
+        assert response.headers['RateLimit-Remaining'] == '0'
+    finally:
+        api_server.rate_limiter = limiter
+
+
+def test_redis_backend_buckets_are_shared_between_limiters():
+    client = FakeRedis()
+    first = RateLimiter(10, window=20, backend=RedisBackend(client=client))
+    second = RateLimiter(10, window=20, backend=RedisBackend(client=client))
+
+    assert first.take('client', 7).remaining == 3
+    decision = second.take('client', 7)
+    assert not decision.allowed
+    assert decision.remaining == 3
+    assert all(key.startswith('wellnet:rate-limit:') for key in client.hashes)
+
+    # Refills at half a token per second, and expires once it would be full
+    client.now += 8
+    decision = second.take('client', 7)
+    assert decision.allowed
+    assert decision.remaining == 0
+    assert list(client.expiry.values()) == [21]
+    assert second.stats()['backend'] == 'redis'
+
+
+def test_redis_backend_against_fakeredis():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    limiter = RateLimiter(10, window=60, backend=RedisBackend(client=fakeredis.FakeRedis()))
+    assert limiter.take('client', 7).remaining == 3
+    decision = limiter.take('client', 7)
+    assert not decision.allowed
+    assert decision.retry_after >= 1
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+from textblob._text import EMOTICONS
+from textblob.en import sentiment as textblob_lexicon
+
+from benchmarks.corpus import generate_corpus
+from sentiment_analyzer import SentimentAnalyzer
+
+RISK_ORDER = {'Low': 0, 'Moderate': 1, 'High': 2}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer(enable_spacy=False, cache_size=0)
+
+
+def emoticon_texts(count, seed=0):
+    """Lexicon words mixed with emoticons, some split or reversed, and stray punctuation."""
+    rng = random.Random(seed)
+    words = [word for word in textblob_lexicon if word.isalpha()]
+    emoticons = [emoticon for group in EMOTICONS.values() for emoticon in group]
+    pieces = list(':;-()[]/\\=<>^_*.\'!') + ['not', 'very', 'so', 'drained', 'hopeless', 'XD']
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(2, 8)):
+            choice = rng.random()
+            if choice < 0.4:
+                parts.append(rng.choice(words))
+            elif choice < 0.6:
+                emoticon = rng.choice(emoticons)
+                cut = rng.randint(0, len(emoticon))
+                parts.append(rng.choice([emoticon, emoticon[::-1], emoticon[:cut] + ' ' + emoticon[cut:]]))
+            else:
+                parts.append(rng.choice(pieces))
+        texts.append(' '.join(parts))
+    return texts
+
+
+def assert_never_under_rated(analyzer, texts):
+    for text in texts:
+        full = analyzer.analyze_text(text)['risk_level']
+        level = analyzer.triage(text)
+        assert RISK_ORDER[level] >= RISK_ORDER[full], text
+        assert (level == 'High') == (full == 'High'), text
+
+
+def test_triage_never_under_rates_corpus(analyzer):
+    corpus = generate_corpus(counts={'short': 300, 'medium': 60, 'long': 3})
+    assert_never_under_rated(analyzer, [text for texts in corpus.values() for text in texts])
+
+
+def test_triage_reads_emoticons_as_textblob_does(analyzer):
+    # TextBlob's tokenizer rebuilds ':(' and ':/' from these
+    assert analyzer.triage('so drained -: (') == analyzer.analyze_text('so drained -: (')['risk_level']
+    assert_never_under_rated(analyzer, ['so drained -: (', 's: /-:', 'not happy :-( !!!'])
+    assert_never_under_rated(analyzer, emoticon_texts(2000))
@@ -0,0 +1,385 @@
+"""wellnet-analyze: bulk analysis of large CSV/JSONL corpora.
+
+Reads posts from files or stdin in chunks, analyzes them on a pool of worker
+processes and writes one flattened row per input record, as JSONL, CSV or
+Parquet. Memory stays bounded by the chunk size and the number of chunks in
+flight, whatever the size of the input.
+
+    python wellnet_analyze.py posts.csv -o results.parquet
+    zcat posts.jsonl.gz | python wellnet_analyze.py - -o results.jsonl
+    python wellnet_analyze.py posts.csv -o results.csv --resume
+
+With an output file, progress is checkpointed to ``<output>.checkpoint`` as
+the number of input records done and the output size at that point;
+``--resume`` truncates the output to that size and skips those records, so
+a crashed or interrupted run carries on where it stopped.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_engine import POOL_CONTEXT, _analyze_chunk, _init_worker
+from sentiment_analyzer import EMOTION_KEYWORDS
+
+# One column per emotion the analyzer scores, in its order
+EMOTIONS = tuple(EMOTION_KEYWORDS)
+
+# Output columns and their Parquet types
+COLUMNS = [
+    ('offset', 'int64'),
+    ('id', 'string'),
+    ('text_length', 'int64'),
+    ('mode', 'string'),
+    ('risk_level', 'string'),
+    ('overall_sentiment', 'float64'),
+    ('emotion_intensity', 'float64'),
+    ('confidence', 'float64'),
+    ('textblob_polarity', 'float64'),
+    ('textblob_subjectivity', 'float64'),
+    ('vader_compound', 'float64'),
+    ('vader_positive', 'float64'),
+    ('vader_negative', 'float64'),
+    ('vader_neutral', 'float64'),
+] + [(f'emotion_{emotion}', 'float64') for emotion in EMOTIONS] + [
+    ('mental_health_keywords', 'string'),
+    ('positive_keywords', 'string'),
+    ('error', 'string'),
+]
+
+# Analyzer settings for bulk runs: repeats are rare, so skip the result cache
+WORKER_OPTIONS = {'cache_size': 0, 'enable_spacy': False}
+
+
+def open_text(path):
+    """Open a file, gzipped file or '-' for stdin as UTF-8 text suitable for csv."""
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='')
+    return open(path, encoding='utf-8', errors='replace', newline='')
+
+
+def detect_format(path, choices, default):
+    """Pick a format from a file extension (ignoring .gz), else the default."""
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lstrip('.').lower()
+    extension = {'ndjson': 'jsonl', 'json': 'jsonl', 'pq': 'parquet'}.get(extension, extension)
+    return extension if extension in choices else default
+
+
+def read_records(paths, input_format, text_field, id_field):
+    """Yield (id, text, error) for every record of every input, lazily."""
+    for path in paths:
+        fmt = input_format or detect_format(path, ('csv', 'jsonl'), 'jsonl')
+        with open_text(path) as stream:
+            if fmt == 'csv':
+                for row in csv.DictReader(stream):
+                    text = row.get(text_field)
+                    record_id = row.get(id_field) if id_field else None
+                    if text is None:
+                        yield record_id, None, f'Missing column: {text_field}'
+                    else:
+                        yield record_id, text, None
+            else:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        yield None, None, f'Invalid JSON: {str(e)}'
+                        continue
+                    if isinstance(record, str):
+                        yield None, record, None
+                    elif isinstance(record, dict) and isinstance(record.get(text_field), str):
+                        record_id = record.get(id_field) if id_field else None
+                        yield None if record_id is None else str(record_id), record[text_field], None
+                    else:
+                        yield None, None, f'Record has no string field: {text_field}'
+
+
+def flatten(offset, record_id, text, result, error=None):
+    """One output row for an input record."""
+    row = dict.fromkeys(name for name, _ in COLUMNS)
+    row.update(offset=offset, id=record_id, text_length=len(text) if text is not None else None)
+
+    if isinstance(result, Exception):
+        error = f'Analysis error: {str(result)}'
+    elif result is None and error is None:
+        error = 'Empty text'
+
+    if error is not None:
+        row['error'] = error
+        return row
+
+    scores = result['detailed_scores']
+    row.update(
+        mode=result['mode'],
+        risk_level=result['risk_level'],
+        overall_sentiment=result['overall_sentiment'],
+        emotion_intensity=result['emotion_intensity'],
+        confidence=result['confidence'],
+        mental_health_keywords=';'.join(result['mental_health_keywords']),
+        positive_keywords=';'.join(result['positive_keywords'])
+    )
+    if scores['textblob'] is not None:
+        row['textblob_polarity'] = scores['textblob']['polarity']
+        row['textblob_subjectivity'] = scores['textblob']['subjectivity']
+    if scores['vader'] is not None:
+        for name in ('compound', 'positive', 'negative', 'neutral'):
+            row[f'vader_{name}'] = scores['vader'][name]
+    for emotion in EMOTIONS:
+        row[f'emotion_{emotion}'] = result['emotions'][emotion]
+    return row
+
+
+class JSONLWriter:
+    """Write rows as JSON lines."""
+
+    def __init__(self, stream, resume=False):
+        self.stream = stream
+
+    def write(self, rows):
+        self.stream.write(''.join(json.dumps(row) + '\n' for row in rows))
+
+    def close(self):
+        self.stream.flush()
+
+
+class CSVWriter:
+    """Write rows as CSV with a header, unless appending to an existing file."""
+
+    def __init__(self, stream, resume=False):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=[name for name, _ in COLUMNS])
+        if not resume:
+            self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetWriter:
+    """Write rows to Parquet in row groups, holding at most one group in memory."""
+
+    def __init__(self, path, row_group_size=50000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit('Parquet output needs pyarrow: pip install pyarrow')
+
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.pending = []
+
+    def write(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.writer.write_table(self.pa.Table.from_pylist(self.pending, schema=self.schema))
+            self.pending = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def chunked(records, start_offset, chunk_size):
+    """Group (id, text, error) records into lists of (offset, id, text, error)."""
+    chunk = []
+    for offset, (record_id, text, error) in enumerate(records, start_offset):
+        chunk.append((offset, record_id, text, error))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_chunks(chunks, workers, mode, analyzer_options=WORKER_OPTIONS):
+    """Yield (chunk, results) in input order, with at most two chunks per worker in flight."""
+    def texts(chunk):
+        return [text if error is None else '' for _, _, text, error in chunk]
+
+    if workers <= 1:
+        _init_worker(analyzer_options)
+        for chunk in chunks:
+            yield chunk, _analyze_chunk(texts(chunk), mode)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT, initializer=_init_worker,
+                             initargs=(analyzer_options,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_analyze_chunk, texts(chunk), mode)))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class Checkpoint:
+    """Records done and output bytes written, saved atomically next to the output."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Return the saved state, or None if there is no checkpoint."""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, records, output_bytes, settings):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(dict(settings, records=records, output_bytes=output_bytes), f)
+        os.replace(temporary, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def format_rate(records, seconds):
+    return f"{records / seconds:,.0f}/s" if seconds > 0 else '-'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='wellnet-analyze',
+        description='Analyze a large corpus of posts, streaming it in chunks over a worker pool.')
+    parser.add_argument('inputs', nargs='+', help="CSV or JSONL files (optionally .gz), or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file, or '-' for stdout (default)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='default: from the file extension, else jsonl')
+    parser.add_argument('--format', choices=['jsonl', 'csv', 'parquet'], help='default: from the output extension, else jsonl')
+    parser.add_argument('--text-field', default='text', help='column or JSON field holding the text')
+    parser.add_argument('--id-field', help='column or JSON field copied to the id column')
+    parser.add_argument('--mode', choices=['full', 'fast', 'keywords-only'], default='full')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--lexicon-store', help='lexicon store built by lexicon_store.py, shared by the workers')
+    parser.add_argument('--chunk-size', type=int, default=256, help='records sent to a worker at a time')
+    parser.add_argument('--resume', action='store_true', help='continue from the output checkpoint')
+    parser.add_argument('--checkpoint-interval', type=float, default=10.0, help='seconds between checkpoints')
+    parser.add_argument('--progress-interval', type=float, default=5.0, help='seconds between progress lines (0 for none)')
+    args = parser.parse_args(argv)
+    # Posts can be longer than the csv module's default field limit
+    csv.field_size_limit(2 ** 31 - 1)
+
+    output_format = args.format or detect_format(args.output, ('jsonl', 'csv', 'parquet'), 'jsonl')
+    to_file = args.output != '-'
+    if output_format == 'parquet' and not to_file:
+        parser.error('parquet output needs an output file')
+    if args.resume and (not to_file or output_format == 'parquet'):
+        parser.error('--resume needs a JSONL or CSV output file')
+
+    checkpoint = Checkpoint(args.output + '.checkpoint') if to_file else None
+    settings = {'inputs': args.inputs, 'format': output_format, 'mode': args.mode}
+
+    start_offset = 0
+    if args.resume:
+        state = checkpoint.load()
+        if state is not None:
+            if any(state.get(key) != value for key, value in settings.items()):
+                parser.error('checkpoint was written for different inputs, format or mode')
+            start_offset = state['records']
+            with open(args.output, 'r+b') as f:
+                f.truncate(state['output_bytes'])
+
+    if output_format == 'parquet':
+        stream = None
+        writer = ParquetWriter(args.output)
+    else:
+        if to_file:
+            stream = open(args.output, 'a' if start_offset else 'w', encoding='utf-8', newline='')
+        else:
+            stream = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+        writer_class = CSVWriter if output_format == 'csv' else JSONLWriter
+        writer = writer_class(stream, resume=bool(start_offset))
+
+    records = read_records(args.inputs, args.input_format, args.text_field, args.id_field)
+    for _ in range(start_offset):
+        if next(records, None) is None:
+            break
+
+    started = last_progress = last_checkpoint = time.monotonic()
+    done = start_offset
+    errors = 0
+    risk_distribution = {'Low': 0, 'Moderate': 0, 'High': 0}
+    # Records and output bytes as of the last whole chunk written
+    resumable = checkpoint is not None and stream is not None
+    safe_point = (done, stream.buffer.tell() if resumable else 0)
+    completed = False
+
+    try:
+        for chunk, results in analyze_chunks(chunked(records, start_offset, args.chunk_size),
+                                             args.workers, args.mode,
+                                             dict(WORKER_OPTIONS, lexicon_store=args.lexicon_store)):
+            rows = []
+            for (offset, record_id, text, error), result in zip(chunk, results):
+                row = flatten(offset, record_id, text, result if error is None else None, error)
+                if row['error'] is None:
+                    risk_distribution[row['risk_level']] += 1
+                else:
+                    errors += 1
+                rows.append(row)
+            writer.write(rows)
+            done += len(chunk)
+
+            now = time.monotonic()
+            if resumable:
+                stream.flush()
+                safe_point = (done, stream.buffer.tell())
+                if now - last_checkpoint >= args.checkpoint_interval:
+                    checkpoint.save(*safe_point, settings)
+                    last_checkpoint = now
+            if args.progress_interval and now - last_progress >= args.progress_interval:
+                print(f"[wellnet-analyze] {done:,} records, {format_rate(done - start_offset, now - started)}, "
+                      f"{now - started:.0f}s elapsed", file=sys.stderr)
+                last_progress = now
+        completed = True
+    finally:
+        writer.close()
+        if resumable:
+            if completed:
+                checkpoint.remove()
+            else:
+                checkpoint.save(*safe_point, settings)
+                print(f"[wellnet-analyze] stopped after record {safe_point[0]:,}; "
+                      f"run again with --resume to continue", file=sys.stderr)
+        if to_file and stream is not None:
+            stream.close()
+
+    elapsed = time.monotonic() - started
+    analyzed = done - start_offset
+    print(f"[wellnet-analyze] done: {analyzed:,} records in {elapsed:.1f}s ({format_rate(analyzed, elapsed)}), "
+          f"{errors:,} errors or empty, risk Low/Moderate/High "
+          f"{risk_distribution['Low']:,}/{risk_distribution['Moderate']:,}/{risk_distribution['High']:,}"
+          + (f", resumed at record {start_offset:,}" if start_offset else ''), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)